@@ -1,13 +1,26 @@
+import functools
+import logging
+import mimetypes
 import os
-import matplotlib
-matplotlib.use('Agg')  # Đảm bảo sử dụng backend không GUI
-from flask import Flask, render_template, request, jsonify, send_file
-import uuid
-import threading
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from models.nlp_model import NLPModel
-from models.NCD_model import NetCafeModel 
+import re
+import tempfile
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from flask import Flask, Response, g, render_template, request, jsonify
+from models.nlp_model import NLPModel, warm_up as warm_up_nlp, cache_stats as text_cache_stats
+from models.size_parser import cache_stats as size_cache_stats
+from services.session_store import SQLiteSessionStore, create_session_store
+from services.layout_renderer import RENDERERS
+from models.parameters import LayoutParameters
+from models.venue import Venue
+from services.design_cache import CachedDesign, DesignCache, design_id_for
+from services.design_janitor import DesignJanitor
+from services.render_queue import RenderQueue, QueueFullError
+from services.layout_tracker import LayoutTracker
+from services.logging_setup import configure_logging, begin_request, bind_request_context
+from services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, STAGE_SECONDS, stage_timer
+
+# Bố trí dùng models.layout_engine (NumPy, không cần torch); chỉ được import khi tính bố trí (hoặc trong warm_up)
 
 app = Flask(
     __name__,
@@ -15,254 +28,689 @@ app = Flask(
     template_folder=os.path.abspath(os.path.join(os.path.dirname(__file__), '../frontend/templates'))
 )
 
-# Khởi tạo NLPModel
-nlp_model = NLPModel()
+# Log: LOG_LEVEL=DEBUG bật log chi tiết của NLP/model (chỉ cho LOG_SAMPLE_RATE phần request), LOG_FORMAT=json cho log pipeline
+LOG_CONFIG = (
+    os.environ.get("LOG_LEVEL", "INFO"),
+    os.environ.get("LOG_FORMAT", "text"),
+    float(os.environ.get("LOG_SAMPLE_RATE", "1.0"))
+)
+configure_logging(*LOG_CONFIG)
+logger = logging.getLogger(__name__)
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Kho thông số theo phiên người dùng (mỗi request tạo NLPModel riêng từ thông số của phiên)
+session_store = create_session_store()
+SESSION_COOKIE = "session_id"
+
+# Số process web (gunicorn đọc cùng biến, xem gunicorn.conf.py). Với nhiều process, request của cùng một người dùng có
+# thể rơi vào process khác nhau, nên mọi trạng thái phải dùng chung được: phiên trong SQLite (SESSION_BACKEND=sqlite),
+# trạng thái job và bố trí gần nhất của /api/layout trong các bảng khác của cùng file, bản thiết kế luôn được ghi xuống
+# DESIGN_FOLDER để process nào cũng đọc được.
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+SHARED_STATE = WEB_CONCURRENCY > 1
+if SHARED_STATE and not isinstance(session_store, SQLiteSessionStore):
+    raise RuntimeError(
+        f"WEB_CONCURRENCY={WEB_CONCURRENCY} cần SESSION_BACKEND=sqlite: "
+        "phiên trong bộ nhớ không dùng chung được giữa các process"
+    )
+
+# Engine tách từ của NLPModel: "rules" (regex + trie) hoặc "underthesea" (pos_tag, chậm hơn nhiều)
+NLP_ENGINE = os.environ.get("NLP_ENGINE", "rules")
+
+# Chế độ bố trí mặc định: "grid", "optimize" hoặc "refine" (tinh chỉnh bằng gradient, cần torch)
+# (có thể ghi đè bằng trường "mode" trong request)
+LAYOUT_MODE = os.environ.get("LAYOUT_MODE", "grid")
+# Cùng giá trị với models.layout_engine.LAYOUT_MODES (không import ở đây để app không nạp bộ bố trí khi khởi động)
+LAYOUT_MODES = ("grid", "optimize", "refine")
+# Renderer mặc định: "png", "svg" hoặc "matplotlib" (có thể ghi đè bằng trường "renderer" trong request)
+RENDERER = os.environ.get("RENDERER", "png")
 
 # Tạo folder để lưu file thiết kế
 DESIGN_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), "../frontend/public/designs"))
 if not os.path.exists(DESIGN_FOLDER):
     os.makedirs(DESIGN_FOLDER)
+# Thời gian sống (giây) của file thiết kế
+DESIGN_TTL = 600
+
+# Một luồng nền duy nhất dọn DESIGN_FOLDER (kể cả file còn sót từ lần chạy trước). DESIGN_FOLDER_MAX_BYTES là giới
+# hạn của cả thư mục: janitor chỉ đếm các file của process mình, nên mỗi process web nhận một phần bằng nhau
+design_janitor = DesignJanitor(
+    DESIGN_FOLDER, ttl=DESIGN_TTL,
+    max_bytes=int(os.environ.get("DESIGN_FOLDER_MAX_BYTES", str(512 * 1024 * 1024))) // WEB_CONCURRENCY
+)
+design_janitor.start()
+
+# Cache bản thiết kế (trong bộ nhớ) theo thông số đã chuẩn hóa
+design_cache = DesignCache(
+    max_entries=int(os.environ.get("DESIGN_CACHE_ENTRIES", "256")),
+    max_bytes=int(os.environ.get("DESIGN_CACHE_BYTES", str(256 * 1024 * 1024))),
+    max_age=float(os.environ.get("DESIGN_CACHE_MAX_AGE", "300"))
+)
+# Bản thiết kế được trả thẳng từ bộ nhớ; chỉ ghi xuống DESIGN_FOLDER khi bật (hoặc request có "persist": true),
+# luôn ghi khi có nhiều process web (SHARED_STATE)
+PERSIST_DESIGNS = os.environ.get("PERSIST_DESIGNS", "0") == "1"
+DESIGN_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+# "Xác nhận" đưa job render vào process pool và trả job id ngay (ghi đè bằng trường "async" trong request). Đây là
+# chế độ bất đồng bộ của chat: không dùng view async def vì trên WSGI view đó vẫn giữ thread đến khi render xong
+RENDER_ASYNC = os.environ.get("RENDER_ASYNC", "1") == "1"
+render_queue = RenderQueue(
+    max_workers=int(os.environ.get("RENDER_WORKERS", "0")) or None,
+    max_pending=int(os.environ.get("RENDER_QUEUE_SIZE", "0")) or None,
+    job_ttl=DESIGN_TTL,
+    start_method=os.environ.get("RENDER_START_METHOD", "spawn"),
+    initializer=configure_logging,
+    initargs=LOG_CONFIG
+)
+# Trạng thái job dùng chung giữa các process web (job chạy trong pool của process đã nhận request)
+job_store = create_session_store("jobs", ttl=DESIGN_TTL) if SHARED_STATE else None
+# "Xác nhận" đồng bộ cũng render trong process pool và chỉ chờ kết quả (tối đa RENDER_TIMEOUT giây), nên một lần
+# render chậm không giữ GIL của process web và các lượt chat khác vẫn được phục vụ. RENDER_INLINE=1: render ngay
+# trong thread của request như trước.
+RENDER_INLINE = os.environ.get("RENDER_INLINE", "0") == "1"
+RENDER_TIMEOUT = float(os.environ.get("RENDER_TIMEOUT", "60"))
+
+# Số phòng tối đa của một địa điểm trong /api/venues
+VENUE_MAX_ROOMS = int(os.environ.get("VENUE_MAX_ROOMS", "64"))
+
+# Bố trí gần nhất của từng phiên cho /api/layout (tính lại tăng dần khi một thông số đổi, trả kèm diff)
+layout_tracker = LayoutTracker(
+    max_sessions=int(os.environ.get("LAYOUT_TRACKER_SESSIONS", "1024")), ttl=session_store.ttl,
+    store=create_session_store("layouts") if SHARED_STATE else None
+)
+
+
+# Chỉ số Prometheus tại /metrics; METRICS_ENABLED=0 tắt hẳn việc đo (timer thành no-op) và endpoint trả 404
+REGISTRY.enabled = os.environ.get("METRICS_ENABLED", "1") == "1"
+REQUESTS = REGISTRY.counter("requests_total", "Số request HTTP theo endpoint và mã trạng thái.", ("endpoint", "status"))
+REQUEST_SECONDS = REGISTRY.histogram("request_seconds", "Thời gian xử lý request HTTP (giây).", ("endpoint",))
+RENDERS = REGISTRY.counter("renders_total", "Số bản thiết kế đã tính bố trí và vẽ (không tính cache hit).",
+                           ("mode", "renderer"))
+SEATS_PLACED = REGISTRY.counter("seats_placed_total", "Tổng số ghế đã đặt trong các bản thiết kế đã vẽ.")
+REGISTRY.gauge("design_cache_hits_total", "Số lần lấy bản thiết kế từ cache.", lambda: design_cache.hits, "counter")
+REGISTRY.gauge("design_cache_misses_total", "Số lần không có bản thiết kế trong cache.",
+               lambda: design_cache.misses, "counter")
+REGISTRY.gauge("design_cache_entries", "Số bản thiết kế trong cache.", lambda: len(design_cache))
+REGISTRY.gauge("render_jobs_pending", "Số job render đang chờ hoặc đang chạy.", lambda: render_queue.pending_count)
+REGISTRY.gauge("render_jobs_rejected_total", "Số job render bị từ chối vì hàng đợi đầy.",
+               lambda: render_queue.rejected_count, "counter")
+REGISTRY.gauge("render_jobs_failed_total", "Số job render thất bại.", lambda: render_queue.failed_count, "counter")
+REGISTRY.gauge("design_folder_bytes", "Dung lượng các file thiết kế trên đĩa.", lambda: design_janitor.total_bytes)
+REGISTRY.gauge("parse_cache_hits_total", "Số lần trích xuất thông số lấy từ cache LRU.",
+               lambda: text_cache_stats()["parse_text_parameters"]["hits"], "counter")
+
+
+def warm_up():
+    """
+    Nạp trước các thư viện nặng (underthesea nếu dùng; lõi bố trí nếu render trong request) để request đầu tiên không phải chờ.
+    """
+    warm_up_nlp(NLP_ENGINE)
+    if RENDER_INLINE:
+        from services.design_builder import warm_up as warm_up_builder
+        warm_up_builder(LAYOUT_MODE)
+
+
+def start_worker():
+    """
+    Gọi trong mỗi process web sau khi fork (gunicorn post_worker_init): khởi động sẵn các process render
+    (mỗi process web có pool riêng, không tạo pool trong master trước khi fork).
+    """
+    if PRELOAD_MODELS and not RENDER_INLINE:
+        from services.design_builder import warm_up as warm_up_builder
+        render_queue.prestart(functools.partial(warm_up_builder, LAYOUT_MODE))
+
+
+def shutdown():
+    """
+    Tắt êm (gunicorn worker_exit hoặc khi dừng server phát triển): chờ các job render đang chạy,
+    dừng luồng dọn dẹp và xóa ngay các file thiết kế đã hết hạn.
+    """
+    render_queue.shutdown(wait=True)
+    design_janitor.stop(flush=True)
+
+
+# Bật PRELOAD_MODELS=1 khi chạy với gunicorn --preload: warm-up trong master, worker fork ra dùng chung (copy-on-write)
+PRELOAD_MODELS = os.environ.get("PRELOAD_MODELS", "0") == "1"
+if PRELOAD_MODELS:
+    warm_up()
+
+
+def load_session():
+    """
+    Lấy session id của người gọi (cookie hoặc trường "session_id" trong JSON) cùng thông số đã lưu
+    (LayoutParameters, kiểm tra một lần khi đọc). Session id không tồn tại trong kho, hoặc thông số
+    đã lưu không hợp lệ, sẽ được thay bằng id mới do server cấp.
+    """
+    session_id = request.cookies.get(SESSION_COOKIE) or (request.get_json(silent=True) or {}).get("session_id")
+    stored = session_store.load(session_id)
+    parameters = None
+    if stored is not None:
+        try:
+            parameters = LayoutParameters.from_dict(stored)
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            logger.warning("Invalid stored parameters for session %s: %s", session_id, e)
+    if parameters is None:
+        session_id = session_store.new_session_id()
+    return session_id, parameters
+
+
+def session_response(response, session_id):
+    """
+    Gắn cookie session id vào response.
+    """
+    response.set_cookie(SESSION_COOKIE, session_id, max_age=int(session_store.ttl), httponly=True, samesite="Lax")
+    return response
+
+
+@app.before_request
+def start_request_log():
+    g.request_id, g.request_started = begin_request(request.headers.get(REQUEST_ID_HEADER))
+
+
+@app.after_request
+def finish_request_log(response):
+    duration_ms = (time.perf_counter() - g.request_started) * 1000
+    logger.info(
+        "%s %s %s %.1f ms", request.method, request.path, response.status_code, duration_ms,
+        extra={"method": request.method, "path": request.path, "status": response.status_code,
+               "duration_ms": round(duration_ms, 2)}
+    )
+    response.headers[REQUEST_ID_HEADER] = g.request_id
+    endpoint = request.endpoint or "unknown"  # Tên hàm route, không dùng path để giới hạn số nhãn
+    REGISTRY.inc(REQUESTS, endpoint=endpoint, status=response.status_code)
+    REGISTRY.observe(REQUEST_SECONDS, duration_ms / 1000, endpoint=endpoint)
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Chỉ số của process hiện tại theo định dạng text của Prometheus.
+    """
+    if not REGISTRY.enabled:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
 
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    """
+    Các chỉ số vận hành: số file thiết kế chờ xóa, dung lượng thư mục thiết kế và cache.
+    """
+    return jsonify({
+        "design_cleanup_pending": design_janitor.pending_count,
+        "design_cleanup_deleted": design_janitor.deleted_count,
+        "design_folder_bytes": design_janitor.total_bytes,
+        "design_cache_entries": len(design_cache),
+        "design_cache_hits": design_cache.hits,
+        "design_cache_misses": design_cache.misses,
+        "render_jobs": len(render_queue),
+        "render_jobs_pending": render_queue.pending_count,
+        "render_jobs_rejected": render_queue.rejected_count,
+        "parse_cache": {**text_cache_stats(), **size_cache_stats()}
+    })
+
+@app.route('/api/parameters/export', methods=['GET'])
+def export_parameters():
+    """
+    Xuất bảng thông số của phiên hiện tại (?format=csv hoặc html). pandas chỉ được import ở đây.
+    """
+    export_format = request.args.get("format", "csv")
+    if export_format not in ("csv", "html"):
+        return jsonify({"error": f"Unknown format: {export_format}"}), 400
+    import pandas as pd
+
+    session_id, parameters = load_session()
+    table = pd.DataFrame(NLPModel(parameters, engine=NLP_ENGINE).parameter_rows())
+    if export_format == "csv":
+        response = Response(table.to_csv(index=False), mimetype="text/csv")
+        response.headers["Content-Disposition"] = "attachment; filename=parameters.csv"
+    else:
+        response = Response(table.to_html(index=False), mimetype="text/html")
+    return session_response(response, session_id)
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Trạng thái một job render: queued, running, done hoặc failed.
+    """
+    record, _ = find_job(job_id)
+    if record is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job_status(job_id, record))
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """
+    Bản thiết kế của job đã xong; job chưa xong trả 202 kèm trạng thái.
+    """
+    record, design = find_job(job_id)
+    if record is None:
+        return jsonify({"error": "Job not found"}), 404
+    if record["status"] == "failed":
+        return jsonify(job_status(job_id, record)), 500
+    if record["status"] != "done":
+        return jsonify(job_status(job_id, record)), 202
+    design = design or load_design(record["design_id"])
+    if design is None:
+        return jsonify({"error": "Design not found"}), 404
+    return design_response(design)
+
+
+def find_job(job_id):
+    """
+    Tìm job trong render_queue của process này, rồi trong job_store (job do process web khác nhận).
+    :return: (trạng thái dạng job_record hoặc None nếu không có job, CachedDesign nếu job của process này đã xong).
+    """
+    job = render_queue.get(job_id)
+    if job is not None:
+        return job_record(job), job.result
+    if job_store is not None:
+        return job_store.load(job_id), None
+    return None, None
+
+
+def job_record(job):
+    status = job.status
+    record = {"status": status}
+    if status == "done":
+        record["design_id"] = job.result.design_id
+    elif status == "failed":
+        record["error"] = f"Failed to generate design: {job.error}"
+    return record
+
+
+def job_status(job_id, record):
+    return {
+        "job_id": job_id,
+        "status_url": f"/api/jobs/{job_id}",
+        "result_url": f"/api/jobs/{job_id}/result",
+        **record
+    }
+
+
+def share_job(job):
+    """
+    Ghi trạng thái job vào job_store (khi có nhiều process web) và cập nhật khi job xong.
+    Callback được đăng ký sau callback của render_queue nên chạy khi trạng thái job đã được cập nhật.
+    """
+    if job_store is None:
+        return job
+    job_store.save(job.job_id, job_record(job))
+    if job.future is not None:
+        job.future.add_done_callback(lambda future: job_store.save(job.job_id, job_record(job)))
+    return job
+
+@app.route('/api/designs/<design_id>', methods=['GET'])
+def get_design(design_id):
+    """
+    Tải lại một bản thiết kế còn trong cache hoặc trên đĩa (hỗ trợ If-None-Match).
+    """
+    design = load_design(design_id)
+    if design is None:
+        return jsonify({"error": "Design not found"}), 404
+    return design_response(design)
+
+
+@app.route('/api/layout', methods=['GET', 'POST'])
+def get_layout():
+    """
+    Tọa độ bố trí (cm) theo thông số hiện tại của phiên, không vẽ ảnh: dùng cho chỉnh sửa tương tác.
+    Bố trí trước của phiên được giữ trong layout_tracker, nên khi chỉ một thông số đổi (lối đi, quầy lễ tân, ...)
+    chỉ phần bị ảnh hưởng được tính lại; "diff" liệt kê bàn/ghế thêm, bớt, di chuyển so với lần gọi trước
+    (null ở lần đầu). Mode lấy từ ?mode= hoặc trường "mode" trong JSON.
+    """
+    mode = request.args.get("mode") or (request.get_json(silent=True) or {}).get("mode") or LAYOUT_MODE
+    if mode not in LAYOUT_MODES:
+        return jsonify({"error": f"Unknown mode: {mode}"}), 400
+    with stage_timer("session_load"):
+        session_id, parameters = load_session()
+    if parameters is None:
+        parameters = LayoutParameters()
+        session_store.save(session_id, parameters.to_dict())
+
+    started = time.perf_counter()
+    with stage_timer("forward"):
+        layout, diff, rows_checked = layout_tracker.update(session_id, parameters, mode)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    return session_response(jsonify({
+        "session_id": session_id,
+        "mode": mode,
+        "room": list(parameters.room),
+        "tables": layout.tables.tolist(),
+        "chairs": layout.chairs.tolist(),
+        "reception": None if layout.reception is None else layout.reception.tolist(),
+        "seats": len(layout.chairs),
+        "efficiency": round(layout.efficiency, 2),
+        "layout": layout.description,
+        "diff": diff,
+        "rows_checked": rows_checked,
+        "elapsed_ms": round(elapsed_ms, 3)
+    }), session_id)
+
+
+@app.route('/api/venues', methods=['POST'])
+def venue_design():
+    """
+    Bố trí cả một địa điểm nhiều phòng/nhiều tầng (body {"venue": {"name", "rooms": [...]}, "mode", "renderer",
+    "persist"}, xem models.venue). Trả thống kê sức chứa tổng hợp, từng phòng và mặt bằng từng tầng; bản vẽ riêng
+    của phòng và mặt bằng tầng tải tại /api/designs/<design_id>.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        venue = Venue.from_dict(data.get("venue") or {})
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        return jsonify({"error": f"Invalid venue: {e}"}), 400
+    if len(venue.rooms) > VENUE_MAX_ROOMS:
+        return jsonify({"error": f"Too many rooms: {len(venue.rooms)} (max {VENUE_MAX_ROOMS})"}), 400
+    mode = data.get("mode", LAYOUT_MODE)
+    renderer = data.get("renderer", RENDERER)
+    if mode not in LAYOUT_MODES:
+        return jsonify({"error": f"Unknown mode: {mode}"}), 400
+    if renderer not in RENDERERS:
+        return jsonify({"error": f"Unknown renderer: {renderer}"}), 400
+
+    try:
+        designs, plans = draw_venue(venue, mode, renderer, bool(data.get("persist", PERSIST_DESIGNS)) or SHARED_STATE)
+    except QueueFullError as e:
+        response = jsonify({"error": str(e)})
+        response.status_code = 503
+        response.headers["Retry-After"] = "5"
+        return response
+    except FutureTimeoutError:
+        return jsonify({"error": f"Venue generation timed out after {RENDER_TIMEOUT:g} s"}), 504
+    except Exception as e:
+        return jsonify({"error": f"Failed to generate venue: {str(e)}"}), 500
+
+    from services.venue_builder import venue_statistics
+
+    rooms, summary = venue_statistics(venue, designs)
+    for row in rooms:
+        row["url"] = f"/api/designs/{row['design_id']}"
+    return jsonify({
+        "venue": venue.name,
+        "mode": mode,
+        "renderer": renderer,
+        "summary": summary,
+        "rooms": rooms,
+        "floors": [{"floor": floor, "design_id": plan.design_id, "url": f"/api/designs/{plan.design_id}",
+                    "size": list(plan.layout["room"])} for floor, plan in plans.items()]
+    })
+
+
+def load_design(design_id):
+    """
+    Bản thiết kế trong design_cache; khi có nhiều process web thì tìm thêm file trong DESIGN_FOLDER (bản thiết kế do
+    process khác vẽ). Bản đọc từ đĩa chỉ có nội dung ảnh (layout rỗng) nên không được đưa vào cache.
+    :return: CachedDesign hoặc None.
+    """
+    design = design_cache.get(design_id)
+    if design is not None or not SHARED_STATE or not DESIGN_ID_PATTERN.fullmatch(design_id):
+        return design
+    for extension in dict.fromkeys(extension for _, extension, _ in RENDERERS.values()):
+        file_path = os.path.join(DESIGN_FOLDER, f"design_{design_id}.{extension}")
+        try:
+            with open(file_path, "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            continue
+        mimetype = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        return CachedDesign(design_id, {}, content, extension, mimetype, file_path=file_path)
+    return None
+
+
+def design_response(design):
+    """
+    Trả nội dung bản thiết kế trực tiếp từ bộ nhớ, kèm ETag (khóa nội dung) và Content-Length.
+    """
+    response = Response(design.content, mimetype=design.mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename={design.file_name}"
+    response.set_etag(design.design_id)
+    return response.make_conditional(request)
+
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     user_input = request.json.get('message', '')
     if not user_input:
         return jsonify({"error": "No input provided"}), 400
 
+    with stage_timer("session_load"):
+        session_id, parameters = load_session()
+    nlp_model = NLPModel(parameters, engine=NLP_ENGINE)
+
     if user_input.lower() == "xác nhận":
         try:
-            session_id = str(uuid.uuid4())
-            file_url = draw_layout(session_id)  # Hàm này trả về URL của hình ảnh đã tạo
-            return send_file(
-                os.path.join(DESIGN_FOLDER, f"design_{session_id}.png"),
-                mimetype="application/octet-stream",
-                as_attachment=True,
-                download_name=f"design_{session_id}.png"
-            )
+            mode = request.json.get("mode", LAYOUT_MODE)
+            renderer = request.json.get("renderer", RENDERER)
+            if mode not in LAYOUT_MODES:
+                return jsonify({"error": f"Unknown mode: {mode}"}), 400
+            if renderer not in RENDERERS:
+                return jsonify({"error": f"Unknown renderer: {renderer}"}), 400
+            persist = bool(request.json.get("persist", PERSIST_DESIGNS)) or SHARED_STATE
+            if request.json.get("async", RENDER_ASYNC):
+                job = share_job(submit_layout(nlp_model.parameters, mode, renderer, persist))
+                session_store.save(session_id, nlp_model.parameters.to_dict())
+                response = jsonify(job_status(job.job_id, job_record(job)))
+                response.status_code = 202
+                response.headers["Location"] = f"/api/jobs/{job.job_id}"
+                return session_response(response, session_id)
+            design = draw_layout(nlp_model.parameters, mode, renderer, persist)  # Bản thiết kế (có thể lấy từ cache)
+            session_store.save(session_id, nlp_model.parameters.to_dict())
+            with stage_timer("response"):
+                return session_response(design_response(design), session_id)
+        except QueueFullError as e:
+            response = jsonify({"error": str(e)})
+            response.status_code = 503
+            response.headers["Retry-After"] = "5"
+            return response
+        except FutureTimeoutError:
+            # Job vẫn chạy tiếp và được ghi vào cache khi xong: gửi lại "xác nhận" sẽ lấy từ cache
+            return jsonify({"error": f"Design generation timed out after {RENDER_TIMEOUT:g} s"}), 504
         except Exception as e:
             return jsonify({"error": f"Failed to generate design: {str(e)}"}), 500
 
-    if "tôi muốn" in user_input.lower() or "cập nhật" in user_input.lower():
-        response = nlp_model.handle_user_update(user_input)
-        return jsonify({
-            "response": response,
-            "parameters": nlp_model.user_parameters
-        })
-    # Khi người dùng yêu cầu loại bỏ quầy lễ tân
-    if "loại bỏ quầy lễ tân" in user_input.lower():
-        response = nlp_model.remove_reception_desk()
-        return jsonify({
-            "response": response,
-            "parameters": nlp_model.user_parameters
-        })
-        
-    response = nlp_model.respond_to_user(user_input)
-    return jsonify({
+    with stage_timer("nlp"):
+        if "tôi muốn" in user_input.lower() or "cập nhật" in user_input.lower():
+            response = nlp_model.handle_user_update(user_input)
+        # Khi người dùng yêu cầu loại bỏ quầy lễ tân
+        elif "loại bỏ quầy lễ tân" in user_input.lower():
+            response = nlp_model.remove_reception_desk()
+        else:
+            response = nlp_model.respond_to_user(user_input)
+
+    with stage_timer("session_save"):
+        session_store.save(session_id, nlp_model.parameters.to_dict())
+    return session_response(jsonify({
         "response": response,
-        "parameters": nlp_model.user_parameters
-    })
+        "parameters": nlp_model.parameters.to_dict(),
+        "session_id": session_id
+    }), session_id)
     
 
 
-def draw_layout(session_id):
+def draw_layout(parameters, mode="grid", renderer="png", persist=False):
+    """
+    Tạo bản thiết kế và chờ kết quả trong request; thông số đã vẽ gần đây được lấy thẳng từ design_cache.
+    Mặc định việc tính toán chạy trong render_queue (xem RENDER_INLINE).
+    :param persist: Ghi thêm bản thiết kế xuống DESIGN_FOLDER.
+    :return: CachedDesign chứa các mảng layout và nội dung ảnh.
+    :raises concurrent.futures.TimeoutError: Khi render trong pool quá RENDER_TIMEOUT giây.
+    """
+    if not RENDER_INLINE:
+        job = submit_layout(parameters, mode, renderer, persist)
+        return job.result if job.future is None else job.future.result(timeout=RENDER_TIMEOUT)
 
-    try:
-        net_cafe_model = NetCafeModel(nlp_model.user_parameters)
-    except Exception as e:
-        print(f"Error initializing NetCafeModel: {e}")
-        raise
+    from services.design_builder import build_design
 
-    # Tính toán layout tensors
-    try:
-        table_tensor, chair_tensor, reception_tensor = net_cafe_model.forward()
-        print(f"Layout tensors: Tables - {table_tensor}, Chairs - {chair_tensor}, Reception - {reception_tensor}")
-    except Exception as e:
-        print(f"Error calculating layout tensors: {e}")
-        raise
+    design_id, cached = cached_layout(parameters, mode, renderer, persist)
+    if cached is not None:
+        return cached
+    design = build_design(parameters, mode, renderer, design_id)
+    store_design(design, persist)
+    return design
 
-    # Tạo hình ảnh matplotlib
-    try:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        print("Matplotlib figure and axis created.")
-    except Exception as e:
-        print(f"Error creating Matplotlib figure: {e}")
-        raise
 
-    # Lấy kích thước phòng
-    try:
-        room_width, room_height = net_cafe_model._parse_size(net_cafe_model.parameters["room"]["size"])
-        print(f"Parsed room dimensions: width={room_width}, height={room_height}")
-    except Exception as e:
-        print(f"Error parsing room dimensions: {e}")
-        raise
+def submit_layout(parameters, mode="grid", renderer="png", persist=False):
+    """
+    Đưa việc tính bố trí và vẽ vào render_queue; bản thiết kế có trong cache được trả thành job đã xong.
+    :return: RenderJob.
+    """
+    from services.design_builder import build_design
 
-    # Vẽ phòng
-    try:
-        ax.set_xlim(0, room_width)
-        ax.set_ylim(0, room_height)
-        ax.add_patch(patches.Rectangle((0, 0), room_width, room_height, edgecolor='black', fill=None))
-        # ax.invert_yaxis()
-        print("Room drawn successfully.")
-    except Exception as e:
-        print(f"Error drawing room: {e}")
-        raise
+    design_id, cached = cached_layout(parameters, mode, renderer, persist)
+    if cached is not None:
+        return render_queue.add_result(cached)
+    return render_queue.submit(
+        bind_request_context(build_design), parameters, mode, renderer, design_id,
+        on_done=lambda design: store_design(design, persist)
+    )
 
-    # Vẽ quầy lễ tân nếu có
-    try:
-        if net_cafe_model.parameters["reception_desk"]["present"] == "Có":
-            reception = reception_tensor[0].numpy()
-            ax.add_patch(patches.Rectangle(
-                (reception[0], reception[1]),
-                reception[2],
-                reception[3],
-                edgecolor='blue',
-                facecolor='lightblue',
-                label="Reception Desk"
-            ))
-            # Thêm nhãn cho quầy lễ tân
-            ax.text(
-                reception[0] + reception[2] / 2,
-                reception[1] + reception[3] / 2,
-                "Quầy lễ tân",
-                color="black",
-                fontsize=8,
-                ha="center",
-                va="center"
-            )
-            print(f"Reception desk drawn at: {reception}.")
-    except Exception as e:
-        print(f"Error drawing reception desk: {e}")
-        raise
 
-    # Vẽ các bàn
-    try:
-        for table in table_tensor.numpy():
-            ax.add_patch(patches.Rectangle(
-                (table[0], table[1]),
-                table[2],
-                table[3],
-                edgecolor='green',
-                facecolor='lightgreen',
-                label="Table"
-            ))
-            # Thêm nhãn cho bàn
-            ax.text(
-                table[0] + table[2] / 2,
-                table[1] + table[3] / 2,
-                "Bàn",
-                color="black",
-                fontsize=8,
-                ha="center",
-                va="center"
-            )
-        print("Tables drawn successfully.")
-    except Exception as e:
-        print(f"Error drawing tables: {e}")
-        raise
+def cached_layout(parameters, mode, renderer, persist):
+    """
+    Tính khóa nội dung và tra design_cache.
+    :return: (design_id, CachedDesign hoặc None).
+    """
+    if mode not in LAYOUT_MODES:
+        raise ValueError(f"Mode không hợp lệ: {mode}")
+    with stage_timer("cache_lookup"):
+        design_id = design_id_for(parameters, mode, renderer)
+        cached = design_cache.get(design_id)
+    if cached is not None:
+        logger.debug("Design cache hit: %s", design_id)
+        if persist and cached.file_path is None:
+            save_design(cached)
+    return design_id, cached
 
-    # Vẽ các ghế
-    try:
-        for chair in chair_tensor.numpy():
-            ax.add_patch(patches.Rectangle(
-                (chair[0], chair[1]),
-                chair[2],
-                chair[3],
-                edgecolor='orange',
-                facecolor='yellow',
-                label="Chair"
-            ))
-            # Thêm nhãn cho ghế
-            ax.text(
-                chair[0] + chair[2] / 2,
-                chair[1] + chair[3] / 2,
-                "Ghế",
-                color="black",
-                fontsize=6,
-                ha="center",
-                va="center"
-            )
-        print("Chairs drawn successfully.")
-    except Exception as e:
-        print(f"Error drawing chairs: {e}")
-        raise
 
-    # # Thêm các tham chiếu kích thước
-    # try:
-    #     # Chiều dài phòng (horizontal reference)
-    #     ax.annotate(
-    #         f"{room_width} cm",
-    #         xy=(room_width / 2, -10), xycoords='data',
-    #         fontsize=10, ha='center', va='center',
-    #         annotation_clip=False
-    #     )
-    #     # Chiều rộng phòng (vertical reference)
-    #     ax.annotate(
-    #         f"{room_height} cm",
-    #         xy=(-10, room_height / 2), xycoords='data',
-    #         fontsize=10, ha='center', va='center',
-    #         rotation=90,
-    #         annotation_clip=False
-    #     )
-    #     print("Dimension references added.")
-    # except Exception as e:
-    #     print(f"Error adding dimension references: {e}")
-    #     raise
-    total_room_area = room_width * room_height
-    used_area = sum(w * h for x, y, w, h in table_tensor) + sum(w * h for x, y, w, h in chair_tensor) 
-    efficiency = (used_area / total_room_area) * 100
-    print(f"Tỷ lệ sử dụng diện tích: {efficiency}%")
-
-    #add comment
-    
-    # Thêm nhãn cho trục tọa độ
-    try:
-        ax.set_xlabel("Chiều dài (cm)", fontsize=12)
-        ax.set_ylabel("Chiều rộng (cm)", fontsize=12)
-    except Exception as e:
-        print(f"Error adding axis labels: {e}")
-        raise
+def draw_venue(venue, mode="grid", renderer="png", persist=False):
+    """
+    Bản vẽ riêng của từng phòng và mặt bằng từng tầng của một địa điểm.
+    Các phòng cùng thông số dùng chung một bản thiết kế (cùng khóa nội dung), phòng/tầng đã có trong design_cache được
+    lấy thẳng; phần còn lại chia thành tối đa render_queue.max_workers job chạy song song (phòng trước, rồi các tầng),
+    nên khi còn process trống thời gian chờ không tăng tuyến tính theo số phòng.
+    :return: (dict tên phòng -> CachedDesign, dict tầng -> CachedDesign của mặt bằng).
+    :raises concurrent.futures.TimeoutError: Khi tổng thời gian của cả hai bước quá RENDER_TIMEOUT giây.
+    """
+    from services.venue_builder import build_floor_plans, build_room_designs, floor_plan_id
 
-    # Hoàn tất và lưu hình ảnh
-    try:
-        ax.set_title("Net Cafe Layout")
-        #ax.invert_yaxis()
-        output_file = os.path.join(DESIGN_FOLDER, f"design_{session_id}.png")
-        plt.savefig(output_file, dpi=300)
-        plt.close()
-        print(f"Layout saved to: {output_file}")
-    except Exception as e:
-        print(f"Error saving layout: {e}")
-        raise
+    deadline = time.monotonic() + RENDER_TIMEOUT
+    design_ids, by_id, missing = {}, {}, []
+    for parameters in dict.fromkeys(room.parameters for room in venue.rooms):
+        design_id, cached = cached_layout(parameters, mode, renderer, persist)
+        design_ids[parameters] = design_id
+        if cached is None:
+            missing.append((parameters, design_id))
+        else:
+            by_id[design_id] = cached
+    for design in run_chunked(build_room_designs, missing, (mode, renderer), deadline):
+        store_design(design, persist)
+        by_id[design.design_id] = design
+    designs = {room.name: by_id[design_ids[room.parameters]] for room in venue.rooms}
 
-    # Xóa file sau 10 phút
-    try:
-        threading.Thread(target=delete_file_after_timeout, args=(output_file, 600)).start()
-        print("Thread to delete file after timeout started.")
-    except Exception as e:
-        print(f"Error starting delete thread: {e}")
-        raise
-    
-    
-    
-    
-    # Trả về URL
-    return f"/static/designs/design_{session_id}.png"
+    plan_ids, plans, missing = {}, {}, []
+    for floor in venue.floors():
+        placements, width, height = venue.floor_plan(floor)
+        title = f"{venue.name or 'Net Cafe'} - Tầng {floor}"
+        plan_ids[floor] = floor_plan_id(
+            title, [(room.name, x, y, designs[room.name].design_id) for room, x, y in placements], width, height,
+            renderer
+        )
+        cached = design_cache.get(plan_ids[floor])
+        if cached is None:
+            rooms = [(room.name, x, y, designs[room.name].layout) for room, x, y in placements]
+            missing.append((plan_ids[floor], title, rooms, width, height))
+        else:
+            if persist and cached.file_path is None:
+                save_design(cached)
+            plans[floor] = cached
+    built = {}
+    for plan in run_chunked(build_floor_plans, missing, (renderer,), deadline):
+        for stage, seconds in plan.timings.items():
+            REGISTRY.observe(STAGE_SECONDS, seconds, stage=stage)
+        if persist:
+            save_design(plan)
+        design_cache.put(plan.design_id, plan)
+        built[plan.design_id] = plan
+    return designs, {floor: plans.get(floor) or built[plan_ids[floor]] for floor in venue.floors()}
+
+
+def run_chunked(fn, items, args, deadline):
+    """
+    Chạy fn(nhóm, *args) trên render_queue với tối đa max_workers nhóm (hoặc ngay trong request nếu RENDER_INLINE).
+    :return: Kết quả của mọi nhóm nối lại.
+    :raises concurrent.futures.TimeoutError: Khi quá deadline (time.monotonic()).
+    """
+    if not items:
+        return []
+    if RENDER_INLINE:
+        return fn(items, *args)
+    from services.venue_builder import chunked
 
+    jobs = [render_queue.submit(bind_request_context(fn), chunk, *args)
+            for chunk in chunked(items, render_queue.max_workers)]
+    results = []
+    for job in jobs:
+        results.extend(job.future.result(timeout=max(deadline - time.monotonic(), 0)))
+    return results
 
 
-def delete_file_after_timeout(file_path, timeout):
-    import time
-    time.sleep(timeout)
-    if os.path.exists(file_path):
+def store_design(design, persist):
+    """
+    Ghi nhận một bản thiết kế vừa vẽ (trong request hoặc ở process worker): chỉ số, cache và file nếu cần.
+    """
+    for stage, seconds in design.timings.items():
+        REGISTRY.observe(STAGE_SECONDS, seconds, stage=stage)
+    REGISTRY.inc(RENDERS, mode=design.layout["mode"], renderer=design.layout["renderer"])
+    REGISTRY.inc(SEATS_PLACED, len(design.layout["chairs"]))
+    if persist:
+        save_design(design)
+    design_cache.put(design.design_id, design)
+
+
+def save_design(design):
+    """
+    Ghi bản thiết kế xuống DESIGN_FOLDER và lên lịch xóa sau DESIGN_TTL giây.
+    """
+    output_file = os.path.join(DESIGN_FOLDER, design.file_name)
+    start = time.perf_counter()
+    try:
+        # Ghi file tạm rồi đổi tên để request song song không đọc phải file đang ghi dở; tên file tạm duy nhất cả giữa
+        # các process web dùng chung DESIGN_FOLDER
+        fd, temp_file = tempfile.mkstemp(suffix=".tmp", prefix=f"{design.file_name}.", dir=DESIGN_FOLDER)
         try:
-            os.remove(file_path)
-        except Exception as e:
-            print(f"Failed to delete file {file_path}: {str(e)}")
+            with os.fdopen(fd, "wb") as f:
+                f.write(design.content)
+            os.chmod(temp_file, 0o644)  # mkstemp tạo file 0600; file thiết kế được phục vụ công khai
+            os.replace(temp_file, output_file)
+        except BaseException:
+            os.unlink(temp_file)
+            raise
+        logger.debug("Layout saved to: %s", output_file)
+    except Exception:
+        logger.exception("Error saving layout to %s", output_file)
+        raise
+    REGISTRY.observe(STAGE_SECONDS, time.perf_counter() - start, stage="save")
+    design_janitor.schedule(output_file)
+    design.file_path = output_file
+
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # Server phát triển của Flask (một process). Chạy production: gunicorn -c gunicorn.conf.py (xem wsgi.py)
+    start_worker()
+    try:
+        app.run(
+            host=os.environ.get("HOST", "127.0.0.1"),
+            port=int(os.environ.get("PORT", "5000")),
+            debug=os.environ.get("FLASK_DEBUG", "0") == "1",
+            threaded=True
+        )
+    finally:
+        shutdown()
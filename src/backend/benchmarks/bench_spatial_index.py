@@ -0,0 +1,69 @@
+"""
+Benchmark thời gian đặt bàn theo số lượng vật cản: SpatialIndex so với kiểm tra vét cạn
+từng vật cản (như is_collision cũ trong NCD_model.py).
+
+Chạy: python src/backend/benchmarks/bench_spatial_index.py
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.grid_layout import compute_grid_boxes  # noqa: E402
+from models.spatial_index import build_obstacle_index  # noqa: E402
+
+ROOM_W, ROOM_H = 4000, 3000  # Sảnh 40m x 30m
+TABLE_W, BOX_H, AISLE, GAP = 120, 125, 98, 5
+OBSTACLE_COUNTS = [0, 10, 100, 1000, 5000]
+REPEAT = 5
+
+
+class BruteForceIndex:
+    """
+    Kiểm tra mọi vật cản cho mỗi truy vấn, O(số box x số vật cản).
+    """
+
+    def __init__(self, rects):
+        self.rects = [tuple(rect) for rect in rects]
+
+    def query_mask(self, boxes):
+        mask = np.zeros(len(boxes), dtype=bool)
+        for i, (x, y, w, h) in enumerate(boxes.tolist()):
+            for ox, oy, ow, oh in self.rects:
+                if x < ox + ow and x + w > ox and y < oy + oh and y + h > oy:
+                    mask[i] = True
+                    break
+        return mask
+
+
+def random_obstacles(count, rng):
+    # Cột, cửa, nhà vệ sinh... kích thước 30-150 cm
+    return [[rng.uniform(0, ROOM_W), rng.uniform(0, ROOM_H), rng.uniform(30, 150), rng.uniform(30, 150)]
+            for _ in range(count)]
+
+
+def time_placement(index):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        boxes = compute_grid_boxes(ROOM_W, ROOM_H, TABLE_W, BOX_H, 0, 0, AISLE, GAP, index)
+    return (time.perf_counter() - start) / REPEAT * 1000, len(boxes)
+
+
+def main():
+    rng = random.Random(0)
+    print(f"Phòng {ROOM_W}x{ROOM_H} cm, trung bình {REPEAT} lần chạy")
+    print(f"{'vật cản':>8} {'bàn':>6} {'index (ms)':>11} {'vét cạn (ms)':>13} {'tăng tốc':>9}")
+    for count in OBSTACLE_COUNTS:
+        obstacles = random_obstacles(count, rng)
+        index_ms, placed = time_placement(build_obstacle_index(ROOM_W, ROOM_H, 0, 0, obstacles))
+        brute_ms, brute_placed = time_placement(BruteForceIndex(obstacles))
+        assert placed == brute_placed
+        print(f"{count:>8} {placed:>6} {index_ms:>11.2f} {brute_ms:>13.2f} {brute_ms / index_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
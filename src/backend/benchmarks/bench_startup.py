@@ -0,0 +1,76 @@
+"""
+Benchmark thời gian khởi động: import app.py và độ trễ các request đầu tiên,
+khi nạp thư viện lười (mặc định) và khi warm-up trước (PRELOAD_MODELS=1).
+Mỗi kịch bản chạy trong một process Python mới để đo đúng cold start.
+
+Chạy: python src/backend/benchmarks/bench_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HEAVY_MODULES = ["nltk", "underthesea", "pandas", "torch", "matplotlib.pyplot"]
+REPEAT = 3
+
+# Chạy trong process con: đo import app và các request đầu tiên bằng Flask test client
+SCENARIO = r"""
+import json, os, time
+start = time.perf_counter()
+import app
+timings = {"import_app": time.perf_counter() - start}
+client = app.app.test_client()
+for name, body in [
+    ("first_chat", {"message": "tôi muốn phòng 10x8m"}),
+    ("second_chat", {"message": "cập nhật bàn 100x60cm"}),
+    ("first_confirm", {"message": "xác nhận", "async": False}),
+]:
+    start = time.perf_counter()
+    response = client.post("/api/chat", json=body)
+    assert response.status_code == 200, response.status_code
+    timings[name] = time.perf_counter() - start
+print("RESULT " + json.dumps(timings))
+os._exit(0)
+"""
+
+IMPORT_ONLY = r"""
+import json, os, sys, time
+start = time.perf_counter()
+__import__(sys.argv[1])
+print("RESULT " + json.dumps({"import": time.perf_counter() - start}))
+os._exit(0)
+"""
+
+
+def run(code, env=None, args=()):
+    output = subprocess.run(
+        [sys.executable, "-c", code, *args], cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={**os.environ, **(env or {})}, check=True
+    ).stdout
+    line = next(line for line in output.splitlines() if line.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):])
+
+
+def best_of(code, env=None, args=()):
+    # Lấy giá trị nhỏ nhất qua REPEAT lần chạy cho từng chỉ số (ít nhiễu nhất)
+    runs = [run(code, env, args) for _ in range(REPEAT)]
+    return {key: min(result[key] for result in runs) for key in runs[0]}
+
+
+def main():
+    print(f"Thời gian import từng thư viện (tốt nhất trong {REPEAT} lần, ms)")
+    for module in HEAVY_MODULES:
+        print(f"  {module:<20} {best_of(IMPORT_ONLY, args=(module,))['import'] * 1000:>8.0f}")
+
+    scenarios = {"lazy": {"PRELOAD_MODELS": "0"}, "preload": {"PRELOAD_MODELS": "1"}}
+    results = {name: best_of(SCENARIO, env) for name, env in scenarios.items()}
+    columns = list(results["lazy"])
+    print(f"\nKhởi động app (tốt nhất trong {REPEAT} lần, ms)")
+    print(f"{'':<10}" + "".join(f"{column:>15}" for column in columns))
+    for name, timings in results.items():
+        print(f"{name:<10}" + "".join(f"{timings[column] * 1000:>15.0f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Bộ benchmark tái lập được cho các đường nóng:
+  nlp      NLPModel.extract_drawing_parameters trên tập tin nhắn mẫu (data/nlp_parity_corpus.txt), cache LRU bị xóa
+           trước mỗi lần chạy để đo đúng việc tách từ và trích xuất
+  forward  LayoutEngine.compute() (lõi NumPy mà NetCafeModel.forward() bọc lại) trên lưới kích thước phòng, từ quán nhỏ 20 m² đến sảnh 5.000 m², chế độ grid và optimize
+  render   build_design (phần tính bố trí + vẽ của draw_layout, không qua cache) với từng renderer
+
+Mỗi trường hợp báo: số lần chạy, throughput (lần/giây), độ trễ p50/p99/trung bình (ms) và bộ nhớ đỉnh (tracemalloc, KiB,
+đo ở một lần chạy riêng để không làm sai thời gian). Kết quả ghi ra JSON để so giữa các phiên bản:
+
+Chạy: python src/backend/benchmarks/bench_suite.py --output bench.json
+So sánh: python src/backend/benchmarks/bench_suite.py --compare bench.json (thoát với mã 1 nếu p50 chậm đi quá --threshold)
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.nlp_model import NLPModel, parse_text_parameters, warm_up  # noqa: E402
+from models.parameters import LayoutParameters  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "nlp_parity_corpus.txt")
+SUITES = ("nlp", "forward", "render")
+
+# (tên, chiều rộng m, chiều dài m): từ quán nhỏ đến sảnh 5.000 m²
+ROOM_SIZES = [
+    ("20m2", 5, 4),
+    ("80m2", 10, 8),
+    ("300m2", 20, 15),
+    ("1200m2", 40, 30),
+    ("5000m2", 100, 50),
+]
+LAYOUT_MODES = ("grid", "optimize")
+RENDER_ROOMS = ("80m2", "1200m2", "5000m2")
+
+
+def percentile(sorted_values, fraction):
+    # Nội suy tuyến tính giữa hai giá trị gần nhất (như numpy.percentile mặc định)
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def measure(fn, min_runs, min_time, setup=None):
+    """
+    Chạy fn ít nhất min_runs lần và ít nhất min_time giây (sau một lần chạy làm nóng).
+    :param setup: Hàm gọi trước mỗi lần chạy, không tính vào thời gian (ví dụ xóa cache).
+    :return: Dict các chỉ số của trường hợp.
+    """
+    if setup:
+        setup()
+    fn()  # Làm nóng: import lười, cache font, JIT của thư viện...
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_runs or time.perf_counter() - started < min_time:
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    # Bộ nhớ đỉnh đo riêng: tracemalloc làm chậm mọi phép cấp phát
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        "runs": len(timings),
+        "throughput_per_s": round(len(timings) / total, 3),
+        "p50_ms": round(percentile(timings, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(timings, 0.99) * 1000, 4),
+        "mean_ms": round(total / len(timings) * 1000, 4),
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+
+def room_parameters(width_m, height_m):
+    return LayoutParameters(room=(width_m * 100.0, height_m * 100.0), reception=(200.0, 80.0), reception_present=True)
+
+
+def bench_nlp(args):
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        corpus = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    results = {}
+    for engine in args.engines:
+        warm_up(engine)
+        model = NLPModel(engine=engine)
+
+        def run():
+            for message in corpus:
+                model.extract_drawing_parameters(message)
+
+        case = measure(run, args.min_runs, args.min_time, setup=parse_text_parameters.cache_clear)
+        case["messages"] = len(corpus)
+        case["messages_per_s"] = round(case["throughput_per_s"] * len(corpus), 1)
+        results[f"nlp/extract_drawing_parameters/{engine}"] = case
+    return results
+
+
+def bench_forward(args):
+    from models.layout_engine import LayoutEngine
+
+    results = {}
+    for name, width_m, height_m in ROOM_SIZES:
+        parameters = room_parameters(width_m, height_m)
+        for mode in LAYOUT_MODES:
+            layout_engine = LayoutEngine(parameters, mode=mode)
+            case = measure(layout_engine.compute, args.min_runs, args.min_time)
+            case["tables"] = len(layout_engine.compute()[0])
+            results[f"forward/{mode}/{name}"] = case
+    return results
+
+
+def bench_render(args):
+    from services.design_builder import build_design
+
+    rooms = {name: (width_m, height_m) for name, width_m, height_m in ROOM_SIZES}
+    results = {}
+    for name in RENDER_ROOMS:
+        parameters = room_parameters(*rooms[name])
+        for renderer in args.renderers:
+            case = measure(lambda: build_design(parameters, "grid", renderer), args.min_runs, args.min_time)
+            case["bytes"] = len(build_design(parameters, "grid", renderer).content)
+            results[f"render/{renderer}/{name}"] = case
+    return results
+
+
+BENCHMARKS = {"nlp": bench_nlp, "forward": bench_forward, "render": bench_render}
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(__file__), capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    In các trường hợp có p50 chậm đi quá threshold (tỷ lệ) so với baseline.
+    :return: Số trường hợp bị chậm đi.
+    """
+    regressions = 0
+    print(f"\nSo với baseline {baseline['environment'].get('commit')} (ngưỡng +{threshold:.0%} p50)")
+    for name, case in results.items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+        change = case["p50_ms"] / reference["p50_ms"] - 1 if reference["p50_ms"] else 0.0
+        regressed = change > threshold
+        regressions += regressed
+        print(f"  {'CHẬM' if regressed else 'ok':<5} {name:<40} {reference['p50_ms']:>10.3f} -> {case['p50_ms']:>10.3f} ms"
+              f" ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NLP, bố trí và render")
+    parser.add_argument("--suite", default=",".join(SUITES), help=f"Các nhóm cần chạy, cách nhau dấu phẩy ({', '.join(SUITES)})")
+    parser.add_argument("--engines", default="rules", help="Engine tách từ cho nhóm nlp (rules,underthesea)")
+    parser.add_argument("--renderers", default="png,svg",
+                        help="Renderer cho nhóm render (png,svg,matplotlib; matplotlib mất vài giây mỗi lần với phòng lớn)")
+    parser.add_argument("--min-runs", type=int, default=20, help="Số lần chạy tối thiểu mỗi trường hợp")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Thời gian chạy tối thiểu mỗi trường hợp (giây)")
+    parser.add_argument("--output", help="Ghi kết quả JSON ra file")
+    parser.add_argument("--compare", help="File JSON kết quả trước đó để phát hiện chậm đi")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Tỷ lệ p50 chậm đi tối đa khi --compare")
+    args = parser.parse_args()
+    args.engines = args.engines.split(",")
+    args.renderers = args.renderers.split(",")
+
+    results = {}
+    for suite in args.suite.split(","):
+        if suite not in BENCHMARKS:
+            parser.error(f"Nhóm không hợp lệ: {suite}")
+        results.update(BENCHMARKS[suite](args))
+
+    print(f"{'trường hợp':<40}{'lần':>6}{'lần/s':>10}{'p50 ms':>11}{'p99 ms':>11}{'đỉnh KiB':>11}")
+    for name, case in results.items():
+        print(f"{name:<40}{case['runs']:>6}{case['throughput_per_s']:>10.1f}{case['p50_ms']:>11.3f}"
+              f"{case['p99_ms']:>11.3f}{case['peak_memory_kib']:>11.1f}")
+
+    report = {"environment": environment(), "settings": {"min_runs": args.min_runs, "min_time": args.min_time},
+              "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(results, baseline, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Đối chiếu engine tách từ "rules" với "underthesea" trên tập tin nhắn mẫu của test (tests/data/nlp_parity_corpus.txt):
+thực thể nhận diện (loại, kích thước, đơn vị), thông số trích xuất và thông số/phản hồi sau khi xử lý như /api/chat phải giống hệt nhau.
+In thời gian tách từ và thời gian xử lý cả tin nhắn của từng engine; thoát với mã 1 nếu có khác biệt.
+Tính tương đương được kiểm tra tự động bởi tests/test_nlp_parity.py; script này dùng để xem chi tiết và đo thời gian.
+
+Chạy: python src/backend/benchmarks/check_nlp_parity.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.entity_extractor import TOKENIZERS  # noqa: E402
+from models.nlp_model import NLPModel, warm_up  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "..", "tests", "data", "nlp_parity_corpus.txt")
+ENGINES = ("rules", "underthesea")
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def process(message, engine):
+    """
+    Xử lý một tin nhắn như /api/chat, trả về mọi kết quả cần đối chiếu (hoặc lỗi).
+    """
+    try:
+        model = NLPModel(engine=engine)
+        # Chỉ so kích thước/đơn vị của thực thể: các từ không chứa số/đơn vị trong value (ví dụ "máy tính"
+        # hay "máy" khi underthesea gộp từ ghép khác) không ảnh hưởng kết quả
+        entities = [(entity.type, model.parse_size_and_unit(entity.value))
+                    for entity in model.extract_entities(model.preprocess_text(message))]
+        extracted = NLPModel(engine=engine).extract_drawing_parameters(message)
+        if "tôi muốn" in message.lower() or "cập nhật" in message.lower():
+            response = model.handle_user_update(message)
+        elif "loại bỏ quầy lễ tân" in message.lower():
+            response = model.remove_reception_desk()
+        else:
+            response = model.respond_to_user(message)
+        return {"entities": entities, "extracted": extracted, "parameters": model.user_parameters,
+                "response": response}
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def main():
+    corpus = load_corpus()
+    results, timings, tokenize_timings = {}, {}, {}
+    for engine in ENGINES:
+        warm_up(engine)
+        texts = [NLPModel().preprocess_text(message) for message in corpus]
+        start = time.perf_counter()
+        for text in texts:
+            TOKENIZERS[engine](text)
+        tokenize_timings[engine] = time.perf_counter() - start
+        start = time.perf_counter()
+        results[engine] = [process(message, engine) for message in corpus]
+        timings[engine] = time.perf_counter() - start
+
+    mismatches = 0
+    for message, rules, reference in zip(corpus, results["rules"], results["underthesea"]):
+        if rules != reference:
+            mismatches += 1
+            print(f"KHÁC: {message!r}\n  rules:       {rules}\n  underthesea: {reference}")
+
+    print(f"{len(corpus)} tin nhắn, {mismatches} khác biệt")
+    print(f"{'engine':<14}{'tách từ (ms)':>14}{'cả tin nhắn (ms)':>18}")
+    for engine in ENGINES:
+        print(f"{engine:<14}{tokenize_timings[engine] / len(corpus) * 1000:>14.3f}"
+              f"{timings[engine] / len(corpus) * 1000:>18.2f}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Tải thử /api/chat: nhiều người dùng ảo chạy song song các kịch bản hội thoại thực tế (cập nhật thông số,
+"loại bỏ quầy lễ tân", "xác nhận" rồi chờ job render), mỗi người một phiên (cookie session_id) riêng.
+Chỉ dùng thư viện chuẩn. Mặc định tự khởi động app (werkzeug, threaded) ở một process riêng; --url để chạy vào
+một instance có sẵn (ví dụ gunicorn).
+
+Báo cáo: throughput, độ trễ p50/p90/p99 theo loại lượt (update/remove/confirm), tỷ lệ lỗi, số lượt bị từ chối (503)
+và dung lượng DESIGN_FOLDER theo thời gian.
+
+Chạy: python src/backend/benchmarks/load_test.py --users 16 --duration 30
+      python src/backend/benchmarks/load_test.py --env PERSIST_DESIGNS=1 --output load.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+from bench_suite import environment, percentile
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DESIGN_FOLDER = os.path.abspath(os.path.join(BACKEND_DIR, "../frontend/public/designs"))
+
+# Kịch bản hội thoại: mỗi người dùng ảo chọn ngẫu nhiên một kịch bản rồi chạy lần lượt từng tin nhắn.
+# {w}x{h}: kích thước phòng (m) khác nhau theo người dùng, để không phải mọi "xác nhận" đều trúng cache thiết kế
+SCRIPTS = [
+    ["tôi muốn phòng {w}x{h}m", "cập nhật bàn 120x60cm, ghế 60x60cm", "xác nhận"],
+    ["tôi muốn phòng {w}x{h}m có quầy 300x100cm", "cập nhật lối đi 120cm", "xác nhận",
+     "loại bỏ quầy lễ tân", "xác nhận"],
+    ["phòng {w}x{h}m", "bàn 100x60cm", "cập nhật khoảng cách giữa các bàn 10cm", "xác nhận"],
+    ["tôi muốn phòng {w}x{h}m, bàn 140x70cm", "cập nhật quầy 400x120cm", "xác nhận"],
+    ["tôi muốn phòng {w}x{h}m", "cập nhật ghế 55x55cm", "loại bỏ quầy lễ tân", "xác nhận"],
+]
+ROOM_VARIANTS = 40
+
+SERVER = r"""
+import os, sys
+sys.path.insert(0, os.getcwd())
+from werkzeug.serving import run_simple
+import app
+if __name__ == "__main__":
+    run_simple("127.0.0.1", int(sys.argv[1]), app.app, threaded=True)
+"""
+
+
+def message_kind(message):
+    if message == "xác nhận":
+        return "confirm"
+    if "loại bỏ quầy lễ tân" in message:
+        return "remove"
+    return "update"
+
+
+def folder_usage(folder):
+    total, count = 0, 0
+    try:
+        entries = list(os.scandir(folder))
+    except OSError:
+        return 0, 0
+    for entry in entries:
+        try:
+            if entry.is_file():
+                total += entry.stat().st_size
+                count += 1
+        except OSError:
+            continue
+    return total, count
+
+
+class Stats:
+    """
+    Kết quả thu thập từ mọi người dùng ảo (thread-safe).
+    """
+
+    def __init__(self):
+        self.latencies = {}  # loại lượt -> danh sách độ trễ (giây)
+        self.errors = {}  # mô tả lỗi -> số lần
+        self.rejected = 0
+        self.turns = 0
+        self._lock = threading.Lock()
+
+    def record(self, kind, seconds):
+        with self._lock:
+            self.latencies.setdefault(kind, []).append(seconds)
+            self.turns += 1
+
+    def error(self, description):
+        with self._lock:
+            self.errors[description] = self.errors.get(description, 0) + 1
+            self.turns += 1
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+            self.turns += 1
+
+
+class VirtualUser(threading.Thread):
+    """
+    Một người dùng: kết nối keep-alive và cookie phiên riêng, chạy kịch bản cho đến khi hết thời gian.
+    """
+
+    def __init__(self, index, host, port, stats, deadline, think_time, poll_interval):
+        super().__init__(daemon=True)
+        self.index = index
+        self.host, self.port = host, port
+        self.stats = stats
+        self.deadline = deadline
+        self.think_time = think_time
+        self.poll_interval = poll_interval
+        self.random = random.Random(index)
+        self.cookie = None
+        self.connection = None
+
+    def request(self, method, path, body=None):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=120)
+        headers = {"Content-Type": "application/json"}
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        try:
+            self.connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+            response = self.connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            raise
+        set_cookie = response.getheader("Set-Cookie")
+        if set_cookie:
+            cookie = SimpleCookie(set_cookie)
+            if "session_id" in cookie:
+                self.cookie = f"session_id={cookie['session_id'].value}"
+        return response.status, response.getheader("Location"), content
+
+    def confirm(self):
+        # "xác nhận" trả 202 + job (render bất đồng bộ) hoặc bản thiết kế ngay; chờ đến khi có bản thiết kế
+        status, location, content = self.request("POST", "/api/chat", {"message": "xác nhận"})
+        if status == 202 and location:
+            result_url = json.loads(content)["result_url"]
+            while time.monotonic() < self.deadline + 60:
+                time.sleep(self.poll_interval)
+                status, _, content = self.request("GET", result_url)
+                if status != 202:
+                    break
+        return status
+
+    def run(self):
+        room = {"w": 8 + self.index % ROOM_VARIANTS, "h": 6 + self.index % 7}
+        while time.monotonic() < self.deadline:
+            self.cookie = None  # Mỗi kịch bản là một phiên mới
+            for message in self.random.choice(SCRIPTS):
+                if time.monotonic() >= self.deadline:
+                    return
+                kind = message_kind(message)
+                start = time.perf_counter()
+                try:
+                    if kind == "confirm":
+                        status = self.confirm()
+                    else:
+                        status = self.request("POST", "/api/chat", {"message": message.format(**room)})[0]
+                except (OSError, http.client.HTTPException) as e:
+                    self.stats.error(type(e).__name__)
+                    continue
+                elapsed = time.perf_counter() - start
+                if status == 503:
+                    self.stats.reject()
+                elif status >= 400:
+                    self.stats.error(f"HTTP {status}")
+                else:
+                    self.stats.record(kind, elapsed)
+                if self.think_time:
+                    time.sleep(self.random.uniform(0, 2 * self.think_time))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, env):
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVER, str(port)], cwd=BACKEND_DIR, env={**os.environ, **env},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App dừng khi khởi động (mã {process.returncode})")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("App không khởi động kịp trong 60 giây")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tải thử /api/chat bằng các kịch bản hội thoại")
+    parser.add_argument("--url", help="Địa chỉ instance có sẵn (mặc định tự khởi động app)")
+    parser.add_argument("--users", type=int, default=8, help="Số người dùng ảo chạy song song")
+    parser.add_argument("--duration", type=float, default=20, help="Thời gian chạy (giây)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Thời gian nghĩ trung bình giữa hai lượt (giây)")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="Chu kỳ hỏi kết quả job render (giây)")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Chu kỳ đo DESIGN_FOLDER (giây)")
+    parser.add_argument("--design-folder", default=DESIGN_FOLDER, help="Thư mục thiết kế cần theo dõi")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Biến môi trường cho app tự khởi động (có thể lặp lại)")
+    parser.add_argument("--output", help="Ghi kết quả JSON ra file")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        server = start_server(port, dict(item.split("=", 1) for item in args.env))
+
+    stats = Stats()
+    timeline = []
+    try:
+        started = time.monotonic()
+        deadline = started + args.duration
+        users = [VirtualUser(i, host, port, stats, deadline, args.think_time, args.poll_interval)
+                 for i in range(args.users)]
+        for user in users:
+            user.start()
+        while any(user.is_alive() for user in users):
+            size, files = folder_usage(args.design_folder)
+            timeline.append({"t": round(time.monotonic() - started, 1), "bytes": size, "files": files,
+                             "turns": stats.turns})
+            time.sleep(args.sample_interval)
+        elapsed = time.monotonic() - started
+        size, files = folder_usage(args.design_folder)
+        timeline.append({"t": round(elapsed, 1), "bytes": size, "files": files, "turns": stats.turns})
+    finally:
+        if server is not None:
+            # SIGINT để app thoát bình thường và đóng process pool render (SIGTERM để lại các worker mồ côi)
+            server.send_signal(signal.SIGINT)
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    results = {}
+    for kind, latencies in sorted(stats.latencies.items()):
+        latencies.sort()
+        results[kind] = {
+            "count": len(latencies),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p90_ms": round(percentile(latencies, 0.90) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2),
+        }
+    error_count = sum(stats.errors.values())
+    summary = {
+        "users": args.users,
+        "duration_s": round(elapsed, 2),
+        "turns": stats.turns,
+        "throughput_per_s": round(stats.turns / elapsed, 2),
+        "error_rate": round(error_count / stats.turns, 4) if stats.turns else 0.0,
+        "errors": stats.errors,
+        "rejected": stats.rejected,
+        "design_folder_peak_bytes": max(sample["bytes"] for sample in timeline),
+    }
+
+    print(f"{args.users} người dùng, {summary['duration_s']} s: {stats.turns} lượt, "
+          f"{summary['throughput_per_s']} lượt/s, lỗi {summary['error_rate']:.2%}, bị từ chối (503) {stats.rejected}")
+    if stats.errors:
+        print(f"  lỗi: {stats.errors}")
+    print(f"{'loại':<10}{'số lượt':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for kind, case in results.items():
+        print(f"{kind:<10}{case['count']:>9}{case['p50_ms']:>10.1f}{case['p90_ms']:>10.1f}"
+              f"{case['p99_ms']:>10.1f}{case['max_ms']:>10.1f}")
+    print(f"\nDESIGN_FOLDER ({args.design_folder})")
+    print(f"{'giây':>6}{'file':>7}{'KiB':>10}{'lượt':>8}")
+    step = max(1, len(timeline) // 20)  # In tối đa khoảng 20 mốc
+    for sample in timeline[::step] + ([timeline[-1]] if (len(timeline) - 1) % step else []):
+        print(f"{sample['t']:>6}{sample['files']:>7}{sample['bytes'] / 1024:>10.1f}{sample['turns']:>8}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "summary": summary, "latency": results, "design_folder": timeline},
+                      f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
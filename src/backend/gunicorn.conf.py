@@ -0,0 +1,53 @@
+"""
+Cấu hình gunicorn (chạy trong src/backend): gunicorn -c gunicorn.conf.py
+
+Biến môi trường:
+  HOST, PORT                  Địa chỉ lắng nghe (mặc định 0.0.0.0:5000)
+  WEB_CONCURRENCY             Số process web (mặc định 1). Nhiều hơn 1 cần SESSION_BACKEND=sqlite: phiên, trạng thái
+                              job và bố trí gần nhất của từng phiên được dùng chung qua file SQLite, bản thiết kế qua
+                              DESIGN_FOLDER (xem app.py). Đặt số process bằng biến này, không dùng -w/--workers.
+  WEB_THREADS                 Số thread mỗi process web (mặc định 4); lượt chat rẻ không phải chờ các request
+                              đang chờ render
+  WEB_TIMEOUT                 Giây trước khi worker không phản hồi bị khởi động lại (mặc định 120)
+  WEB_GRACEFUL_TIMEOUT        Giây chờ các request/job render đang chạy khi tắt (mặc định 30)
+  PRELOAD_MODELS=1            Import app (và warm-up NLP) trong master trước khi fork; mỗi worker khởi động sẵn
+                              các process render của mình
+Các biến còn lại (RENDER_WORKERS, RENDER_ASYNC, LOG_LEVEL, ...) do app.py đọc.
+"""
+import os
+
+wsgi_app = "wsgi:application"
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+# Một process (nhiều thread) là mặc định: với SESSION_BACKEND=memory mọi trạng thái nằm trong bộ nhớ của process đó
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+threads = int(os.environ.get("WEB_THREADS", "4"))
+worker_class = "gthread"
+timeout = int(os.environ.get("WEB_TIMEOUT", "120"))
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", "30"))
+preload_app = os.environ.get("PRELOAD_MODELS", "0") == "1"
+# Log request đã được app ghi (kèm request id); gunicorn chỉ ghi log lỗi
+accesslog = None
+errorlog = "-"
+
+
+def on_starting(server):
+    # Dừng ngay khi khởi động thay vì để người dùng mất phiên/job khi request rơi vào process khác
+    if server.cfg.workers != workers:
+        raise RuntimeError(
+            f"Đặt số process web bằng WEB_CONCURRENCY (app đọc biến này), không dùng -w {server.cfg.workers}"
+        )
+    if workers > 1 and os.environ.get("SESSION_BACKEND", "memory").lower() != "sqlite":
+        raise RuntimeError(f"WEB_CONCURRENCY={workers} cần SESSION_BACKEND=sqlite (phiên dùng chung giữa các process)")
+
+
+def post_worker_init(worker):
+    from app import start_worker
+
+    start_worker()
+
+
+def worker_exit(server, worker):
+    # Chạy khi worker tắt êm (SIGTERM/SIGHUP tới master): chờ job render, xóa các file thiết kế đã hết hạn
+    from app import shutdown
+
+    shutdown()
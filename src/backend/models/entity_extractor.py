@@ -0,0 +1,127 @@
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# Từ khóa nội thất mở đầu một thực thể
+FURNITURE_KEYWORDS = ("phòng", "bàn", "ghế", "lối", "quầy", "giữa")
+
+# Từ ghép chứa từ khóa nội thất mà underthesea luôn gộp thành một token (khi đó từ khóa không được nhận diện).
+# Lấy từ từ điển Viet74K của underthesea: các mục được gộp trong mọi ngữ cảnh thử nghiệm
+# (trừ "phòng không", vì "phòng không có quầy lễ tân" thì không bị gộp).
+COMPOUND_WORDS = (
+    "biên phòng", "bàn bạc", "bàn chân", "bàn cãi", "bàn ghế", "bàn giao", "bàn giản", "bàn lui", "bàn luận",
+    "bàn mai", "bàn mưu", "bàn nàn", "bàn tay", "bàn thạch", "bàn thờ", "bàn tiện", "bàn tán", "bàn tính",
+    "bàn đi tính lại", "bàn đạc", "bàn định", "bàn ủi", "bồi bàn", "bồi phòng", "canh phòng", "dân phòng",
+    "dự phòng", "ghế đẳng", "hai bàn tay trắng", "hải phòng", "kiệt lối", "liên phòng", "lạc lối", "lạm bàn",
+    "lối thoát", "lối xóm", "phòng bệnh", "phòng chống", "phòng dịch", "phòng hộ", "phòng khám",
+    "phòng mạch", "phòng ngừa", "phòng ngự", "phòng thân", "phòng thí nghiệm", "phòng trừ", "phòng vệ",
+    "phòng ốc", "quốc phòng", "rừng phòng hộ", "văn phòng", "văn phòng phẩm", "xà phòng", "đường lối",
+    "đề phòng", "địa bàn",
+)
+
+# Cùng thứ tự ưu tiên với regex_tokenize của underthesea cho văn bản chỉ gồm chữ, số và khoảng trắng:
+# kích thước "10x8", số "10", rồi từ "m", "cm3", "x10m"
+TOKEN_PATTERN = re.compile(r"\d+x\d+|\d+|\w+")
+
+
+@dataclass
+class Entity:
+    """
+    Một thực thể nhận diện được: từ khóa nội thất và chuỗi kích thước/đơn vị đi sau nó.
+    """
+    __slots__ = ("type", "value")
+    type: str
+    value: str
+
+
+class RuleTokenizer:
+    """
+    Tách từ bằng regex đã biên dịch và trie từ ghép, thay cho pos_tag của underthesea.
+    NLPModel chỉ dùng từ (không dùng nhãn từ loại), nên chỉ cần tách từ giống underthesea
+    ở những chỗ ảnh hưởng kết quả: từ khóa đứng riêng và số tách khỏi đơn vị ("10x8m" -> "10x8", "m").
+    """
+
+    def __init__(self, compounds=COMPOUND_WORDS):
+        """
+        :param compounds: Các từ ghép (nhiều âm tiết) được gộp thành một token.
+        """
+        self.trie = {}
+        for compound in compounds:
+            node = self.trie
+            for syllable in compound.split():
+                node = node.setdefault(syllable, {})
+            node[None] = compound  # Đánh dấu kết thúc từ ghép
+
+    def tokenize(self, text):
+        """
+        :param text: Văn bản đã qua NLPModel.preprocess_text.
+        :return: Danh sách từ, từ ghép dài nhất được gộp trước.
+        """
+        syllables = TOKEN_PATTERN.findall(unicodedata.normalize("NFC", text))
+        words = []
+        i = 0
+        while i < len(syllables):
+            node, match, end = self.trie, None, i
+            for j in range(i, len(syllables)):
+                node = node.get(syllables[j])
+                if node is None:
+                    break
+                if None in node:
+                    match, end = node[None], j + 1
+            if match is None:
+                words.append(syllables[i])
+                i += 1
+            else:
+                words.append(match)
+                i = end
+        return words
+
+
+def underthesea_tokenize(text):
+    """
+    Tách từ bằng pos_tag của underthesea (chậm, giữ lại làm phương án dự phòng và để đối chiếu).
+    """
+    from underthesea import pos_tag
+
+    words = pos_tag(text)
+    logger.debug("Underthesea POS Tagging: %s", words)  # Kết quả gán nhãn từ loại
+    return [word for word, tag in words]
+
+
+_rule_tokenizer = RuleTokenizer()
+
+# Tên engine -> hàm tách từ
+TOKENIZERS = {
+    "rules": _rule_tokenizer.tokenize,
+    "underthesea": underthesea_tokenize,
+}
+
+
+def extract_entities(text, engine="rules"):
+    """
+    Nhận diện các thực thể từ văn bản đã qua NLPModel.preprocess_text.
+    :param engine: Khóa của TOKENIZERS.
+    :return: Danh sách Entity theo thứ tự xuất hiện.
+    """
+    # Tách từ bằng engine đã chọn (chỉ cần từ, không cần nhãn từ loại)
+    words = TOKENIZERS[engine](text)
+
+    detected_entities = []
+    current_entity = None
+
+    for word in words:
+        if word in FURNITURE_KEYWORDS:
+            if current_entity:
+                detected_entities.append(current_entity)
+            current_entity = Entity(word, "")
+        elif any(char.isdigit() for char in word) or "x" in word or "cm" in word or "m" in word:
+            if current_entity:
+                current_entity.value += f"{word} "
+    if current_entity:
+        detected_entities.append(current_entity)
+
+    logger.debug("Detected entities: %s", detected_entities)
+    return detected_entities
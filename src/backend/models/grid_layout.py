@@ -0,0 +1,185 @@
+import numpy as np
+
+from models.spatial_index import build_obstacle_index
+
+
+def grid_axis(start, step):
+    """
+    Các tọa độ start, start - step, start - 2*step, ... còn >= 0.
+    Dùng np.subtract.accumulate để kết quả trùng khớp từng bit với phép trừ lặp trong vòng while.
+    :param start: Tọa độ đầu tiên.
+    :param step: Bước lùi (> 0).
+    :return: Mảng 1 chiều các tọa độ.
+    """
+    if start < 0:
+        return np.empty(0)
+    count = int(start // step) + 2  # Dư một phần tử để bù sai số làm tròn
+    values = np.subtract.accumulate(np.concatenate(([start], np.full(count, step))))
+    return values[values >= 0]
+
+
+def compute_grid_boxes(room_w, room_h, box_w, box_h, desk_w, desk_h, aisle_dist, gap, obstacle_index=None):
+    """
+    Tính toàn bộ bounding box của lưới trong một lần, cùng thứ tự với LayoutEngine.optimize_bounding_boxes:
+    các dãy từ dưới lên trên (theo y giảm dần), trong mỗi dãy từ phải sang trái.
+    :param room_w: Chiều rộng phòng.
+    :param room_h: Chiều cao phòng.
+    :param box_w: Chiều rộng bounding box.
+    :param box_h: Chiều cao bounding box.
+    :param desk_w: Chiều rộng quầy lễ tân (0 nếu không có).
+    :param desk_h: Chiều cao quầy lễ tân (0 nếu không có).
+    :param aisle_dist: Khoảng cách lối đi giữa các dãy.
+    :param gap: Khoảng cách giữa các bàn trong một dãy.
+    :param obstacle_index: SpatialIndex chứa quầy lễ tân và các vật cản; mặc định chỉ gồm quầy lễ tân.
+    :return: Mảng (N, 4) các bounding box [x, y, width, height].
+    """
+    xs = grid_axis(room_w - box_w, box_w + gap)
+    ys = grid_axis(room_h - box_h, box_h + aisle_dist)
+
+    grid_x, grid_y = np.meshgrid(xs, ys)  # Hàng = dãy, cột = vị trí trong dãy
+    boxes = np.empty((grid_x.size, 4))
+    boxes[:, 0] = grid_x.ravel()
+    boxes[:, 1] = grid_y.ravel()
+    boxes[:, 2] = box_w
+    boxes[:, 3] = box_h
+
+    # Loại các box chồng lên vật cản
+    if obstacle_index is None:
+        obstacle_index = build_obstacle_index(room_w, room_h, desk_w, desk_h)
+    return boxes[~obstacle_index.query_mask(boxes)]
+
+
+def place_entities_array(boxes, table_w, table_h, chair_w, chair_h, gap=5):
+    """
+    Phiên bản vector hóa của LayoutEngine.place_entities_from_boxes cho hướng 0 độ (bàn trên, ghế dưới).
+    :param boxes: Mảng (N, 4) các bounding box.
+    :param gap: Khoảng cách giữa bàn và ghế.
+    :return: (tables, chairs) - mảng (N, 4) vị trí bàn và mảng (M, 4) vị trí ghế nằm trong bounding box.
+    """
+    tables, chairs, inside = place_cell_entities(boxes, table_w, table_h, chair_w, chair_h, gap)
+    return tables, chairs[inside]
+
+
+def place_cell_entities(boxes, table_w, table_h, chair_w, chair_h, gap=5):
+    """
+    Như place_entities_array nhưng giữ một ghế cho mỗi box (kể cả ghế không vừa), để so sánh bố trí theo từng ô lưới.
+    :return: (tables, chairs, inside) - hai mảng (N, 4) và mặt nạ (N,) các ghế nằm trong bounding box.
+    """
+    box_x, box_y, box_w, box_h = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+
+    tables = np.empty((len(boxes), 4))
+    tables[:, 0] = box_x
+    tables[:, 1] = box_y + box_h - table_h
+    tables[:, 2] = table_w
+    tables[:, 3] = table_h
+
+    chair_x = box_x + (table_w - chair_w) / 2
+    chair_y = box_y + box_h - table_h - chair_h - gap
+    inside = (box_x <= chair_x) & (chair_x <= box_x + box_w - chair_w) & \
+        (box_y <= chair_y) & (chair_y <= box_y + box_h - chair_h)
+
+    chairs = np.empty((len(boxes), 4))
+    chairs[:, 0] = chair_x
+    chairs[:, 1] = chair_y
+    chairs[:, 2] = chair_w
+    chairs[:, 3] = chair_h
+    return tables, chairs, inside
+
+
+# Thứ tự cột của một cấu hình trong evaluate_grid_batch
+CONFIG_COLUMNS = (
+    "room_w", "room_h", "table_w", "table_h", "chair_w", "chair_h", "gap", "aisle", "desk_w", "desk_h"
+)
+
+
+def _axis_count(start, step):
+    """
+    Số tọa độ >= 0 của dãy start, start - step, ... (dạng đóng, cho cả batch).
+    """
+    return np.where(start >= 0, np.floor(start / step) + 1, 0).astype(np.int64)
+
+
+def _compact(values, keep):
+    """
+    Dồn các phần tử được giữ lại về đầu mỗi hàng (giữ nguyên thứ tự), phần còn lại đệm 0.
+    :param values: Mảng (B, K, 4).
+    :param keep: Mặt nạ (B, K).
+    :return: (padded, mask) với padded có dạng (B, N_max, 4).
+    """
+    counts = keep.sum(axis=1)
+    n_max = int(counts.max()) if len(counts) else 0
+    order = np.argsort(~keep, axis=1, kind="stable")[:, :n_max]
+    padded = np.take_along_axis(values, order[:, :, None], axis=1)
+    mask = np.arange(n_max)[None, :] < counts[:, None]
+    padded[~mask] = 0
+    return padded, mask
+
+
+def evaluate_grid_batch(configs, chair_gap=5, with_coordinates=True):
+    """
+    Đánh giá bố trí lưới cho nhiều cấu hình cùng lúc (vector hóa theo batch).
+    :param configs: Mảng (B, 10) theo thứ tự CONFIG_COLUMNS, đơn vị cm; desk_w = 0 nếu không có quầy lễ tân.
+    :param chair_gap: Khoảng cách giữa bàn và ghế (giống place_entities_array).
+    :param with_coordinates: False để chỉ tính số lượng và hiệu suất, không sinh tọa độ.
+    :return: Dict gồm "seats", "tables", "efficiency" (mảng (B,)) và nếu with_coordinates:
+             "table_boxes", "chair_boxes" (B, N_max, 4) đệm 0 cùng "table_mask", "chair_mask" (B, N_max).
+    """
+    configs = np.asarray(configs, dtype=np.float64).reshape(-1, len(CONFIG_COLUMNS))
+    room_w, room_h, table_w, table_h, chair_w, chair_h, gap, aisle, desk_w, desk_h = configs.T
+
+    box_w = table_w
+    box_h = table_h + chair_h + gap
+    x0, y0 = room_w - box_w, room_h - box_h
+    step_x, step_y = box_w + gap, box_h + aisle
+    n_cols, n_rows = _axis_count(x0, step_x), _axis_count(y0, step_y)
+
+    max_cols = int(n_cols.max()) if len(configs) else 0
+    max_rows = int(n_rows.max()) if len(configs) else 0
+    xs = x0[:, None] - np.arange(max_cols)[None, :] * step_x[:, None]  # (B, C)
+    ys = y0[:, None] - np.arange(max_rows)[None, :] * step_y[:, None]  # (B, R)
+    col_valid = np.arange(max_cols)[None, :] < n_cols[:, None]
+    row_valid = np.arange(max_rows)[None, :] < n_rows[:, None]
+
+    # Các cột/dãy chạm vào quầy lễ tân ở góc trên bên trái
+    has_desk = (desk_w > 0)[:, None]
+    col_in_desk = col_valid & has_desk & (xs < desk_w[:, None])
+    row_in_desk = row_valid & has_desk & (ys + box_h[:, None] > (room_h - desk_h)[:, None])
+
+    # Ghế chỉ được giữ nếu nằm trọn trong bounding box (không phụ thuộc vị trí box)
+    chair_dx = (table_w - chair_w) / 2
+    chair_dy = box_h - table_h - chair_h - chair_gap
+    chair_fits = (chair_dx >= 0) & (chair_dx <= box_w - chair_w) & (chair_dy >= 0) & (chair_dy <= box_h - chair_h)
+
+    n_tables = n_rows * n_cols - row_in_desk.sum(axis=1) * col_in_desk.sum(axis=1)
+    n_chairs = np.where(chair_fits, n_tables, 0)
+    used_area = n_tables * table_w * table_h + n_chairs * chair_w * chair_h
+    with np.errstate(divide="ignore", invalid="ignore"):
+        efficiency = np.where(room_w * room_h > 0, used_area / (room_w * room_h) * 100, 0.0)
+
+    result = {"seats": n_chairs, "tables": n_tables, "efficiency": efficiency}
+    if not with_coordinates:
+        return result
+
+    batch = len(configs)
+    cell_x = np.broadcast_to(xs[:, None, :], (batch, max_rows, max_cols))
+    cell_y = np.broadcast_to(ys[:, :, None], (batch, max_rows, max_cols))
+    keep = row_valid[:, :, None] & col_valid[:, None, :] & ~(row_in_desk[:, :, None] & col_in_desk[:, None, :])
+    keep = keep.reshape(batch, -1)
+    cell_x = cell_x.reshape(batch, -1)
+    cell_y = cell_y.reshape(batch, -1)
+
+    tables = np.empty(cell_x.shape + (4,))
+    tables[..., 0] = cell_x
+    tables[..., 1] = cell_y + box_h[:, None] - table_h[:, None]
+    tables[..., 2] = table_w[:, None]
+    tables[..., 3] = table_h[:, None]
+
+    chairs = np.empty(cell_x.shape + (4,))
+    chairs[..., 0] = cell_x + chair_dx[:, None]
+    chairs[..., 1] = cell_y + chair_dy[:, None]
+    chairs[..., 2] = chair_w[:, None]
+    chairs[..., 3] = chair_h[:, None]
+
+    result["table_boxes"], result["table_mask"] = _compact(tables, keep)
+    result["chair_boxes"], result["chair_mask"] = _compact(chairs, keep & chair_fits[:, None])
+    return result
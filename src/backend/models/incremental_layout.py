@@ -0,0 +1,173 @@
+import numpy as np
+
+from models.grid_layout import grid_axis, place_cell_entities
+from models.spatial_index import SpatialIndex
+
+
+def _lattice_boxes(xs, ys, box_w, box_h):
+    # Các box của lưới ys x xs, cùng thứ tự với compute_grid_boxes (hàng = dãy, cột = vị trí trong dãy)
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    boxes = np.empty((grid_x.size, 4))
+    boxes[:, 0] = grid_x.ravel()
+    boxes[:, 1] = grid_y.ravel()
+    boxes[:, 2] = box_w
+    boxes[:, 3] = box_h
+    return boxes
+
+
+def _obstacle_rects(obstacles):
+    # Các vật cản dạng tuple float, bỏ hình có diện tích 0 (giống build_obstacle_index), chưa dựng chỉ mục:
+    # chỉ các vật cản cắt dãy cần kiểm tra mới được đưa vào SpatialIndex
+    rects = []
+    for obstacle in obstacles:
+        if isinstance(obstacle, dict):
+            obstacle = [obstacle["x"], obstacle["y"], obstacle["width"], obstacle["height"]]
+        rect = tuple(float(v) for v in obstacle)
+        if rect[2] > 0 and rect[3] > 0:
+            rects.append(rect)
+    return tuple(rects)
+
+
+def _row_hits(ys, box_h, rects):
+    """
+    Dãy nào có phần giao dương theo trục y với hình chữ nhật nào (cùng điều kiện chặt như SpatialIndex):
+    một dãy không thể chồng lên hình không cắt nó theo trục y.
+    :return: Mặt nạ bool (len(ys), len(rects)).
+    """
+    rects = np.array(list(rects), dtype=np.float64).reshape(-1, 4)
+    oy, oh = rects[None, :, 1], rects[None, :, 3]
+    return (ys[:, None] < oy + oh) & (ys[:, None] + box_h > oy)
+
+
+class GridLayoutState:
+    """
+    Bố trí lưới (mode "grid") đã tính của một bộ thông số, giữ ở dạng ô lưới: tọa độ các dãy (ys), các vị trí trong dãy
+    (xs) và mặt nạ ô còn trống (không chồng vật cản). Mỗi bàn/ghế gắn với một ô (dãy, cột), nhờ đó lần tính sau dùng lại
+    được phần lưới không đổi và hai bố trí so sánh được theo từng ô.
+    """
+
+    def __init__(self, parameters, xs, ys, free, obstacles, extra_obstacles):
+        """
+        :param parameters: LayoutParameters đã dùng để tính.
+        :param xs: Tọa độ x các ô (theo grid_axis).
+        :param ys: Tọa độ y các dãy (theo grid_axis).
+        :param free: Mặt nạ bool (len(ys), len(xs)) các ô không chồng vật cản.
+        :param obstacles: Các hình chữ nhật vật cản đã kiểm tra (quầy lễ tân đứng đầu nếu có), dạng tuple.
+        :param extra_obstacles: Phần của obstacles lấy từ parameters.obstacles (không gồm quầy lễ tân).
+        """
+        room_w, room_h, table_w, table_h, chair_w, chair_h, gap, aisle, desk_w, desk_h = parameters.config_vector()
+        self.parameters = parameters
+        self.xs = xs
+        self.ys = ys
+        self.free = free
+        self.obstacles = obstacles
+        self.extra_obstacles = extra_obstacles
+        self.box = (table_w, table_h + chair_h + gap)
+        # Thông số quyết định từng trục: trục không đổi thì dùng lại nguyên xs/ys
+        self.x_key = (room_w, self.box[0], gap)
+        self.y_key = (room_h, self.box[1], aisle)
+        self.reception = None if desk_w == 0 else np.array([0, room_h - desk_h, desk_w, desk_h], dtype=np.float32)
+
+        shape = (len(ys), len(xs), 4)
+        tables, chairs, inside = place_cell_entities(
+            _lattice_boxes(xs, ys, *self.box), table_w, table_h, chair_w, chair_h
+        )
+        # float32 giống LayoutEngine.compute(), nên so sánh ô và kết quả trả về cùng một giá trị
+        self.cell_tables = tables.astype(np.float32).reshape(shape)
+        self.cell_chairs = chairs.astype(np.float32).reshape(shape)
+        self.seated = free & inside.reshape(free.shape)
+
+    def layout(self):
+        """
+        :return: (tables, chairs, reception) giống hệt LayoutEngine(parameters).compute() ở mode "grid".
+        """
+        return self.cell_tables[self.free], self.cell_chairs[self.seated], self.reception
+
+
+def compute_grid_state(parameters, previous=None):
+    """
+    Tính bố trí lưới, dùng lại phần không đổi của bố trí trước:
+      - trục x (phòng, bàn, khoảng cách giữa các bàn) hay trục y (phòng, box, lối đi) không đổi thì giữ nguyên tọa độ,
+        ví dụ đổi lối đi chỉ tính lại bước giữa các dãy;
+      - lưới không đổi thì chỉ kiểm tra lại vật cản cho các dãy cắt quầy lễ tân/vật cản vừa thêm hoặc bớt;
+      - lưới đổi thì chỉ kiểm tra các dãy cắt một vật cản, các dãy còn lại để trống hết.
+    :param parameters: LayoutParameters mới.
+    :param previous: GridLayoutState của lần tính trước (cùng phiên) hoặc None.
+    :return: (GridLayoutState, số dãy đã kiểm tra vật cản).
+    """
+    room_w, room_h, table_w, table_h, chair_w, chair_h, gap, aisle, desk_w, desk_h = parameters.config_vector()
+    box_w, box_h = table_w, table_h + chair_h + gap
+    if previous is not None and previous.parameters.obstacles == parameters.obstacles:
+        extra = previous.extra_obstacles
+    else:
+        extra = _obstacle_rects(parameters.obstacles)
+    # Quầy lễ tân luôn ở góc trên bên trái
+    obstacles = ((0.0, room_h - desk_h, desk_w, desk_h),) + extra if desk_w > 0 and desk_h > 0 else extra
+
+    same_x = previous is not None and previous.x_key == (room_w, box_w, gap)
+    same_y = previous is not None and previous.y_key == (room_h, box_h, aisle)
+    xs = previous.xs if same_x else grid_axis(room_w - box_w, box_w + gap)
+    ys = previous.ys if same_y else grid_axis(room_h - box_h, box_h + aisle)
+
+    if same_x and same_y:
+        free = previous.free.copy()
+        rows = _row_hits(ys, box_h, set(obstacles) ^ set(previous.obstacles)).any(axis=1)
+    else:
+        free = np.ones((len(ys), len(xs)), dtype=bool)
+        rows = _row_hits(ys, box_h, obstacles).any(axis=1)
+    checked = np.flatnonzero(rows)
+    if len(checked) and len(xs):
+        # Mỗi dãy chỉ so với các vật cản cắt nó theo trục y (thường ít, nên SpatialIndex so khớp thẳng bằng NumPy)
+        hits = _row_hits(ys[checked], box_h, obstacles)
+        for row, nearby in zip(checked, hits):
+            index = SpatialIndex(rects=[rect for rect, hit in zip(obstacles, nearby) if hit])
+            free[row] = ~index.query_mask(_lattice_boxes(xs, ys[row:row + 1], box_w, box_h))
+    return GridLayoutState(parameters, xs, ys, free, obstacles, extra), len(checked)
+
+
+def _pad(array, shape, fill):
+    # Mở rộng mảng ô (dãy, cột, ...) lên shape để so sánh hai lưới khác kích thước
+    padded = np.full(shape + array.shape[2:], fill, dtype=array.dtype)
+    padded[:array.shape[0], :array.shape[1]] = array
+    return padded
+
+
+def diff_grid_states(previous, current):
+    """
+    So sánh hai bố trí lưới theo từng ô (dãy, cột): ô chỉ có ở một bên là thêm/bớt, ô có ở cả hai nhưng khác tọa độ
+    (ví dụ các dãy dịch khi đổi lối đi) là di chuyển.
+    :return: Dict diff (xem diff_layouts).
+    """
+    shape = (max(len(previous.ys), len(current.ys)), max(len(previous.xs), len(current.xs)))
+    diff = {"added": {}, "removed": {}, "moved": {}, "unchanged": {}}
+    for name, cells, present in (("tables", "cell_tables", "free"), ("chairs", "cell_chairs", "seated")):
+        before, after = _pad(getattr(previous, present), shape, False), _pad(getattr(current, present), shape, False)
+        old, new = _pad(getattr(previous, cells), shape, 0), _pad(getattr(current, cells), shape, 0)
+        both = before & after
+        moved = both & (old != new).any(axis=-1)
+        diff["added"][name] = new[after & ~before].tolist()
+        diff["removed"][name] = old[before & ~after].tolist()
+        diff["moved"][name] = {"from": old[moved].tolist(), "to": new[moved].tolist()}
+        diff["unchanged"][name] = int((both & ~moved).sum())
+    return diff
+
+
+def diff_layouts(previous, current):
+    """
+    So sánh hai bố trí bất kỳ (mọi mode) bằng cách so khớp đúng tọa độ; không có thông tin ô nên không nhận ra được
+    bàn/ghế di chuyển (thành một bớt và một thêm).
+    :param previous: (tables, chairs) của bố trí trước.
+    :param current: (tables, chairs) của bố trí mới.
+    :return: Dict {"added", "removed": {"tables": [...], "chairs": [...]},
+             "moved": {"tables": {"from": [...], "to": [...]}, "chairs": ...}, "unchanged": {"tables": n, "chairs": n}},
+             tọa độ dạng [x, y, width, height] (cm); from[i] và to[i] là cùng một bàn/ghế.
+    """
+    diff = {"added": {}, "removed": {}, "moved": {}, "unchanged": {}}
+    for name, old, new in zip(("tables", "chairs"), previous, current):
+        old_boxes, new_boxes = old.tolist(), new.tolist()
+        old_keys, new_keys = set(map(tuple, old_boxes)), set(map(tuple, new_boxes))
+        diff["added"][name] = [box for box in new_boxes if tuple(box) not in old_keys]
+        diff["removed"][name] = [box for box in old_boxes if tuple(box) not in new_keys]
+        diff["moved"][name] = {"from": [], "to": []}
+        diff["unchanged"][name] = len(new_boxes) - len(diff["added"][name])
+    return diff
@@ -0,0 +1,514 @@
+import logging
+
+import numpy as np
+
+from models.grid_layout import compute_grid_boxes, place_entities_array, evaluate_grid_batch
+from models.layout_optimizer import LayoutOptimizer
+from models.spatial_index import build_obstacle_index
+from models.parameters import LayoutParameters
+
+logger = logging.getLogger(__name__)
+
+LAYOUT_MODES = ("grid", "optimize", "refine")
+
+
+def _as_boxes(positions):
+    # Danh sách/mảng [x, y, width, height] -> mảng (N, 4) float32 (kể cả khi rỗng)
+    return np.asarray(positions, dtype=np.float32).reshape(-1, 4)
+
+
+class LayoutEngine:
+    """
+    Lõi tính bố trí quán net chỉ dùng Python/NumPy: trả về các mảng (N, 4) float32 gọn nhẹ.
+    Không phụ thuộc torch, nên process worker render chỉ cần nạp NumPy; NetCafeModel (models.NCD_model)
+    là lớp bọc mỏng trả về tensor cho code cũ.
+    """
+
+    def __init__(self, parameters, engine="vectorized", mode="grid", optimizer=None, refiner=None):
+        """
+        :param parameters: LayoutParameters (kích thước cm); dict dạng JSON cũ vẫn được chấp nhận.
+        :param engine: "vectorized" (NumPy, mặc định) hoặc "loop" (vòng lặp Python gốc, dùng để đối chiếu).
+        :param mode: "grid" (lưới hướng 0 như cũ), "optimize" (tìm hướng bàn, dãy back-to-back và lối đi)
+                     hoặc "refine" (tinh chỉnh vị trí bằng gradient từ lưới, cần torch).
+        :param optimizer: LayoutOptimizer dùng cho mode "optimize" (mặc định: time budget 0.15 s, seed 0).
+        :param refiner: LayoutRefiner dùng cho mode "refine" (mặc định: tối đa 2000 bước, time budget 2 s).
+        """
+        if engine not in ("vectorized", "loop"):
+            raise ValueError(f"Engine không hợp lệ: {engine}")
+        if mode not in LAYOUT_MODES:
+            raise ValueError(f"Mode không hợp lệ: {mode}")
+        if not isinstance(parameters, LayoutParameters):
+            parameters = LayoutParameters.from_dict(parameters)
+        self.parameters = parameters
+        self.engine = engine
+        self.mode = mode
+        self.optimizer = optimizer or LayoutOptimizer()
+        self.refiner = refiner
+        self.layout_description = {"strategy": "grid"}
+        logger.debug("Initialized LayoutEngine with parameters: %s", self.parameters)  # Debug thông số đầu vào
+
+    def config_vector(self):
+        """
+        Cấu hình số của bố trí cho evaluate_batch (thứ tự cột theo grid_layout.CONFIG_COLUMNS).
+        """
+        return self.parameters.config_vector()
+
+    def compute(self):
+        """
+        Tính toán bố trí phòng dựa trên thông số đầu vào.
+        :return: (tables, chairs, reception): mảng (N, 4) và (M, 4) float32 [x, y, width, height],
+                 reception là mảng (4,) float32 hoặc None nếu không có quầy lễ tân.
+        """
+        logger.debug("Bắt đầu tính toán bố trí...")  # Debug: Bắt đầu xử lý
+
+        try:
+            # Thông số đã là số (cm), không cần phân tích chuỗi
+            (room_w, room_h, table_w, table_h, chair_w, chair_h,
+             distance_bt, aisle_dist, desk_w, desk_h) = self.parameters.config_vector()
+            logger.debug(
+                "Kích thước phòng=%sx%s, bàn=%sx%s, ghế=%sx%s, quầy lễ tân=%sx%s, "
+                "khoảng cách giữa các bàn=%s, lối đi=%s",
+                room_w, room_h, table_w, table_h, chair_w, chair_h, desk_w, desk_h, distance_bt, aisle_dist
+            )
+
+            # Quầy lễ tân luôn ở góc trên bên trái
+            reception = None if desk_w == 0 else np.array([0, room_h - desk_h, desk_w, desk_h], dtype=np.float32)
+
+            # Tạo vị trí bàn và ghế
+            table_positions, chair_positions = self.generate_table_positions_and_chairs(
+                room_w, room_h, table_w, table_h, chair_w, chair_h, desk_w, desk_h, aisle_dist, distance_bt
+            )
+            tables = _as_boxes(table_positions)
+            chairs = _as_boxes(chair_positions)
+
+            logger.debug("Bố trí xong: %d bàn, %d ghế, quầy lễ tân: %s", len(tables), len(chairs), reception is not None)
+            return tables, chairs, reception
+        except Exception:
+            logger.exception("Lỗi trong quá trình tính toán")
+            raise
+
+    def evaluate_batch(self, configs, with_coordinates=True):
+        """
+        Đánh giá bố trí lưới cho nhiều cấu hình cùng lúc (xem grid_layout.evaluate_grid_batch).
+        :param configs: Mảng (B, 10) theo thứ tự grid_layout.CONFIG_COLUMNS, đơn vị cm.
+        :param with_coordinates: False để chỉ trả về số lượng và hiệu suất.
+        :return: Dict các mảng NumPy.
+        """
+        return evaluate_grid_batch(configs, with_coordinates=with_coordinates)
+
+    def generate_table_positions_and_chairs(self, room_w, room_h, table_w, table_h, chair_w, chair_h, desk_w, desk_h, aisle_dist, gap):
+        """
+        Tạo vị trí bàn và ghế dựa trên khung bounding box.
+        """
+        # Chỉ mục vật cản (quầy lễ tân + "obstacles" trong thông số) dùng cho mọi kiểm tra chồng lấn
+        obstacle_index = build_obstacle_index(room_w, room_h, desk_w, desk_h, self.parameters.obstacles)
+
+        if self.mode == "optimize":
+            result = self.optimizer.optimize(
+                room_w, room_h, table_w, table_h, chair_w, chair_h, desk_w, desk_h, aisle_dist, gap, obstacle_index
+            )
+            self.layout_description = result.description
+            return result.tables, result.chairs
+
+        if self.mode == "refine":
+            # Chỉ mode này cần torch: import khi dùng để các mode khác không phải nạp
+            from models.layout_refiner import LayoutRefiner
+
+            refiner = self.refiner or LayoutRefiner()
+            result = refiner.refine(
+                room_w, room_h, table_w, table_h, chair_w, chair_h, desk_w, desk_h, aisle_dist, gap, obstacle_index
+            )
+            self.layout_description = result.description
+            return result.tables, result.chairs
+
+        # Tạo khung bounding box cho từng bàn và ghế
+        bounding_box = self.create_bounding_boxes(table_w, table_h, chair_h, gap)
+
+        if self.engine == "vectorized":
+            # Tính toàn bộ lưới bằng NumPy, kết quả trùng với vòng lặp bên dưới
+            boxes = compute_grid_boxes(
+                room_w, room_h, bounding_box["width"], bounding_box["height"], desk_w, desk_h, aisle_dist, gap,
+                obstacle_index
+            )
+            return place_entities_array(boxes, table_w, table_h, chair_w, chair_h)
+
+        # Tối ưu hóa việc đặt các khung trong phòng
+        bounding_boxes = self.optimize_bounding_boxes(
+            room_w, room_h, bounding_box, desk_w, desk_h, aisle_dist, gap, obstacle_index
+        )
+
+        # Từ các bounding box, vẽ bàn và ghế
+        table_positions, chair_positions = self.place_entities_from_boxes(bounding_boxes, table_w, table_h, chair_w, chair_h)
+        return table_positions, chair_positions
+
+    def create_bounding_boxes(self, table_w, table_h, chair_h, gap):
+        """
+        Tạo khung bounding box cho bàn và ghế, kèm theo thông tin hướng.
+        :param table_w: Chiều rộng của bàn.
+        :param table_h: Chiều cao của bàn.
+        :param chair_h: Chiều cao của ghế.
+        :param gap: Khoảng cách giữa bàn và ghế.
+        :return: Bounding box chứa thông tin width, height, và orientation.
+        """
+        frame_w = table_w
+        frame_h = table_h + chair_h + gap
+        orientation = 0  # Hướng mặc định là 0 độ
+        logger.debug("Tạo khung bounding box: width=%s, height=%s, orientation=%s", frame_w, frame_h, orientation)
+        return {"width": frame_w, "height": frame_h, "orientation": orientation}
+
+
+    def optimize_bounding_boxes(self, room_w, room_h, bounding_box, desk_w, desk_h, aisle_dist, gap, obstacle_index=None):
+        """
+        Tối ưu hóa việc đặt các khung bounding box vào phòng, đảm bảo đổ từ tường bên phải về bên trái
+        và hỗ trợ tạo dãy back-to-back nếu không đủ chỗ.
+        :param obstacle_index: SpatialIndex các vật cản; mặc định chỉ gồm quầy lễ tân.
+        """
+        if obstacle_index is None:
+            obstacle_index = build_obstacle_index(room_w, room_h, desk_w, desk_h)
+        bounding_boxes = []
+        box_width, box_height, box_orientation = bounding_box["width"], bounding_box["height"], bounding_box["orientation"]
+
+        # Bắt đầu từ góc dưới bên phải
+        current_x, current_y = room_w - box_width, room_h - box_height
+        rows = []  # Lưu trữ các dãy
+        back_to_back = False  # Cờ để kiểm tra dãy back-to-back
+
+        while current_y >= 0:
+            current_row = []
+            while current_x >= 0:
+                # Kiểm tra va chạm với quầy lễ tân và các vật cản
+                if obstacle_index.intersects((current_x, current_y, box_width, box_height)):
+                    current_x -= box_width + gap  # Bỏ qua vị trí này, tránh va chạm
+                    continue
+
+                # Điều chỉnh tọa độ sát tường nếu cần
+                adjusted_x = max(0, current_x)
+                adjusted_y = max(0, current_y)
+
+                # Thêm bounding box hợp lệ
+                box = {
+                    "x": adjusted_x,
+                    "y": adjusted_y,
+                    "width": box_width,
+                    "height": box_height,
+                    "orientation": box_orientation  # Lưu hướng hiện tại
+                }
+                bounding_boxes.append(box)
+                current_row.append(box)
+
+                # Lùi sang bên trái với khoảng cách gap
+                current_x -= box_width + gap
+
+            rows.append(current_row)  # Lưu dãy hiện tại
+
+            # # Kiểm tra nếu không đủ chỗ để tạo dãy tiếp theo và đủ chỗ cho aisle_dist
+            # if current_y - box_height - aisle_dist < 0 and not back_to_back and current_y - box_height - gap >= 0:
+            #     # Đặt dãy back-to-back
+            #     back_to_back = True
+            #     current_y += box_height + gap 
+            #     #box_orientation = (box_orientation + 180) % 360  # Xoay 180 độ
+
+            #     # Xoay dãy trước đó
+            #     for box in rows[-1]:
+            #         rotated_box = self.rotate_bounding_box(box, 180, room_w, room_h, aisle_dist)
+            #         bounding_boxes[bounding_boxes.index(box)] = rotated_box  # Cập nhật
+            #         # current_y = rotated_box["y"] + rotated_box["height"] + aisle_dist
+                
+            # else:
+                # Chuyển sang hàng tiếp theo (lên trên) với khoảng cách aisle_dist
+            current_x = room_w - box_width
+            current_y -= box_height + aisle_dist
+            back_to_back = False  # Reset cờ
+
+        logger.debug("Số bounding box theo khoảng cách gap và aisle_dist (từ phải sang trái): %d", len(bounding_boxes))
+        return bounding_boxes
+
+
+    def place_entities_from_boxes(self, bounding_boxes, table_w, table_h, chair_w, chair_h, gap=5):
+        """
+        Tạo vị trí bàn và ghế từ danh sách bounding box, dựa trên hướng của bàn.
+        :param bounding_boxes: Danh sách bounding box (bao gồm hướng orientation).
+        :param table_w: Chiều rộng của bàn.
+        :param table_h: Chiều cao của bàn.
+        :param chair_w: Chiều rộng của ghế.
+        :param chair_h: Chiều cao của ghế.
+        :param gap: Khoảng cách giữa bàn và ghế.
+        :return: Danh sách vị trí bàn và ghế.
+        """
+        table_positions = []
+        chair_positions = []
+
+        for box in bounding_boxes:
+            # Đặt bàn trong bounding box
+            table_x = box["x"]
+            table_y = box["y"]
+            orientation = box["orientation"]  # Hướng mặc định là 0 độ
+
+            # Tùy theo hướng (orientation), cập nhật vị trí bàn
+            if orientation == 0:  # Bàn trên, ghế dưới
+                table_positions.append([table_x, table_y + box["height"] - table_h, table_w, table_h])
+                chair_x = table_x + (table_w - chair_w) / 2
+                chair_y = table_y + box["height"] - table_h - chair_h - gap
+
+            elif orientation == 90:  # Bàn bên trái, ghế bên phải
+                table_positions.append([table_x, table_y, table_h, table_w])  # Xoay bàn 90 độ
+                chair_x = table_x + table_h + gap
+                chair_y = table_y + (table_w - chair_h) / 2
+
+            elif orientation == 180:  # Bàn dưới, ghế trên
+                table_positions.append([table_x, table_y, table_w, table_h])
+                chair_x = table_x + (table_w - chair_w) / 2
+                chair_y = table_y + table_h + gap
+
+            elif orientation == 270:  # Bàn bên phải, ghế bên trái
+                table_positions.append([table_x + box["width"] - table_h, table_y, table_h, table_w])  # Xoay bàn 270 độ
+                chair_x = table_x - chair_w - gap
+                chair_y = table_y + (table_w - chair_h) / 2
+
+            else:
+                raise ValueError(f"Hướng không hợp lệ: {orientation}")
+
+            # Thêm ghế vào danh sách nếu không vượt ra ngoài bounding box
+            if box["x"] <= chair_x <= box["x"] + box["width"] - chair_w and \
+                    box["y"] <= chair_y <= box["y"] + box["height"] - chair_h:
+                chair_positions.append([chair_x, chair_y, chair_w, chair_h])
+            else:
+                logger.debug("Ghế tại (%s, %s) vượt ra ngoài bounding box, bỏ qua.", chair_x, chair_y)
+
+        logger.debug("Đã đặt %d bàn, %d ghế", len(table_positions), len(chair_positions))
+        return table_positions, chair_positions
+
+
+
+    def rotate_bounding_box(self, box, angle, room_w, room_h, aisle_dist):
+        """
+        Xoay bounding box theo góc chỉ định (90, 180 hoặc 270 độ) và cập nhật hướng.
+
+        :param box: Từ điển chứa thông tin của bounding box {'x', 'y', 'width', 'height', 'orientation'}.
+        :param angle: Góc xoay (90, 180 hoặc 270 độ).
+        :param room_w: Chiều rộng phòng.
+        :param room_h: Chiều cao phòng.
+        :return: Bounding box mới sau khi xoay và điều chỉnh.
+        """
+        if angle not in [90, 180, 270]:
+            raise ValueError("Góc xoay chỉ có thể là 90, 180 hoặc 270 độ.")
+        
+        x, y, width, height = box['x'], box['y'], box['width'], box['height']
+        # Nếu 'orientation' không tồn tại trong box, mặc định là 0
+        if 'orientation' in box:
+            orientation = box['orientation']
+        else:
+            orientation = 0
+
+        if angle == 90:
+            # Hoán đổi width và height khi xoay 90 độ
+            new_width, new_height = height, width
+            
+            # Tính vị trí mới
+            new_x = y
+            new_y = room_w - x - new_width
+
+        elif angle == 180:
+            # Không thay đổi width và height khi xoay 180 độ
+            new_width, new_height = width, height
+            
+            # Tính vị trí mới
+            new_x = x#room_w - x - new_width
+            new_y = room_h - y - 50
+            logger.debug("Xoay 180 độ: y=%s -> %s", y, new_y)
+
+        elif angle == 270:
+            # Hoán đổi width và height khi xoay 270 độ
+            new_width, new_height = height, width
+            
+            # Tính vị trí mới
+            new_x = room_h - y - new_height
+            new_y = x
+
+        # Điều chỉnh bounding box nếu vượt ra ngoài giới hạn phòng
+        if new_x < 0:
+            new_x = 0
+        if new_y < 0:
+            new_y = 0
+        if new_x + new_width > room_w:
+            new_x = room_w - new_width
+        if new_y + new_height > room_h:
+            new_y = room_h - new_height
+
+        # Cập nhật hướng của bàn sau khi xoay
+        new_orientation = (orientation + angle) % 360
+
+        return {
+            "x": new_x,
+            "y": new_y,
+            "width": new_width,
+            "height": new_height,
+            "orientation": new_orientation  # Lưu hướng mới của bàn
+        }
+
+
+    # def get_table_orientation(table):
+    #     """
+    #     Lấy hướng của bàn.
+    #     :param table: Dictionary chứa thông tin bàn {'x', 'y', 'width', 'height', 'orientation'}.
+    #     :return: String mô tả hướng của bàn.
+    #     """
+    #     orientation_map = {
+    #         0: "Hướng lên",
+    #         90: "Hướng sang phải",
+    #         180: "Hướng xuống",
+    #         270: "Hướng sang trái"
+    #     }
+    #     return orientation_map.get(table['orientation'], "Không xác định")
+
+    
+    # def generate_table_positions(self, room_w, room_h, table_w, table_h, desk_w, desk_h, aisle_dist, distance_bt):
+    #     """
+    #     Tạo vị trí cho các bàn và lưu các ô đã chiếm dụng.
+    #     """
+    #     table_positions = []
+    #     occupied_positions = []
+
+    #     start_x = desk_w + aisle_dist
+    #     start_y = room_h - desk_h - aisle_dist
+
+    #     num_tables_per_row = int((room_w - start_x) // (table_w + aisle_dist))
+    #     num_rows = int((start_y) // (table_h + distance_bt))
+
+    #     for row in range(num_rows):
+    #         for col in range(num_tables_per_row):
+    #             table_x = start_x + col * (table_w + aisle_dist)
+    #             table_y = start_y - row * (table_h + distance_bt)
+
+    #             # Kiểm tra va chạm với các thực thể đã được chiếm dụng
+    #             if self.is_collision([table_x, table_y, table_w, table_h], room_w, room_h, None, occupied_positions):
+    #                 print(f"Bàn tại ({table_x}, {table_y}) bị chồng lấn, bỏ qua.")
+    #                 continue
+
+    #             # Thêm bàn vào danh sách
+    #             table_positions.append([table_x, table_y, table_w, table_h])
+    #             occupied_positions.append([table_x, table_y, table_w, table_h])  # Lưu ô đã chiếm dụng
+
+    #     print(f"Vị trí bàn: {table_positions}")
+    #     return table_positions, occupied_positions
+
+
+
+    # def generate_chair_positions(self, table_positions, chair_w, chair_h, aisle_dist, room_w, room_h, occupied_positions):
+    #     """
+    #     Tạo vị trí cho ghế dựa trên vị trí bàn và lưu các ô đã chiếm dụng.
+    #     """
+    #     chair_positions = []
+    #     for table in table_positions:
+    #         table_x, table_y, table_w, table_h = table
+
+    #         # Ưu tiên đặt ghế trên hoặc dưới theo chiều dài của bàn
+    #         if table_w >= table_h:
+    #             # Ghế trên
+    #             chair_top = [table_x + (table_w - chair_w) / 2, table_y - chair_h - aisle_dist, chair_w, chair_h]
+    #             # Ghế dưới
+    #             chair_bottom = [table_x + (table_w - chair_w) / 2, table_y + table_h + aisle_dist, chair_w, chair_h]
+
+    #             if not self.is_collision(chair_top, room_w, room_h, None, occupied_positions):
+    #                 chair_positions.append(chair_top)
+    #                 occupied_positions.append(chair_top)
+    #             elif not self.is_collision(chair_bottom, room_w, room_h, None, occupied_positions):
+    #                 chair_positions.append(chair_bottom)
+    #                 occupied_positions.append(chair_bottom)
+    #         else:
+    #             # Ghế bên trái
+    #             chair_left = [table_x - chair_w - aisle_dist, table_y + (table_h - chair_h) / 2, chair_w, chair_h]
+    #             # Ghế bên phải
+    #             chair_right = [table_x + table_w + aisle_dist, table_y + (table_h - chair_h) / 2, chair_w, chair_h]
+
+    #             if not self.is_collision(chair_left, room_w, room_h, None, occupied_positions):
+    #                 chair_positions.append(chair_left)
+    #                 occupied_positions.append(chair_left)
+    #             elif not self.is_collision(chair_right, room_w, room_h, None, occupied_positions):
+    #                 chair_positions.append(chair_right)
+    #                 occupied_positions.append(chair_right)
+
+    #     print(f"Vị trí ghế được tạo: {chair_positions}")
+    #     return chair_positions
+
+
+
+        
+        
+    # def is_collision(self, entity, room_w, room_h, reception_positions, occupied_positions):
+    #     """
+    #     Kiểm tra xem thực thể có va chạm với quầy lễ tân, bàn, ghế hoặc vượt ra ngoài phòng không.
+    #     """
+    #     x, y, w, h = entity
+
+    #     # Kiểm tra nếu vượt ra ngoài phòng
+    #     if x < 0 or y < 0 or x + w > room_w or y + h > room_h:
+    #         return True
+
+    #     # Kiểm tra va chạm với quầy lễ tân (nếu có)
+    #     if reception_positions is not None:
+    #         for reception in reception_positions:
+    #             rx, ry, rw, rh = reception
+    #             if not (x + w <= rx or x >= rx + rw or y + h <= ry or y >= ry + rh):
+    #                 return True
+
+    #     # Kiểm tra va chạm với các thực thể đã được đặt (bàn và ghế)
+    #     for occupied in occupied_positions:
+    #         ox, oy, ow, oh = occupied
+    #         if not (x + w <= ox or x >= ox + ow or y + h <= oy or y >= oy + oh):
+    #             return True
+
+    #     return False
+
+
+
+
+        # def _is_position_valid(self, chair, reception_positions, room_w, room_h):
+        #     """
+        #     Kiểm tra xem vị trí ghế có hợp lệ không (không va chạm với quầy lễ tân và trong phạm vi phòng).
+        #     """
+        #     chair_x, chair_y, chair_w, chair_h = chair
+
+        #     # Kiểm tra ghế nằm trong phòng
+        #     if chair_x < 0 or chair_y < 0 or (chair_x + chair_w) > room_w or (chair_y + chair_h) > room_h:
+        #         return False
+
+        #     # Kiểm tra va chạm với quầy lễ tân
+        #     if reception_positions is not None:
+        #         for reception in reception_positions:
+        #             reception_x, reception_y, reception_w, reception_h = reception
+        #             if not (
+        #                 chair_x + chair_w < reception_x or  # Trái hoàn toàn
+        #                 chair_x > reception_x + reception_w or  # Phải hoàn toàn
+        #                 chair_y + chair_h < reception_y or  # Trên hoàn toàn
+        #                 chair_y > reception_y + reception_h  # Dưới hoàn toàn
+        #             ):
+        #                 return False
+
+        #     return True
+
+
+            # def calculate_starting_positions(self, desk_w, desk_h, room_w, room_h, aisle_dist):
+    #     """
+    #     Tính toán vị trí bắt đầu cho các thực thể dựa trên quầy lễ tân.
+    #     """
+    #     start_x = desk_w + aisle_dist if desk_w > 0 else aisle_dist
+    #     start_y = room_h - desk_h - aisle_dist if desk_h > 0 else room_h - aisle_dist
+    #     print(f"Vị trí bắt đầu: start_x={start_x}, start_y={start_y}")
+    #     return start_x, start_y
+
+
+    # def calculate_table_grid(self, start_x, start_y, room_w, room_h, table_w, table_h, aisle_dist, distance_bt):
+    #     """
+    #     Tính toán số lượng bàn trên mỗi hàng và số hàng.
+    #     """
+    #     num_tables_per_row = int((room_w - start_x) // (table_w + aisle_dist))
+    #     num_rows = int((start_y) // (table_h + distance_bt))
+    #     print(f"Số bàn trên mỗi hàng: {num_tables_per_row}, Số hàng: {num_rows}")
+    #     return num_tables_per_row, num_rows
+
+
+
+
+
+
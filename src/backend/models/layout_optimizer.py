@@ -0,0 +1,193 @@
+import random
+import time
+
+import numpy as np
+
+from models.grid_layout import compute_grid_boxes, place_entities_array
+from models.spatial_index import build_obstacle_index
+
+
+class LayoutResult:
+    """
+    Kết quả bố trí: các mảng (N, 4) [x, y, width, height] cùng hướng của từng bounding box.
+    """
+
+    def __init__(self, boxes, orientations, tables, chairs, description):
+        self.boxes = boxes
+        self.orientations = orientations
+        self.tables = tables
+        self.chairs = chairs
+        self.description = description
+
+    @property
+    def seats(self):
+        return len(self.chairs)
+
+    def used_area(self):
+        return float((self.tables[:, 2] * self.tables[:, 3]).sum() + (self.chairs[:, 2] * self.chairs[:, 3]).sum())
+
+
+class LayoutOptimizer:
+    """
+    Tìm bố trí có nhiều chỗ ngồi nhất bằng cách thử các hướng bàn (0/90/180/270),
+    ghép dãy back-to-back và vị trí các lối đi.
+
+    Mỗi dãy là một hàng bounding box (bàn + ghế) chạy dọc theo trục u; các dãy xếp chồng theo trục v.
+    Dãy ngang (hướng 0/180) có u = x, v = y; dãy dọc (hướng 90/270) có u = y, v = x.
+    Phía ghế của mỗi dãy luôn quay ra lối đi (hoặc tường), hai dãy back-to-back quay lưng bàn vào nhau.
+    """
+
+    def __init__(self, time_budget=0.15, seed=0, random_samples=200):
+        """
+        :param time_budget: Thời gian tối đa (giây) cho một lần tối ưu.
+        :param seed: Seed cho phần tìm kiếm ngẫu nhiên; cùng seed cho cùng kết quả nếu không chạm time_budget.
+        :param random_samples: Số phương án dịch chuyển ngẫu nhiên thử thêm sau phần duyệt vét cạn.
+        """
+        self.time_budget = time_budget
+        self.seed = seed
+        self.random_samples = random_samples
+
+    def optimize(self, room_w, room_h, table_w, table_h, chair_w, chair_h, desk_w, desk_h, aisle_dist, gap,
+                 obstacle_index=None):
+        """
+        Tối ưu bố trí cho một phòng.
+        :param obstacle_index: SpatialIndex chứa quầy lễ tân và các vật cản; mặc định chỉ gồm quầy lễ tân.
+        :return: LayoutResult tốt nhất (ít nhất bằng bố trí lưới mặc định).
+        """
+        deadline = time.perf_counter() + self.time_budget
+        rng = random.Random(self.seed)
+        if obstacle_index is None:
+            obstacle_index = build_obstacle_index(room_w, room_h, desk_w, desk_h)
+
+        # Phương án gốc: lưới của NetCafeModel (hướng 0, không back-to-back)
+        box_h = table_h + chair_h + gap
+        grid_boxes = compute_grid_boxes(room_w, room_h, table_w, box_h, desk_w, desk_h, aisle_dist, gap,
+                                        obstacle_index)
+        grid_tables, grid_chairs = place_entities_array(grid_boxes, table_w, table_h, chair_w, chair_h)
+        best = LayoutResult(grid_boxes, np.zeros(len(grid_boxes), dtype=np.int64), grid_tables, grid_chairs,
+                            {"strategy": "grid"})
+        best_key = (best.seats, best.used_area())
+
+        candidates = []
+        for vertical in (False, True):
+            for plan in self._row_plans(room_w, room_h, table_w, table_h, chair_w, chair_h, aisle_dist, gap, vertical):
+                for v_anchor in (0.0, 1.0):
+                    for u_anchor in (0.0, 1.0):
+                        candidates.append((vertical, plan, u_anchor, v_anchor))
+
+        def consider(candidate):
+            nonlocal best, best_key
+            result = self._build(room_w, room_h, table_w, table_h, chair_w, chair_h, aisle_dist, gap,
+                                 obstacle_index, *candidate)
+            key = (result.seats, result.used_area())
+            if key > best_key:
+                best, best_key = result, key
+
+        for candidate in candidates:
+            if time.perf_counter() > deadline:
+                return best
+            consider(candidate)
+
+        # Dịch chuyển ngẫu nhiên phần dư theo u và v để tránh quầy lễ tân và vật cản
+        if len(obstacle_index) and candidates:
+            for _ in range(self.random_samples):
+                if time.perf_counter() > deadline:
+                    break
+                vertical, plan, _, _ = candidates[rng.randrange(len(candidates))]
+                consider((vertical, plan, rng.random(), rng.random()))
+        return best
+
+    def _row_plans(self, room_w, room_h, table_w, table_h, chair_w, chair_h, aisle_dist, gap, vertical):
+        """
+        Liệt kê các cách xếp dãy theo trục v: p cặp back-to-back và s dãy đơn, các khối cách nhau bởi lối đi.
+        Mỗi plan là danh sách "phía ghế" của từng dãy theo v tăng dần: -1 (ghế phía v nhỏ), +1 (ghế phía v lớn).
+        """
+        span_v = room_w if vertical else room_h
+        depth = table_h + gap + (chair_w if vertical else chair_h)
+        pair_depth = 2 * depth + gap
+
+        plans = []
+        max_pairs = int((span_v + aisle_dist) // (pair_depth + aisle_dist)) if pair_depth > 0 else 0
+        for pairs in range(max_pairs + 1):
+            used = pairs * (pair_depth + aisle_dist)
+            singles = int((span_v - used + aisle_dist) // (depth + aisle_dist)) if span_v - used >= depth else 0
+            if pairs + singles == 0:
+                continue
+            for singles_first in (True, False):
+                # Dãy đơn quay ghế vào phía trong phòng, lưng bàn sát tường
+                single_block = [[+1 if singles_first else -1]] * singles
+                pair_block = [[-1, +1]] * pairs
+                units = single_block + pair_block if singles_first else pair_block + single_block
+                plans.append(units)
+                if not singles or not pairs:
+                    break
+        return plans
+
+    def _build(self, room_w, room_h, table_w, table_h, chair_w, chair_h, aisle_dist, gap, obstacle_index,
+               vertical, units, u_anchor, v_anchor):
+        """
+        Dựng bố trí cụ thể từ một plan; u_anchor / v_anchor trong [0, 1] chọn vị trí phần không gian dư.
+        """
+        span_u, span_v = (room_h, room_w) if vertical else (room_w, room_h)
+        chair_len, chair_depth = (chair_h, chair_w) if vertical else (chair_w, chair_h)
+        depth = table_h + gap + chair_depth
+
+        # Tọa độ v và phía ghế của từng dãy
+        row_v, row_side = [], []
+        cursor = 0.0
+        for index, unit in enumerate(units):
+            if index:
+                cursor += aisle_dist
+            for position, side in enumerate(unit):
+                if position:
+                    cursor += gap
+                row_v.append(cursor)
+                row_side.append(side)
+                cursor += depth
+        slack_v = span_v - cursor
+        row_v = np.array(row_v) + slack_v * v_anchor
+        row_side = np.array(row_side)
+
+        n_cols = max(int((span_u + gap) // (table_w + gap)), 0)
+        slack_u = span_u - (n_cols * table_w + (n_cols - 1) * gap)
+        col_u = slack_u * u_anchor + np.arange(n_cols) * (table_w + gap)
+
+        box_u = np.tile(col_u, len(row_v))
+        box_v = np.repeat(row_v, n_cols)
+        side = np.repeat(row_side, n_cols)
+
+        # Vị trí bàn và ghế trong hệ tọa độ (u, v)
+        table_v = np.where(side < 0, box_v + chair_depth + gap, box_v)
+        chair_v = np.where(side < 0, box_v, box_v + table_h + gap)
+        chair_u = box_u + (table_w - chair_len) / 2
+
+        def to_room(u, v, length, thickness):
+            rects = np.empty((len(u), 4))
+            if vertical:
+                rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3] = v, u, thickness, length
+            else:
+                rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3] = u, v, length, thickness
+            return rects
+
+        boxes = to_room(box_u, box_v, table_w, depth)
+        tables = to_room(box_u, table_v, table_w, table_h)
+        chairs = to_room(chair_u, chair_v, chair_len, chair_depth)
+
+        keep = ~obstacle_index.query_mask(boxes)
+        if chair_len > table_w:
+            keep[:] = False
+        if vertical:
+            orientations = np.where(side > 0, 90, 270)
+        else:
+            orientations = np.where(side < 0, 0, 180)
+
+        description = {
+            "strategy": "rows",
+            "axis": "vertical" if vertical else "horizontal",
+            "rows": len(row_v),
+            "back_to_back_pairs": sum(1 for unit in units if len(unit) == 2),
+            "u_anchor": round(u_anchor, 3),
+            "v_anchor": round(v_anchor, 3),
+        }
+        return LayoutResult(boxes[keep], orientations[keep], tables[keep], chairs[keep], description)
+
@@ -0,0 +1,193 @@
+import time
+
+import numpy as np
+import torch
+
+from models.grid_layout import compute_grid_boxes, place_entities_array
+from models.layout_optimizer import LayoutResult
+from models.spatial_index import SpatialIndex, build_obstacle_index
+
+
+class LayoutRefiner:
+    """
+    Tinh chỉnh bố trí bằng gradient (torch, CPU): vị trí từng bounding box (bàn + ghế, hướng 0) là tham số học được,
+    tối ưu một hàm mất mát "mềm" gồm:
+      - chồng lấn giữa các box, mỗi box được nới thêm gap theo x và aisle_dist theo y
+        (nên hai box không chồng lấn thì vẫn giữ khoảng cách giữa các bàn và lối đi như lưới),
+      - phần box nằm ngoài tường,
+      - diện tích box chồng lên quầy lễ tân và các vật cản.
+    Mọi thành phần bằng 0 đúng khi bố trí hợp lệ.
+
+    Khởi đầu từ lưới hiện tại, lần lượt chèn thêm một box vào các ô lưới bị quầy lễ tân/vật cản lấy mất rồi tối ưu lại
+    để các box xung quanh dịch ra nhường chỗ; box mới chỉ được giữ nếu mất mát về 0 và bố trí qua kiểm tra chặt.
+    Không có vật cản thì lưới đã là tối ưu (các box cùng kích thước, không xoay) nên được trả về ngay.
+    """
+
+    def __init__(self, max_iterations=2000, time_budget=2.0, learning_rate=0.1, steps_per_insert=300, max_failures=3,
+                 max_units=1500, weights=None):
+        """
+        :param max_iterations: Tổng số bước tối ưu tối đa (cộng dồn qua mọi lần chèn).
+        :param time_budget: Thời gian tối đa (giây); hết thời gian thì trả về bố trí hợp lệ gần nhất.
+        :param learning_rate: Bước ban đầu của Adam, tính theo cạnh ngắn của box đã nới (giảm dần theo cosine).
+        :param steps_per_insert: Số bước tối ưu tối đa sau mỗi lần chèn một box.
+        :param max_failures: Dừng sau số lần chèn thất bại liên tiếp này.
+        :param max_units: Số box tối đa được tinh chỉnh; phòng lớn hơn giữ nguyên lưới.
+        :param weights: Trọng số các thành phần mất mát {"overlap", "wall", "obstacle"}.
+        """
+        self.max_iterations = max_iterations
+        self.time_budget = time_budget
+        self.learning_rate = learning_rate
+        self.steps_per_insert = steps_per_insert
+        self.max_failures = max_failures
+        self.max_units = max_units
+        self.weights = {"overlap": 1.0, "wall": 10.0, "obstacle": 10.0, **(weights or {})}
+
+    def refine(self, room_w, room_h, table_w, table_h, chair_w, chair_h, desk_w, desk_h, aisle_dist, gap,
+               obstacle_index=None):
+        """
+        Tinh chỉnh bố trí cho một phòng.
+        :param obstacle_index: SpatialIndex chứa quầy lễ tân và các vật cản; mặc định chỉ gồm quầy lễ tân.
+        :return: LayoutResult tốt nhất (ít nhất bằng bố trí lưới mặc định).
+        """
+        deadline = time.perf_counter() + self.time_budget
+        if obstacle_index is None:
+            obstacle_index = build_obstacle_index(room_w, room_h, desk_w, desk_h)
+
+        box_w, box_h = table_w, table_h + chair_h + gap
+        cell_w, cell_h = box_w + gap, box_h + aisle_dist
+        grid_boxes = compute_grid_boxes(room_w, room_h, box_w, box_h, desk_w, desk_h, aisle_dist, gap, obstacle_index)
+        tables, chairs = place_entities_array(grid_boxes, table_w, table_h, chair_w, chair_h)
+        grid = LayoutResult(grid_boxes, np.zeros(len(grid_boxes), dtype=np.int64), tables, chairs, {"strategy": "grid"})
+
+        # Các ô lưới bị quầy lễ tân/vật cản lấy mất: nơi thử chèn thêm box
+        full_grid = compute_grid_boxes(room_w, room_h, box_w, box_h, 0, 0, aisle_dist, gap, SpatialIndex())
+        lost = full_grid[obstacle_index.query_mask(full_grid)]
+        if not len(lost) or len(full_grid) > self.max_units:
+            return grid
+
+        # Tối ưu trong tọa độ chuẩn hóa theo cạnh ngắn của box đã nới, để learning_rate không phụ thuộc đơn vị
+        scale = min(cell_w, cell_h)
+        geometry = (room_w / scale, room_h / scale, box_w / scale, box_h / scale, cell_w / scale, cell_h / scale,
+                    np.array(obstacle_index.rects, dtype=np.float64).reshape(-1, 4) / scale)
+        positions = grid_boxes[:, :2] / scale
+        iterations, added, failures = 0, 0, 0
+        for point in self._insertion_order(lost[:, :2] / scale, geometry):
+            if failures >= self.max_failures or iterations >= self.max_iterations or time.perf_counter() >= deadline:
+                break
+            steps = min(self.steps_per_insert, self.max_iterations - iterations)
+            candidate, used, loss = self._optimize(np.vstack([positions, point]), geometry, steps, deadline)
+            iterations += used
+            if loss == 0 and self._is_valid(candidate * scale, box_w, box_h, cell_w, cell_h, room_w, room_h,
+                                            obstacle_index):
+                positions = candidate
+                added += 1
+                failures = 0
+            else:
+                failures += 1
+
+        if not added:
+            return grid
+        boxes = np.column_stack([positions * scale, np.full(len(positions), box_w), np.full(len(positions), box_h)])
+        boxes = boxes[np.lexsort((-boxes[:, 0], -boxes[:, 1]))]  # Cùng thứ tự như lưới: y giảm dần, rồi x giảm dần
+
+        # Vị trí bàn/ghế tương đối trong box không đổi: dịch từ box mẫu đặt ở gốc tọa độ
+        # (tính trực tiếp trên tọa độ lẻ có thể làm ghế sát mép box bị loại vì sai số làm tròn)
+        template_tables, template_chairs = place_entities_array(
+            np.array([[0.0, 0.0, box_w, box_h]]), table_w, table_h, chair_w, chair_h
+        )
+        offsets = np.column_stack([boxes[:, :2], np.zeros((len(boxes), 2))])
+        chairs = template_chairs + offsets if len(template_chairs) else np.empty((0, 4))
+        return LayoutResult(boxes, np.zeros(len(boxes), dtype=np.int64), template_tables + offsets, chairs, {
+            "strategy": "refine",
+            "iterations": iterations,
+            "added": added,
+            "grid_tables": len(grid_boxes),
+        })
+
+    @staticmethod
+    def _insertion_order(points, geometry):
+        """
+        Thứ tự thử chèn các ô bị mất: ô chồng lên vật cản ít nhất trước (dễ dịch các box xung quanh để nhường chỗ nhất).
+        :return: Mảng (K, 2) tọa độ chuẩn hóa.
+        """
+        _, _, w, h, _, _, obstacles = geometry
+        ox, oy, ow, oh = obstacles.T
+        inter_x = np.maximum(np.minimum(points[:, None, 0] + w, ox + ow) - np.maximum(points[:, None, 0], ox), 0)
+        inter_y = np.maximum(np.minimum(points[:, None, 1] + h, oy + oh) - np.maximum(points[:, None, 1], oy), 0)
+        return points[np.argsort((inter_x * inter_y).sum(axis=1), kind="stable")]
+
+    @staticmethod
+    def _neighbor_pairs(positions, cw, ch, reach=2.0):
+        """
+        Các cặp box đủ gần để có thể chồng lấn sau vài bước tối ưu (cách nhau dưới reach ô theo cả hai trục).
+        :return: (i, j) - hai mảng chỉ số với i < j.
+        """
+        dx = np.abs(positions[:, None, 0] - positions[None, :, 0])
+        dy = np.abs(positions[:, None, 1] - positions[None, :, 1])
+        return np.nonzero(np.triu((dx < reach * cw) & (dy < reach * ch), 1))
+
+    def _optimize(self, start, geometry, steps, deadline, refresh=25):
+        """
+        Tối ưu vị trí bằng Adam. Chồng lấn chỉ tính trên các cặp box gần nhau (cập nhật mỗi refresh bước),
+        nên mỗi bước tỷ lệ với số box thay vì bình phương số box.
+        :return: (vị trí (N, 2) chuẩn hóa, số bước đã chạy, giá trị mất mát cuối).
+        """
+        room_x, room_y, w, h, cw, ch, obstacles = geometry
+        weights = self.weights
+        ox, oy, ow, oh = torch.from_numpy(obstacles).unbind(1)
+        positions = torch.tensor(start, dtype=torch.float64, requires_grad=True)
+        optimizer = torch.optim.Adam([positions], lr=self.learning_rate)
+        # Giảm dần bước để các box dừng lại thay vì dao động quanh điểm tiếp xúc
+        scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, max(steps, 1))
+
+        used, loss = 0, float("inf")
+        while used < steps and time.perf_counter() < deadline:
+            if used % refresh == 0:
+                first, second = (torch.from_numpy(index) for index in
+                                 self._neighbor_pairs(positions.detach().numpy(), cw, ch))
+            optimizer.zero_grad()
+            x, y = positions[:, 0], positions[:, 1]
+
+            # Mọi box cùng kích thước nên phần giao của hai box đã nới = relu(cw - |dx|) * relu(ch - |dy|)
+            overlap = (torch.relu(cw - (x[first] - x[second]).abs())
+                       * torch.relu(ch - (y[first] - y[second]).abs())).sum()
+            wall = (torch.relu(-x) + torch.relu(x + w - room_x) + torch.relu(-y) + torch.relu(y + h - room_y)).sum()
+            inter_x = torch.relu(torch.minimum(x[:, None] + w, ox + ow) - torch.maximum(x[:, None], ox))
+            inter_y = torch.relu(torch.minimum(y[:, None] + h, oy + oh) - torch.maximum(y[:, None], oy))
+            objective = (weights["overlap"] * overlap + weights["wall"] * wall
+                         + weights["obstacle"] * (inter_x * inter_y).sum())
+
+            loss = objective.item()
+            if loss == 0:
+                break
+            used += 1
+            objective.backward()
+            optimizer.step()
+            scheduler.step()
+
+        return positions.detach().numpy(), used, loss
+
+    @staticmethod
+    def _is_valid(positions, box_w, box_h, cell_w, cell_h, room_w, room_h, obstacle_index):
+        """
+        Kiểm tra chặt (trên mọi cặp box, đơn vị cm) rằng bố trí nằm trong phòng, không chồng vật cản
+        và giữ đủ gap/lối đi giữa các box.
+        """
+        x, y = positions[:, 0], positions[:, 1]
+        if (x < 0).any() or (y < 0).any() or (x + box_w > room_w).any() or (y + box_h > room_h).any():
+            return False
+        boxes = np.column_stack([positions, np.full(len(positions), box_w), np.full(len(positions), box_h)])
+        if obstacle_index.query_mask(boxes).any():
+            return False
+        apart = (np.abs(x[:, None] - x[None, :]) >= cell_w) | (np.abs(y[:, None] - y[None, :]) >= cell_h)
+        np.fill_diagonal(apart, True)
+        return bool(apart.all())
+
+
+def warm_up():
+    """
+    Chạy thử vài bước tối ưu trên hai box: lần gọi Adam đầu tiên của torch còn nạp thêm module và mất vài giây,
+    không nên tính vào time_budget của request đầu tiên.
+    """
+    geometry = (4.0, 4.0, 1.0, 1.0, 1.0, 1.0, np.empty((0, 4)))
+    LayoutRefiner()._optimize(np.array([[0.0, 0.0], [0.5, 0.5]]), geometry, 2, time.perf_counter() + 60)
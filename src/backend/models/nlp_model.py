@@ -1,8 +1,14 @@
-import nltk
-from nltk.tokenize import word_tokenize, sent_tokenize
-from underthesea import pos_tag
-import pandas as pd
+import logging
 import os
+from functools import lru_cache
+from models.entity_extractor import FURNITURE_KEYWORDS, TOKENIZERS, extract_entities
+from models.parameters import PARAMETER_FIELDS, LayoutParameters
+from models.size_parser import parse_dimensions, parse_size_and_unit
+from services.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+# nltk và underthesea được import khi dùng lần đầu (xem warm_up) để khởi động nhanh
 
 # # Đặt thư mục tùy chỉnh cho dữ liệu NLTK (trong venv)
 # nltk_data_dir = os.path.join(os.getcwd(), "venv", "nltk_data")
@@ -16,18 +22,97 @@ import os
 # nltk.data.path = [nltk_data_dir]
 
 
+def warm_up(engine="rules"):
+    """
+    Nạp trước engine tách từ (với "underthesea": mô hình gán nhãn từ loại) bằng một lần chạy thử.
+    Gọi trong process master trước khi fork (ví dụ gunicorn --preload) để các worker dùng chung bộ nhớ.
+    """
+    TOKENIZERS[engine]("phòng 7x5m")
+
+
+# Số câu (đã chuẩn hóa) khác nhau được nhớ kết quả trích xuất
+TEXT_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def parse_text_parameters(clean_text, engine="rules"):
+    """
+    Trích xuất các thông số có trong một văn bản đã qua preprocess_text, đổi về số thực đơn vị cm.
+    Kết quả chỉ phụ thuộc vào văn bản nên được cache LRU; câu lặp lại không cần tách từ lại.
+    :return: Tuple các (khóa thông số, giá trị cm hoặc None nếu kích thước không hợp lệ),
+             theo thứ tự của PARAMETER_FIELDS. Thực thể không kèm kích thước bị bỏ qua.
+    """
+    with stage_timer("tokenize"):
+        entities = extract_entities(clean_text, engine)
+
+    # Trích xuất thông tin từ các thực thể
+    parameters = {}
+    for entity in entities:
+        entity_type = entity.type.lower()
+        value = entity.value.strip()
+
+        if entity_type in FURNITURE_KEYWORDS:
+            # Phân tích kích thước và đơn vị từ value
+            size_unit = parse_size_and_unit(value)
+
+            # Lưu vào thông số tương ứng
+            if entity_type == "phòng":
+                parameters["room"] = size_unit
+            elif entity_type == "bàn":
+                parameters["table"] = size_unit
+            elif entity_type == "ghế":
+                parameters["chair"] = size_unit
+            elif entity_type in ("giữa", "khoảng cách"):
+                parameters["distance_between_tables"] = size_unit
+            elif entity_type == "lối":
+                parameters["aisle_distance"] = size_unit
+            elif entity_type == "quầy":
+                parameters["reception_desk"] = size_unit
+
+    # Chuẩn hóa về centimet và kiểm tra số chiều
+    result = []
+    for key, (_, _, dimensions) in PARAMETER_FIELDS.items():
+        size, unit = parameters.get(key, ("", ""))
+        if not size:
+            continue
+        try:
+            values = parse_dimensions(size, unit)
+        except ValueError:
+            values = None
+        result.append((key, values if values is not None and len(values) == dimensions else None))
+    return tuple(result)
+
+
+def cache_stats():
+    """
+    Số lần hit/miss và số mục của cache trích xuất văn bản.
+    """
+    info = parse_text_parameters.cache_info()
+    return {"parse_text_parameters": {"hits": info.hits, "misses": info.misses, "size": info.currsize}}
+
+
 class NLPModel:
-    def __init__(self):
-        self.furniture_keywords = ["phòng", "bàn", "ghế","lối", "quầy", "giữa"]
-        self.default_parameters = {
-            "room": {"type": "phòng", "size": "700x500", "unit": "cm"},
-            "table": {"type": "bàn", "size": "120x60", "unit": "cm"},
-            "chair": {"type": "ghế", "size": "60x60", "unit": "cm"},
-            "distance_between_tables": {"type": "giữa", "size": "5", "unit": "cm"},
-            "aisle_distance": {"type": "lối", "size": "98", "unit": "cm"},
-            "reception_desk": {"type": "quầy", "size": "0x0", "unit": "cm", "present": "Không"}  # Có/Không
-        }
-        self.user_parameters = self.default_parameters.copy()
+    def __init__(self, parameters=None, engine="rules"):
+        """
+        :param parameters: Thông số của phiên người dùng (LayoutParameters hoặc dạng JSON); None = mặc định.
+        :param engine: Cách tách từ khi nhận diện thực thể: "rules" (regex + trie, mặc định) hoặc "underthesea".
+        """
+        if engine not in TOKENIZERS:
+            raise ValueError(f"Engine không hợp lệ: {engine}")
+        self.engine = engine
+        if parameters is None:
+            parameters = LayoutParameters()
+        elif not isinstance(parameters, LayoutParameters):
+            parameters = LayoutParameters.from_dict(parameters)
+        self.parameters = parameters
+        self.furniture_keywords = list(FURNITURE_KEYWORDS)
+
+    @property
+    def user_parameters(self):
+        """
+        Thông số hiện tại ở dạng JSON (kích thước dạng chuỗi), dùng cho response và kho phiên.
+        """
+        return self.parameters.to_dict()
 
     def preprocess_text(self, text):
         """
@@ -42,6 +127,8 @@ class NLPModel:
         """
         Chia văn bản thành câu và token hóa.
         """
+        from nltk.tokenize import word_tokenize, sent_tokenize
+
         sentences = sent_tokenize(text)
         tokens = [word_tokenize(sentence) for sentence in sentences]
         return sentences, tokens
@@ -49,29 +136,9 @@ class NLPModel:
     def extract_entities(self, text):
         """
         Nhận diện các thực thể từ văn bản đầu vào.
+        :return: Danh sách Entity theo thứ tự xuất hiện.
         """
-        # Sử dụng Underthesea để gán nhãn từ loại
-        words = pos_tag(text)
-        print(f"Underthesea POS Tagging: {words}")  # Hiển thị kết quả gán nhãn từ loại
-        
-        detected_entities = []
-        current_entity = None
-
-        for word, tag in words:
-            if word in self.furniture_keywords:
-                if current_entity:
-                    detected_entities.append(current_entity)
-                    print(f"Entity Detected: {current_entity}")  # Theo dõi từng thực thể phát hiện
-                current_entity = {"type": word, "value": ""}
-            elif any(char.isdigit() for char in word) or "x" in word or "cm" in word or "m" in word:
-                if current_entity:
-                    current_entity["value"] += f"{word} "
-        if current_entity:
-            detected_entities.append(current_entity)
-            print(f"Final Entity: {current_entity}")  # Hiển thị thực thể cuối cùng
-        
-        print(f"All Detected Entities: {detected_entities}")  # Theo dõi danh sách thực thể đầy đủ
-        return pd.DataFrame(detected_entities)
+        return extract_entities(text, self.engine)
 
 
     # def resolve_coreference(self, text):
@@ -99,100 +166,59 @@ class NLPModel:
     def extract_drawing_parameters(self, text):
         """
         Trích xuất thông tin để tạo bản vẽ 2D từ dữ liệu người dùng.
-        Đồng thời chuẩn hóa tất cả đơn vị về centimet.
-        """
-        # Khởi tạo thông số mặc định
-        parameters = self.default_parameters.copy()
-
-        # Tiền xử lý văn bản
-        clean_text = self.preprocess_text(text)
-        print(f"clean_text: {clean_text}")
-
-        # Nhận diện các thực thể
-        entities = self.extract_entities(clean_text).to_dict(orient="records")
-        print("entities: ", entities)
-
-        # Trích xuất thông tin từ các thực thể
-        for entity in entities:
-            entity_type = entity.get("type", "").lower()
-            value = entity.get("value", "").strip()
-
-            if entity_type in self.furniture_keywords:
-                # Phân tích kích thước và đơn vị từ value
-                size, unit = self.parse_size_and_unit(value)
-
-                # Lưu vào thông số tương ứng
-                if entity_type == "phòng":
-                    parameters["room"] = {"type": entity_type, "size": size, "unit": unit}
-                elif entity_type == "bàn":
-                    parameters["table"] = {"type": entity_type, "size": size, "unit": unit}
-                elif entity_type == "ghế":
-                    parameters["chair"] = {"type": entity_type, "size": size, "unit": unit}
-                elif entity_type == "khoảng cách":
-                    parameters["distance_between_tables"] = {"type": entity_type, "size": size, "unit": unit}
-                elif entity_type == "lối":
-                    parameters["aisle_distance"] = {"type": "lối đi", "size": size, "unit": unit}
-                elif entity_type == "quầy":
-                    parameters["reception_desk"] = {"type": entity_type, "size": size, "unit": unit}
-
-        # Chuẩn hóa tất cả đơn vị về centimet và xử lý định dạng
-        for key, param in parameters.items():
-            if param.get("size") and param.get("unit"):
-                # Chuyển đổi kích thước về cm
-                if "x" in param["size"]:
-                    # Nếu kích thước dạng "AxB"
-                    dimensions = param["size"].split("x")
-                    dimensions_in_cm = []
-                    for dim in dimensions:
-                        if param["unit"] == "m":
-                            dim_in_cm = float(dim) * 100  # Chuyển đổi mét sang cm
-                        elif param["unit"] == "cm":
-                            dim_in_cm = float(dim)  # Giữ nguyên
-
-                        # Chuyển về dạng số nguyên nếu không có phần thập phân
-                        if dim_in_cm.is_integer():
-                            dim_in_cm = int(dim_in_cm)
-                        dimensions_in_cm.append(str(dim_in_cm))
-                    param["size"] = "x".join(dimensions_in_cm)
-                else:
-                    # Nếu kích thước chỉ có một số
-                    if param["unit"] == "m":
-                        size_in_cm = float(param["size"]) * 100  # Chuyển đổi mét sang cm
-                    elif param["unit"] == "cm":
-                        size_in_cm = float(param["size"])  # Giữ nguyên
-
-                    # Chuyển về dạng số nguyên nếu không có phần thập phân
-                    if size_in_cm.is_integer():
-                        size_in_cm = int(size_in_cm)
-                    param["size"] = str(size_in_cm)
-
-                # Cập nhật đơn vị về "cm"
-                param["unit"] = "cm"
-
-        print("Trích xuất thông tin (sau chuẩn hóa):", parameters)
+        :return: LayoutParameters hiện tại với các thông số hợp lệ trong văn bản được thay vào.
+        """
+        parameters = self.parameters
+        for key, values in self.mentioned_parameters(text):
+            if values is not None:
+                try:
+                    parameters = parameters.with_value(key, values)
+                except ValueError:
+                    pass
+        logger.debug("Trích xuất thông tin (sau chuẩn hóa): %s", parameters)
         return parameters
 
+    def mentioned_parameters(self, text):
+        """
+        Các thông số được nhắc đến trong văn bản.
+        :return: Tuple các (khóa thông số, giá trị cm hoặc None nếu không hợp lệ).
+        """
+        with stage_timer("extract"):
+            # Tiền xử lý văn bản
+            clean_text = self.preprocess_text(text)
+            logger.debug("clean_text: %s", clean_text)
+
+            # Lấy từ cache nếu câu này đã gặp
+            return parse_text_parameters(clean_text, self.engine)
+
+    def apply_parameters(self, text):
+        """
+        Cập nhật self.parameters theo các thông số được nhắc đến trong văn bản.
+        Nhắc đến quầy lễ tân với kích thước khác 0 nghĩa là phòng có quầy lễ tân.
+        :return: (nhãn các thông số đã cập nhật, nhãn các thông số không hợp lệ).
+        """
+        updated_entities = []
+        invalid_entities = []
+        for key, values in self.mentioned_parameters(text):
+            label = PARAMETER_FIELDS[key][1]
+            try:
+                if values is None:
+                    raise ValueError(key)
+                self.parameters = self.parameters.with_value(key, values)
+            except ValueError:
+                invalid_entities.append(label)
+                continue
+            if key == "reception_desk":
+                self.parameters = self.parameters.with_reception_present(all(v > 0 for v in values))
+            updated_entities.append(label)
+        return updated_entities, invalid_entities
 
     def parse_size_and_unit(self, value):
         """
         Phân tích kích thước và đơn vị từ chuỗi giá trị.
         Ví dụ: "2x3m" -> ("2x3", "m")
         """
-        size = ""
-        unit = "m"  # Mặc định là mét
-
-        # Tìm kích thước (chữ số và "x")
-        for part in value.split():
-            if any(char.isdigit() for char in part) or "x" in part:
-                size = part.strip()
-
-            # Tìm đơn vị
-            if "cm" in part:
-                unit = "cm"
-            elif "m" in part:
-                unit = "m"
-
-        return size, unit
+        return parse_size_and_unit(value)
 
     
     
@@ -201,39 +227,8 @@ class NLPModel:
         Cập nhật thông số từ dữ liệu người dùng.
         Chỉ cập nhật thực thể được đề cập, bảo toàn các giá trị hiện có.
         """
-        # Trích xuất thông tin từ đầu vào người dùng
-        extracted_params = self.extract_drawing_parameters(user_input)
-        updated_entities = []
-        invalid_entities = []
+        updated_entities, invalid_entities = self.apply_parameters(user_input)
 
-        # Cập nhật thông số dựa trên input người dùng
-        for key in self.user_parameters:
-            # Kiểm tra nếu thực thể có trong dữ liệu người dùng
-            if extracted_params.get(key, {}).get("size"):
-                size = extracted_params[key]["size"]
-                unit = extracted_params[key]["unit"]
-
-                # Kiểm tra tính hợp lệ của kích thước và đơn vị
-                if self.is_valid_size(size) and self.is_valid_unit(unit):
-                    # Cập nhật giá trị hợp lệ
-                    self.user_parameters[key]["size"] = size
-                    self.user_parameters[key]["unit"] = unit
-                    updated_entities.append(self.user_parameters[key]["type"])
-                else:
-                    invalid_entities.append(self.user_parameters[key]["type"])
-
-            # Nếu quầy lễ tân được đề cập, cập nhật trạng thái "Có"
-            if key == "reception_desk" and extracted_params.get(key, {}).get("size"):
-                self.user_parameters[key]["present"] = "Có"
-
-        # Thêm thông số mặc định cho các thực thể còn thiếu
-        missing_params = []
-        for key, value in self.default_parameters.items():
-            if not self.user_parameters[key]["size"]:
-                self.user_parameters[key] = value
-                missing_params.append(value["type"])
-        
-        
         # Trả lại thông báo về trạng thái cập nhật
         response = ""
         if updated_entities:
@@ -242,9 +237,6 @@ class NLPModel:
         if invalid_entities:
             invalid_entities =  self.refill(invalid_entities)
             response += f"Các thông số không hợp lệ (bỏ qua): {invalid_entities}\n"
-        if missing_params:
-            missing_params =  self.refill(missing_params)
-            response += f"Các thông số còn thiếu đã được tự động khởi tạo: {missing_params}\n"
 
         return response
 
@@ -272,17 +264,6 @@ class NLPModel:
         # Cập nhật thông số từ dữ liệu người dùng
         missing_params = self.update_parameters(user_input)
 
-        # Chuyển thông số thành DataFrame
-        df = pd.DataFrame([
-            {
-                "Thực thể": param["type"],
-                "Kích thước": param["size"],
-                "Đơn vị": param.get("unit", ""),
-                "Có/Không": param.get("present", "")  # Dành cho quầy lễ tân
-            }
-            for param in self.user_parameters.values()
-        ])
-
         # Phản hồi người dùng
         if missing_params:
             response = (
@@ -300,17 +281,20 @@ class NLPModel:
         """
         Xử lý khi người dùng muốn chỉnh sửa thông số.
         """
-        extracted_params = self.extract_drawing_parameters(user_input)
-        updated_entities = []
+        updated_entities, invalid_entities = self.apply_parameters(user_input)
 
-        # Cập nhật thông số dựa trên input người dùng
-        for key, param in self.user_parameters.items():
-            if key in extracted_params and extracted_params[key].get("size"):
-                self.user_parameters[key]["size"] = extracted_params[key]["size"]
-                self.user_parameters[key]["unit"] = extracted_params[key]["unit"]
-                updated_entities.append(param["type"])
-        # Tạo lại bảng thông số sau khi cập nhật
-        df = pd.DataFrame([
+        response = f"Tôi đã cập nhật thông số các thông số \n"
+        if invalid_entities:
+            response += f"Các thông số không hợp lệ (bỏ qua): {self.refill(invalid_entities)}\n"
+        response += "\nDưới đây là bảng thông số hiện tại:\n"
+
+        return response
+
+    def parameter_rows(self):
+        """
+        Bảng thông số hiện tại dạng danh sách dòng (dùng cho xuất bảng, xem /api/parameters/export).
+        """
+        return [
             {
                 "Thực thể": param["type"],
                 "Kích thước": param["size"],
@@ -318,23 +302,13 @@ class NLPModel:
                 "Có/Không": param.get("present", "")  # Dành cho quầy lễ tân
             }
             for param in self.user_parameters.values()
-        ])
+        ]
 
-        response = f"Tôi đã cập nhật thông số các thông số \n"
-        response += "\nDưới đây là bảng thông số hiện tại:\n"
-
-        return response
-    
-    
     def remove_reception_desk(self):
         """
         Loại bỏ quầy lễ tân khỏi thông số hiện tại.
         """
-        # Kiểm tra và cập nhật thông số quầy lễ tân
-        if "reception_desk" in self.user_parameters:
-            self.user_parameters["reception_desk"]["present"] = "Không"
-            self.user_parameters["reception_desk"]["size"] = "0x0"  # Đặt kích thước về 0
-            self.user_parameters["reception_desk"]["unit"] = ""   # Xóa đơn vị
+        self.parameters = self.parameters.with_value("reception_desk", (0.0, 0.0)).with_reception_present(False)
 
         # Tạo phản hồi cho người dùng
         response = "Quầy lễ tân đã được loại bỏ khỏi thông số hiện tại."
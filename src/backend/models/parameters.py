@@ -0,0 +1,115 @@
+from dataclasses import dataclass, replace
+
+from models.size_parser import format_dimensions, parse_dimensions
+
+# Khóa thông số ở dạng JSON -> (thuộc tính của LayoutParameters, nhãn "type", số chiều)
+PARAMETER_FIELDS = {
+    "room": ("room", "phòng", 2),
+    "table": ("table", "bàn", 2),
+    "chair": ("chair", "ghế", 2),
+    "distance_between_tables": ("table_gap", "giữa", 1),
+    "aisle_distance": ("aisle", "lối", 1),
+    "reception_desk": ("reception", "quầy", 2),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class LayoutParameters:
+    """
+    Thông số thiết kế đã kiểm tra hợp lệ, mọi kích thước là số thực đơn vị cm.
+    Đối tượng bất biến: cập nhật bằng with_value() tạo đối tượng mới, không có dict dùng chung bị sửa ngầm.
+    Dạng chuỗi ("700x500", "cm") chỉ dùng ở biên JSON (from_dict/to_dict).
+    """
+    room: tuple = (700.0, 500.0)
+    table: tuple = (120.0, 60.0)
+    chair: tuple = (60.0, 60.0)
+    table_gap: float = 5.0
+    aisle: float = 98.0
+    reception: tuple = (0.0, 0.0)
+    reception_present: bool = False
+    obstacles: tuple = ()  # Các vật cản (x, y, width, height)
+
+    def __post_init__(self):
+        for name in ("room", "table", "chair"):
+            width, height = getattr(self, name)
+            if not (width > 0 and height > 0):
+                raise ValueError(f"Kích thước {name} phải lớn hơn 0: {getattr(self, name)}")
+        width, height = self.reception
+        if width < 0 or height < 0:
+            raise ValueError(f"Kích thước quầy lễ tân không hợp lệ: {self.reception}")
+        if self.table_gap < 0 or self.aisle < 0:
+            raise ValueError(f"Khoảng cách không hợp lệ: {self.table_gap}, {self.aisle}")
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Đọc thông số dạng JSON ({"room": {"size": "700x500", "unit": "cm"}, ...}); khóa thiếu lấy giá trị mặc định.
+        :raises ValueError: Khi có kích thước, đơn vị hoặc vật cản không hợp lệ.
+        """
+        values = {}
+        for key, (name, _, dimensions) in PARAMETER_FIELDS.items():
+            entry = data.get(key)
+            if entry is None:
+                continue
+            try:
+                parsed = parse_dimensions(entry.get("size", ""), entry.get("unit") or "")
+            except ValueError as e:
+                raise ValueError(f"Thông số {key} không hợp lệ: {entry}") from e
+            if len(parsed) != dimensions:
+                raise ValueError(f"Thông số {key} cần {dimensions} chiều: {entry}")
+            values[name] = parsed if dimensions > 1 else parsed[0]
+        if "reception_desk" in data:
+            values["reception_present"] = data["reception_desk"].get("present") == "Có"
+
+        obstacles = []
+        for obstacle in data.get("obstacles", ()):
+            if isinstance(obstacle, dict):
+                obstacle = [obstacle["x"], obstacle["y"], obstacle["width"], obstacle["height"]]
+            if len(obstacle) != 4:
+                raise ValueError(f"Vật cản không hợp lệ: {obstacle}")
+            obstacles.append(tuple(float(v) for v in obstacle))
+        return cls(**values, obstacles=tuple(obstacles))
+
+    def to_dict(self):
+        """
+        Dạng JSON của thông số (kích thước dạng chuỗi, đơn vị cm), dùng cho response và kho phiên.
+        """
+        data = {}
+        for key, (name, label, dimensions) in PARAMETER_FIELDS.items():
+            value = getattr(self, name)
+            data[key] = {"type": label, "size": format_dimensions(value if dimensions > 1 else (value,)), "unit": "cm"}
+        data["reception_desk"]["present"] = "Có" if self.reception_present else "Không"
+        if self.obstacles:
+            data["obstacles"] = [list(obstacle) for obstacle in self.obstacles]
+        return data
+
+    def with_value(self, key, values):
+        """
+        Bản sao với một thông số được thay (theo khóa JSON, giá trị cm).
+        :raises ValueError: Khi số chiều hoặc giá trị không hợp lệ.
+        """
+        name, _, dimensions = PARAMETER_FIELDS[key]
+        if len(values) != dimensions:
+            raise ValueError(f"Thông số {key} cần {dimensions} chiều: {values}")
+        return replace(self, **{name: tuple(values) if dimensions > 1 else values[0]})
+
+    def with_reception_present(self, present):
+        return replace(self, reception_present=present)
+
+    def config_vector(self):
+        """
+        Cấu hình số theo thứ tự grid_layout.CONFIG_COLUMNS; quầy lễ tân vắng mặt = 0x0.
+        """
+        desk_w, desk_h = self.reception if self.reception_present else (0.0, 0.0)
+        return [*self.room, *self.table, *self.chair, self.table_gap, self.aisle, desk_w, desk_h]
+
+    @classmethod
+    def from_config_vector(cls, vector, obstacles=()):
+        """
+        Ngược lại của config_vector(); quầy lễ tân 0x0 là vắng mặt.
+        :param obstacles: Các vật cản (x, y, width, height) (không có trong cấu hình số).
+        """
+        room_w, room_h, table_w, table_h, chair_w, chair_h, table_gap, aisle, desk_w, desk_h = (float(v) for v in vector)
+        return cls(room=(room_w, room_h), table=(table_w, table_h), chair=(chair_w, chair_h), table_gap=table_gap,
+                   aisle=aisle, reception=(desk_w, desk_h), reception_present=desk_w > 0 and desk_h > 0,
+                   obstacles=tuple(obstacles))
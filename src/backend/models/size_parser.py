@@ -0,0 +1,66 @@
+import math
+from functools import lru_cache
+
+# Số chuỗi kích thước khác nhau được nhớ (mỗi mục chỉ vài chục byte)
+SIZE_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=SIZE_CACHE_SIZE)
+def parse_size_and_unit(value):
+    """
+    Phân tích kích thước và đơn vị từ chuỗi giá trị.
+    Ví dụ: "2x3m" -> ("2x3", "m")
+    """
+    size = ""
+    unit = "m"  # Mặc định là mét
+
+    # Tìm kích thước (chữ số và "x")
+    for part in value.split():
+        if any(char.isdigit() for char in part) or "x" in part:
+            size = part.strip()
+
+        # Tìm đơn vị
+        if "cm" in part:
+            unit = "cm"
+        elif "m" in part:
+            unit = "m"
+
+    return size, unit
+
+
+@lru_cache(maxsize=SIZE_CACHE_SIZE)
+def parse_dimensions(size, unit="cm"):
+    """
+    Chuyển chuỗi kích thước về các số thực đơn vị cm.
+    Ví dụ: ("10x8", "m") -> (1000.0, 800.0), ("98", "cm") -> (98.0,)
+    :param unit: "cm", "m" hoặc "" (coi như cm).
+    :raises ValueError: Khi kích thước hoặc đơn vị không hợp lệ.
+    """
+    if unit not in ("cm", "m", ""):
+        raise ValueError(f"Đơn vị không hợp lệ: {unit!r}")
+    scale = 100.0 if unit == "m" else 1.0  # Chuyển đổi mét sang cm
+    values = []
+    for dim in size.split("x"):
+        value = float(dim) * scale  # ValueError nếu không phải số
+        if not math.isfinite(value) or value < 0:
+            raise ValueError(f"Kích thước không hợp lệ: {size!r}")
+        values.append(value)
+    return tuple(values)
+
+
+def format_dimensions(values):
+    """
+    Dạng chuỗi của kích thước (cm) dùng ở biên JSON, ví dụ (1000.0, 800.0) -> "1000x800".
+    """
+    # Chuyển về dạng số nguyên nếu không có phần thập phân
+    return "x".join(str(int(value)) if float(value).is_integer() else str(value) for value in values)
+
+
+def cache_stats():
+    """
+    Số lần hit/miss và số mục của các cache chuỗi kích thước.
+    """
+    return {
+        function.__name__: {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+        for function, info in ((function, function.cache_info()) for function in (parse_size_and_unit, parse_dimensions))
+    }
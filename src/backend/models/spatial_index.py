@@ -0,0 +1,101 @@
+import math
+from collections import defaultdict
+
+import numpy as np
+
+
+class SpatialIndex:
+    """
+    Chỉ mục lưới đều (uniform grid) cho các hình chữ nhật đã chiếm chỗ (quầy lễ tân, cột, cửa, ...).
+    Mỗi hình chữ nhật được gán vào các ô lưới nó phủ lên; truy vấn chỉ kiểm tra các hình trong cùng ô,
+    nên chi phí mỗi truy vấn gần như không phụ thuộc tổng số vật cản.
+    """
+
+    # Số vật cản tối đa để query_mask so khớp trực tiếp bằng NumPy thay vì duyệt lưới
+    dense_threshold = 32
+
+    def __init__(self, cell_size=100.0, rects=()):
+        """
+        :param cell_size: Kích thước cạnh ô lưới (cm).
+        :param rects: Các hình chữ nhật [x, y, width, height] ban đầu.
+        """
+        self.cell_size = float(cell_size)
+        self.rects = []
+        self.cells = defaultdict(list)
+        for rect in rects:
+            self.insert(rect)
+
+    def __len__(self):
+        return len(self.rects)
+
+    def _cell_range(self, x, y, w, h):
+        size = self.cell_size
+        return (
+            range(math.floor(x / size), math.floor((x + w) / size) + 1),
+            range(math.floor(y / size), math.floor((y + h) / size) + 1),
+        )
+
+    def insert(self, rect):
+        """
+        Thêm một hình chữ nhật [x, y, width, height]. Hình có diện tích 0 bị bỏ qua.
+        """
+        x, y, w, h = (float(v) for v in rect)
+        if w <= 0 or h <= 0:
+            return
+        index = len(self.rects)
+        self.rects.append((x, y, w, h))
+        cols, rows = self._cell_range(x, y, w, h)
+        for cx in cols:
+            for cy in rows:
+                self.cells[(cx, cy)].append(index)
+
+    def intersects(self, rect):
+        """
+        Kiểm tra hình chữ nhật có chồng lấn (diện tích giao > 0) với hình nào trong chỉ mục không.
+        """
+        if not self.rects:
+            return False
+        x, y, w, h = rect
+        cols, rows = self._cell_range(x, y, w, h)
+        for cx in cols:
+            for cy in rows:
+                for index in self.cells.get((cx, cy), ()):
+                    ox, oy, ow, oh = self.rects[index]
+                    if x < ox + ow and x + w > ox and y < oy + oh and y + h > oy:
+                        return True
+        return False
+
+    def query_mask(self, rects):
+        """
+        Phiên bản theo mảng của intersects.
+        :param rects: Mảng (N, 4).
+        :return: Mặt nạ bool (N,), True nếu hình tương ứng chồng lấn vật cản.
+        """
+        rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+        mask = np.zeros(len(rects), dtype=bool)
+        if not self.rects:
+            return mask
+        if len(self.rects) <= self.dense_threshold:
+            # Ít vật cản: so khớp toàn bộ bằng broadcasting NumPy nhanh hơn duyệt ô lưới
+            obstacles = np.array(self.rects)
+            x, y, w, h = (rects[:, i, None] for i in range(4))
+            ox, oy, ow, oh = (obstacles[None, :, i] for i in range(4))
+            return ((x < ox + ow) & (x + w > ox) & (y < oy + oh) & (y + h > oy)).any(axis=1)
+        for i, rect in enumerate(rects.tolist()):
+            mask[i] = self.intersects(rect)
+        return mask
+
+
+def build_obstacle_index(room_w, room_h, desk_w, desk_h, obstacles=()):
+    """
+    Tạo chỉ mục gồm quầy lễ tân (góc trên bên trái phòng) và các vật cản khác.
+    :param obstacles: Danh sách vật cản dạng [x, y, width, height] hoặc dict {"x", "y", "width", "height"}.
+    """
+    index = SpatialIndex()
+    if desk_w > 0:
+        index.insert([0, room_h - desk_h, desk_w, desk_h])
+    for obstacle in obstacles:
+        if isinstance(obstacle, dict):
+            obstacle = [obstacle["x"], obstacle["y"], obstacle["width"], obstacle["height"]]
+        index.insert(obstacle)
+    return index
@@ -0,0 +1,133 @@
+from dataclasses import dataclass, field
+
+from models.parameters import LayoutParameters
+
+# Khoảng cách (cm) giữa các phòng được xếp tự động trên mặt bằng một tầng
+ROOM_SPACING = 100.0
+
+
+@dataclass(frozen=True, slots=True)
+class VenueRoom:
+    """
+    Một phòng của địa điểm (phòng game, phòng VIP, ...) với thông số bố trí riêng.
+    Vị trí là góc dưới bên trái của phòng trên mặt bằng tầng (cm); None thì được xếp tự động (xem Venue.floor_plan).
+    """
+    name: str
+    parameters: LayoutParameters = field(default_factory=LayoutParameters)
+    kind: str = "gaming"  # Loại phòng, dùng để gom thống kê (ví dụ "gaming", "vip")
+    floor: int = 1
+    position: tuple = None
+
+    def __post_init__(self):
+        if self.position is not None and min(self.position) < 0:
+            raise ValueError(f"Vị trí phòng {self.name} không được âm: {self.position}")
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Đọc phòng dạng JSON: {"name": "VIP 1", "type": "vip", "floor": 2, "position": [x, y] hoặc {"x", "y"},
+        "parameters": {thông số dạng LayoutParameters.from_dict}}.
+        :raises ValueError: Khi thiếu tên hoặc có thông số không hợp lệ.
+        """
+        name = str(data.get("name") or "").strip()
+        if not name:
+            raise ValueError(f"Phòng cần có tên: {data}")
+        position = data.get("position")
+        if isinstance(position, dict):
+            position = [position["x"], position["y"]]
+        if position is not None:
+            if len(position) != 2:
+                raise ValueError(f"Vị trí phòng {name} không hợp lệ: {position}")
+            position = tuple(float(v) for v in position)
+        # Tầng phải là số nguyên (2 hoặc 2.0); không làm tròn để phòng không bị đặt nhầm sang tầng khác
+        floor = data.get("floor", 1)
+        if isinstance(floor, float) and floor.is_integer():
+            floor = int(floor)
+        if isinstance(floor, bool) or not isinstance(floor, int):
+            raise ValueError(f"Tầng của phòng {name} không hợp lệ: {floor!r}")
+        return cls(
+            name=name,
+            parameters=LayoutParameters.from_dict(data.get("parameters") or {}),
+            kind=str(data.get("type") or "gaming"),
+            floor=floor,
+            position=position,
+        )
+
+    def to_dict(self):
+        data = {"name": self.name, "type": self.kind, "floor": self.floor, "parameters": self.parameters.to_dict()}
+        if self.position is not None:
+            data["position"] = list(self.position)
+        return data
+
+
+@dataclass(frozen=True, slots=True)
+class Venue:
+    """
+    Địa điểm gồm nhiều phòng trên một hoặc nhiều tầng. Mỗi phòng được bố trí độc lập (như một "phòng" của chat),
+    mặt bằng của tầng chỉ đặt các phòng cạnh nhau để vẽ chung.
+    """
+    name: str = ""
+    rooms: tuple = ()
+
+    def __post_init__(self):
+        if not self.rooms:
+            raise ValueError("Địa điểm cần có ít nhất một phòng")
+        names = [room.name for room in self.rooms]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Tên phòng bị trùng: {', '.join(duplicates)}")
+        # Các phòng đặt vị trí thủ công trên cùng một tầng không được chồng lên nhau
+        placed = [room for room in self.rooms if room.position is not None]
+        for i, first in enumerate(placed):
+            for second in placed[i + 1:]:
+                if first.floor == second.floor and _overlaps(_rect(first), _rect(second)):
+                    raise ValueError(f"Phòng {first.name} và {second.name} chồng lên nhau trên tầng {first.floor}")
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Đọc địa điểm dạng JSON: {"name": "...", "rooms": [phòng dạng VenueRoom.from_dict, ...]}.
+        :raises ValueError: Khi có phòng hoặc thông số không hợp lệ.
+        """
+        rooms = data.get("rooms")
+        if not isinstance(rooms, list):
+            raise ValueError("Địa điểm cần danh sách rooms")
+        return cls(name=str(data.get("name") or ""), rooms=tuple(VenueRoom.from_dict(room) for room in rooms))
+
+    def to_dict(self):
+        return {"name": self.name, "rooms": [room.to_dict() for room in self.rooms]}
+
+    def floors(self):
+        return sorted({room.floor for room in self.rooms})
+
+    def floor_plan(self, floor):
+        """
+        Vị trí các phòng của một tầng. Phòng không có position được xếp thành một hàng (y = 0) bên phải các phòng đã
+        có vị trí, cách nhau ROOM_SPACING.
+        :return: (danh sách (VenueRoom, x, y) theo thứ tự khai báo, chiều rộng, chiều cao của mặt bằng).
+        """
+        rooms = [room for room in self.rooms if room.floor == floor]
+        right = max((room.position[0] + room.parameters.room[0] for room in rooms if room.position is not None),
+                    default=None)
+        next_x = 0.0 if right is None else right + ROOM_SPACING
+        placements = []
+        for room in rooms:
+            if room.position is not None:
+                x, y = room.position
+            else:
+                x, y = next_x, 0.0
+                next_x += room.parameters.room[0] + ROOM_SPACING
+            placements.append((room, x, y))
+        width = max(x + room.parameters.room[0] for room, x, _ in placements)
+        height = max(y + room.parameters.room[1] for room, _, y in placements)
+        return placements, width, height
+
+
+def _rect(room):
+    return (*room.position, *room.parameters.room)
+
+
+def _overlaps(first, second):
+    x1, y1, w1, h1 = first
+    x2, y2, w2, h2 = second
+    return x1 < x2 + w2 and x2 < x1 + w1 and y1 < y2 + h2 and y2 < y1 + h1
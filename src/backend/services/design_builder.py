@@ -0,0 +1,99 @@
+import logging
+import time
+
+import numpy as np
+
+from services.layout_renderer import render_layout
+from services.design_cache import CachedDesign, design_id_for
+
+logger = logging.getLogger(__name__)
+
+# Bố trí dùng LayoutEngine (chỉ NumPy), không qua NetCafeModel: process worker render không phải nạp torch.
+# Vẫn import khi tính bố trí, nên process web chỉ gửi job không phải nạp cả lõi bố trí
+
+
+def warm_up(mode="grid"):
+    """
+    Nạp trước lõi bố trí (gọi trong process web khi render trong request, hoặc gửi vào từng process worker).
+    :param mode: Chế độ bố trí mặc định; "refine" nạp thêm torch và chạy thử bộ tối ưu.
+    """
+    import models.layout_engine  # noqa: F401
+    if mode == "refine":
+        from models.layout_refiner import warm_up as warm_up_refiner
+        warm_up_refiner()
+
+
+def build_design(parameters, mode="grid", renderer="png", design_id=None):
+    """
+    Tính bố trí và vẽ bản thiết kế vào bộ nhớ (không dùng cache, không ghi file).
+    Hàm ở mức module và chỉ nhận/trả dữ liệu pickle được, nên chạy được trong process worker của RenderQueue.
+    :param parameters: LayoutParameters của phiên người dùng.
+    :param mode: Chế độ bố trí ("grid", "optimize" hoặc "refine").
+    :param renderer: Renderer dùng để vẽ.
+    :param design_id: Khóa nội dung đã tính sẵn; None thì tính lại từ thông số.
+    :return: CachedDesign chứa các mảng layout và nội dung ảnh.
+    """
+    from models.layout_engine import LayoutEngine
+
+    start = time.perf_counter()
+    try:
+        layout_engine = LayoutEngine(parameters, mode=mode)
+        if design_id is None:
+            design_id = design_id_for(parameters, mode, renderer)
+    except Exception:
+        logger.exception("Error initializing LayoutEngine")
+        raise
+
+    # Tính toán layout: mảng (N, 4) float32
+    try:
+        tables, chairs, reception = layout_engine.compute()
+    except Exception:
+        logger.exception("Error calculating layout")
+        raise
+    layout_done = time.perf_counter()
+
+    # Lấy kích thước phòng
+    room_width, room_height = parameters.room
+
+    total_room_area = room_width * room_height
+    # Tổng diện tích bàn + ghế tính trên cả mảng (float64), không lặp từng phần tử
+    used_area = float(np.prod(tables[:, 2:], axis=1, dtype=np.float64).sum()
+                      + np.prod(chairs[:, 2:], axis=1, dtype=np.float64).sum())
+    efficiency = (used_area / total_room_area) * 100
+
+    # Vẽ hình ảnh vào bộ nhớ bằng renderer được chọn (matplotlib, png hoặc svg)
+    try:
+        content, extension, mimetype = render_layout(renderer, room_width, room_height, tables, chairs, reception)
+    except Exception:
+        logger.exception("Error rendering layout")
+        raise
+    render_done = time.perf_counter()
+
+    layout_ms = (layout_done - start) * 1000
+    render_ms = (render_done - layout_done) * 1000
+    logger.info(
+        "Design %s built: %d tables, efficiency %.1f%%, layout %.1f ms, render %.1f ms",
+        design_id, len(tables), efficiency, layout_ms, render_ms,
+        extra={"design_id": design_id, "mode": mode, "renderer": renderer, "tables": len(tables),
+               "efficiency": round(float(efficiency), 2), "layout_ms": round(layout_ms, 2),
+               "render_ms": round(render_ms, 2)}
+    )
+
+    return CachedDesign(
+        design_id=design_id,
+        layout={
+            "room": (room_width, room_height),
+            "tables": tables,
+            "chairs": chairs,
+            "reception": reception,
+            "efficiency": float(efficiency),
+            "mode": mode,
+            "renderer": renderer,
+        },
+        content=content,
+        extension=extension,
+        mimetype=mimetype,
+        # Process worker không có registry của process web: thời gian được gửi kèm kết quả
+        timings={"forward": layout_done - start, "render": render_done - layout_done}
+    )
+
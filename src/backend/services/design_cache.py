@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def design_key(config, obstacles=(), mode="grid", renderer="png"):
+    """
+    Khóa nội dung (content address) của một bản thiết kế.
+    :param config: Cấu hình số đã chuẩn hóa về cm (LayoutParameters.config_vector()), quầy lễ tân vắng mặt = 0x0.
+    :param obstacles: Các vật cản bổ sung trong thông số.
+    :param mode: Chế độ bố trí.
+    :param renderer: Renderer dùng để vẽ.
+    :return: Chuỗi hex SHA-256 (32 ký tự đầu).
+    """
+    canonical = json.dumps(
+        {"config": [float(v) for v in config], "obstacles": obstacles, "mode": mode, "renderer": renderer},
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def design_id_for(parameters, mode="grid", renderer="png"):
+    """
+    Khóa nội dung của bản thiết kế từ LayoutParameters.
+    """
+    return design_key(parameters.config_vector(), [list(obstacle) for obstacle in parameters.obstacles], mode, renderer)
+
+
+class CachedDesign:
+    """
+    Một bản thiết kế đã vẽ: các mảng layout, nội dung ảnh trong bộ nhớ và (nếu được lưu) file trên đĩa.
+    """
+
+    def __init__(self, design_id, layout, content, extension, mimetype, file_path=None, timings=None):
+        """
+        :param design_id: Khóa nội dung (design_key), dùng làm tên file và ETag.
+        :param layout: Dict các mảng NumPy ("tables", "chairs", "reception") và thông tin phòng.
+        :param content: Nội dung ảnh dạng bytes.
+        :param file_path: Đường dẫn file nếu bản thiết kế đã được ghi xuống đĩa.
+        :param timings: Thời gian (giây) từng giai đoạn khi tạo bản thiết kế, ví dụ {"forward": ..., "render": ...}.
+        """
+        self.design_id = design_id
+        self.layout = layout
+        self.content = content
+        self.extension = extension
+        self.mimetype = mimetype
+        self.file_path = file_path
+        self.timings = timings or {}
+        self.created_at = time.monotonic()
+        self.size = len(content) + sum(getattr(value, "nbytes", 0) for value in layout.values())
+
+    @property
+    def file_name(self):
+        return f"design_{self.design_id}.{self.extension}"
+
+
+class DesignCache:
+    """
+    Cache LRU các bản thiết kế theo khóa nội dung, giới hạn theo số mục, tổng dung lượng và tuổi.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=256 * 1024 * 1024, max_age=300):
+        """
+        :param max_entries: Số bản thiết kế tối đa.
+        :param max_bytes: Tổng dung lượng tối đa (nội dung ảnh + mảng layout).
+        :param max_age: Tuổi tối đa (giây) của một mục.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key):
+        """
+        Lấy bản thiết kế theo khóa; mục hết hạn được coi là miss.
+        Nếu file trên đĩa đã bị xóa, mục vẫn dùng được từ bộ nhớ nhưng file_path được bỏ đi.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.created_at > self.max_age:
+                self._remove(key)
+                entry = None
+            if entry is not None and entry.file_path and not os.path.exists(entry.file_path):
+                entry.file_path = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._total_bytes += entry.size
+            self._evict()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._entries:
+            oldest_key, oldest = next(iter(self._entries.items()))
+            if (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+                    or now - oldest.created_at > self.max_age):
+                self._remove(oldest_key)
+            else:
+                break
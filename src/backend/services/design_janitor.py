@@ -0,0 +1,154 @@
+import heapq
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DesignJanitor:
+    """
+    Một luồng nền duy nhất quản lý việc xóa file trong DESIGN_FOLDER:
+    hàng đợi ưu tiên theo thời điểm hết hạn, quét lại thư mục khi khởi động (theo mtime)
+    và giới hạn tổng dung lượng thư mục.
+    """
+
+    def __init__(self, folder, ttl=600, max_bytes=512 * 1024 * 1024):
+        """
+        :param folder: Thư mục chứa file thiết kế.
+        :param ttl: Thời gian sống mặc định (giây) của một file.
+        :param max_bytes: Dung lượng tối đa của thư mục; vượt quá thì xóa các file hết hạn sớm nhất. Chỉ tính các file
+                          janitor này quản lý, nên khi nhiều process dùng chung thư mục thì mỗi process nhận một phần.
+        """
+        self.folder = folder
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.deleted_count = 0
+        self._heap = []  # (thời điểm hết hạn, đường dẫn)
+        self._expiry = {}  # đường dẫn -> thời điểm hết hạn mới nhất
+        self._sizes = {}  # đường dẫn -> kích thước file
+        self._total_bytes = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._stopped = False
+
+    @property
+    def pending_count(self):
+        """
+        Số file đang chờ xóa.
+        """
+        with self._condition:
+            return len(self._expiry)
+
+    @property
+    def total_bytes(self):
+        """
+        Tổng dung lượng các file đang được quản lý.
+        """
+        with self._condition:
+            return self._total_bytes
+
+    def start(self):
+        """
+        Quét lại thư mục (file còn sót từ lần chạy trước) rồi khởi động luồng dọn dẹp.
+        """
+        self.rescan()
+        self._ensure_thread()
+
+    def rescan(self):
+        """
+        Lên lịch xóa mọi file có trong thư mục theo mtime + ttl.
+        """
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if os.path.isfile(path):
+                self._push(path, stat.st_mtime + self.ttl, stat.st_size)
+        with self._condition:
+            self._condition.notify()
+
+    def schedule(self, path, ttl=None):
+        """
+        Lên lịch xóa một file sau ttl giây (ghi đè lịch cũ nếu file đã được lên lịch).
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        self._push(path, time.time() + (self.ttl if ttl is None else ttl), size)
+        self._ensure_thread()
+        with self._condition:
+            self._condition.notify()
+
+    def flush(self):
+        """
+        Xóa ngay các file đã hết hạn (gọi khi tắt server).
+        """
+        self._collect(time.time())
+
+    def stop(self, flush=True):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if flush:
+            self.flush()
+
+    def _push(self, path, expires_at, size):
+        with self._condition:
+            self._total_bytes += size - self._sizes.get(path, 0)
+            self._sizes[path] = size
+            self._expiry[path] = expires_at
+            heapq.heappush(self._heap, (expires_at, path))
+
+    def _ensure_thread(self):
+        # Luồng không tồn tại sau fork (ví dụ worker gunicorn), nên khởi động lại theo pid
+        with self._condition:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="design-janitor", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                timeout = self._heap[0][0] - time.time() if self._heap else None
+                if timeout is None or timeout > 0:
+                    if self._total_bytes <= self.max_bytes:
+                        self._condition.wait(timeout)
+            self._collect(time.time())
+
+    def _collect(self, now):
+        """
+        Xóa các file đã hết hạn, sau đó xóa thêm file hết hạn sớm nhất nếu vượt max_bytes.
+        """
+        to_delete = []
+        with self._condition:
+            while self._heap and (self._heap[0][0] <= now or self._total_bytes > self.max_bytes):
+                expires_at, path = heapq.heappop(self._heap)
+                if self._expiry.get(path) != expires_at:
+                    continue  # Lịch cũ đã bị ghi đè
+                del self._expiry[path]
+                self._total_bytes -= self._sizes.pop(path, 0)
+                to_delete.append(path)
+
+        deleted = 0
+        for path in to_delete:
+            try:
+                os.remove(path)
+                deleted += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Failed to delete file %s: %s", path, e)
+        # deleted_count được đọc từ các thread request (/api/stats)
+        with self._condition:
+            self.deleted_count += deleted
@@ -0,0 +1,237 @@
+import io
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+# Màu sắc và nhãn giống bản vẽ matplotlib gốc: (viền, nền, nhãn, cỡ chữ)
+ROOM_STYLE = ("black", "none")
+RECEPTION_STYLE = ("blue", "lightblue", "Quầy lễ tân", 8)
+TABLE_STYLE = ("green", "lightgreen", "Bàn", 8)
+CHAIR_STYLE = ("orange", "yellow", "Ghế", 6)
+TITLE = "Net Cafe Layout"
+X_LABEL = "Chiều dài (cm)"
+Y_LABEL = "Chiều rộng (cm)"
+
+# Bảng màu RGB cho Pillow (tên màu SVG/matplotlib tương ứng)
+RGB = {
+    "black": (0, 0, 0),
+    "blue": (0, 0, 255),
+    "lightblue": (173, 216, 230),
+    "green": (0, 128, 0),
+    "lightgreen": (144, 238, 144),
+    "orange": (255, 165, 0),
+    "yellow": (255, 255, 0),
+    "white": (255, 255, 255),
+}
+
+
+def _entities(tables, chairs, reception):
+    """
+    Danh sách (style, rects) theo thứ tự vẽ: quầy lễ tân, bàn, ghế.
+    :param reception: Một [x, y, width, height], mảng (K, 4) (mặt bằng nhiều phòng) hoặc None.
+    """
+    groups = []
+    if reception is not None:
+        reception = np.asarray(reception)
+        groups.append((RECEPTION_STYLE, [list(reception)] if reception.ndim == 1 else reception))
+    groups.append((TABLE_STYLE, tables))
+    groups.append((CHAIR_STYLE, chairs))
+    return groups
+
+
+def render_svg(room_w, room_h, tables, chairs, reception=None, width=1000, rooms=None, title=TITLE):
+    """
+    Vẽ bố trí thành chuỗi SVG (ghép chuỗi trực tiếp, không qua matplotlib).
+    :param room_w: Chiều rộng phòng (cm).
+    :param room_h: Chiều cao phòng (cm).
+    :param tables: Mảng (N, 4) vị trí bàn [x, y, width, height].
+    :param chairs: Mảng (M, 4) vị trí ghế.
+    :param reception: [x, y, width, height] của quầy lễ tân hoặc None.
+    :param width: Chiều rộng vùng vẽ phòng (px).
+    :param rooms: Mặt bằng nhiều phòng: danh sách (x, y, width, height, tên) các phòng trong vùng room_w x room_h;
+                  None = một phòng chiếm cả vùng vẽ.
+    :param title: Tiêu đề bản vẽ.
+    :return: Nội dung SVG dạng bytes (UTF-8).
+    """
+    scale = width / room_w
+    height = room_h * scale
+    left, top, right, bottom = 70, 50, 20, 60
+    total_w, total_h = left + width + right, top + height + bottom
+
+    def rect(x, y, w, h, stroke, fill):
+        # Trục y của bản vẽ hướng lên như matplotlib
+        return (f'<rect x="{left + x * scale:.2f}" y="{top + (room_h - y - h) * scale:.2f}" '
+                f'width="{w * scale:.2f}" height="{h * scale:.2f}" stroke="{stroke}" fill="{fill}"/>')
+
+    def text(x, y, label, size, extra=""):
+        # Tên phòng/địa điểm do người dùng nhập: phải escape để SVG hợp lệ và không chèn được thẻ
+        return (f'<text x="{x:.2f}" y="{y:.2f}" font-size="{size}" text-anchor="middle" '
+                f'dominant-baseline="middle"{extra}>{escape(label)}</text>')
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{total_w:.0f}" height="{total_h:.0f}" '
+        f'viewBox="0 0 {total_w:.2f} {total_h:.2f}" font-family="DejaVu Sans, Arial, sans-serif">',
+        f'<rect width="100%" height="100%" fill="white"/>',
+        text(left + width / 2, top / 2, title, 16),
+    ]
+    rooms = rooms or [(0, 0, room_w, room_h, None)]
+    for x, y, w, h, _ in rooms:
+        parts.append(rect(x, y, w, h, *ROOM_STYLE))
+    label_scale = scale * 1.2  # Cỡ chữ tương đối theo tỷ lệ bản vẽ
+    for (stroke, fill, label, size), rects in _entities(tables, chairs, reception):
+        font_size = f"{max(size * label_scale, 4):.1f}"
+        for x, y, w, h in rects:
+            parts.append(rect(x, y, w, h, stroke, fill))
+            parts.append(text(left + (x + w / 2) * scale, top + (room_h - y - h / 2) * scale, label, font_size))
+
+    # Tên phòng vẽ sau cùng, trên nền trắng, để không bị bàn sát tường che mất
+    for x, y, w, h, name in rooms:
+        if name:
+            center_x, center_y = left + (x + w / 2) * scale, top + (room_h - y - h) * scale + 12
+            parts.append(f'<rect x="{center_x - len(name) * 4 - 4:.2f}" y="{center_y - 9:.2f}" '
+                         f'width="{len(name) * 8 + 8:.2f}" height="18" fill="white" stroke="black"/>')
+            parts.append(text(center_x, center_y, name, 12))
+
+    parts.append(text(left + width / 2, top + height + bottom - 15, X_LABEL, 14))
+    parts.append(text(20, top + height / 2, Y_LABEL, 14, f' transform="rotate(-90 20 {top + height / 2:.2f})"'))
+    parts.append("</svg>")
+    return "\n".join(parts).encode("utf-8")
+
+
+@lru_cache(maxsize=32)
+def _load_font(size):
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)  # Có đủ dấu tiếng Việt
+    except OSError:
+        return ImageFont.load_default(size)
+
+
+def _label_mask(label, font):
+    """
+    Ảnh mặt nạ 1-bit của một nhãn, tạo một lần rồi dán lại cho mọi thực thể cùng loại.
+    """
+    from PIL import Image, ImageDraw
+
+    left, top, right, bottom = font.getbbox(label)
+    mask = Image.new("1", (max(right - left, 1), max(bottom - top, 1)), 0)
+    ImageDraw.Draw(mask).text((-left, -top), label, fill=1, font=font)
+    return mask
+
+
+def render_png(room_w, room_h, tables, chairs, reception=None, width=1600, rooms=None, title=TITLE):
+    """
+    Raster hóa bố trí thành PNG bằng Pillow (nhẹ hơn nhiều so với matplotlib).
+    Ảnh dùng bảng màu (mode "P") để nén nhanh, nhãn được raster hóa một lần cho mỗi loại.
+    Tham số giống render_svg.
+    :return: Nội dung PNG dạng bytes.
+    """
+    from PIL import Image, ImageDraw
+
+    palette = list(RGB)
+    color = {name: index for index, name in enumerate(palette)}
+
+    scale = width / room_w
+    height = int(round(room_h * scale))
+    left, top, right, bottom = 90, 60, 30, 70
+    image = Image.new("P", (left + width + right, top + height + bottom), color["white"])
+    image.putpalette([channel for name in palette for channel in RGB[name]])
+    draw = ImageDraw.Draw(image)
+
+    def box(x, y, w, h):
+        x0, y0 = left + x * scale, top + (room_h - y - h) * scale
+        return [x0, y0, x0 + w * scale, y0 + h * scale]
+
+    def paste_label(mask, center_x, center_y):
+        image.paste(color["black"], (int(center_x - mask.width / 2), int(center_y - mask.height / 2)), mask)
+
+    paste_label(_label_mask(title, _load_font(22)), left + width / 2, top / 2)
+    rooms = rooms or [(0, 0, room_w, room_h, None)]
+    for x, y, w, h, _ in rooms:
+        draw.rectangle(box(x, y, w, h), outline=color[ROOM_STYLE[0]], width=2)
+
+    for (stroke, fill, label, size), rects in _entities(tables, chairs, reception):
+        mask = _label_mask(label, _load_font(max(int(size * scale * 1.2), 6)))
+        for x, y, w, h in rects:
+            corners = box(x, y, w, h)
+            draw.rectangle(corners, fill=color[fill], outline=color[stroke])
+            paste_label(mask, (corners[0] + corners[2]) / 2, (corners[1] + corners[3]) / 2)
+
+    # Tên phòng vẽ sau cùng, trên nền trắng, để không bị bàn sát tường che mất
+    for x, y, w, h, name in rooms:
+        if name:
+            mask = _label_mask(name, _load_font(16))
+            corners = box(x, y, w, h)
+            center_x, center_y = (corners[0] + corners[2]) / 2, corners[1] + 16
+            draw.rectangle([center_x - mask.width / 2 - 4, center_y - mask.height / 2 - 3,
+                            center_x + mask.width / 2 + 4, center_y + mask.height / 2 + 3],
+                           fill=color["white"], outline=color[ROOM_STYLE[0]])
+            paste_label(mask, center_x, center_y)
+
+    axis_font = _load_font(18)
+    paste_label(_label_mask(X_LABEL, axis_font), left + width / 2, top + height + bottom - 25)
+    y_mask = _label_mask(Y_LABEL, axis_font).rotate(90, expand=True)
+    paste_label(y_mask, 35, top + height / 2)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def render_matplotlib(room_w, room_h, tables, chairs, reception=None, dpi=300, rooms=None, title=TITLE):
+    """
+    Bản vẽ matplotlib như trước đây (chậm, giữ lại để so sánh). Dùng Figure riêng thay vì pyplot
+    để không phụ thuộc trạng thái toàn cục.
+    :return: Nội dung PNG dạng bytes.
+    """
+    from matplotlib.figure import Figure
+    import matplotlib.patches as patches
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.set_xlim(0, room_w)
+    ax.set_ylim(0, room_h)
+    rooms = rooms or [(0, 0, room_w, room_h, None)]
+    for x, y, w, h, _ in rooms:
+        ax.add_patch(patches.Rectangle((x, y), w, h, edgecolor=ROOM_STYLE[0], fill=None))
+
+    for (stroke, fill, label, size), rects in _entities(tables, chairs, reception):
+        for x, y, w, h in rects:
+            ax.add_patch(patches.Rectangle((x, y), w, h, edgecolor=stroke, facecolor=fill))
+            ax.text(x + w / 2, y + h / 2, label, color="black", fontsize=size, ha="center", va="center")
+
+    for x, y, w, h, name in rooms:
+        if name:
+            ax.text(x + w / 2, y + h, name, fontsize=10, ha="center", va="top",
+                    bbox={"facecolor": "white", "edgecolor": ROOM_STYLE[0]})
+
+    ax.set_xlabel(X_LABEL, fontsize=12)
+    ax.set_ylabel(Y_LABEL, fontsize=12)
+    ax.set_title(title)
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi)
+    return buffer.getvalue()
+
+
+# Tên renderer -> (hàm vẽ, phần mở rộng file, mimetype)
+RENDERERS = {
+    "matplotlib": (render_matplotlib, "png", "application/octet-stream"),
+    "png": (render_png, "png", "image/png"),
+    "svg": (render_svg, "svg", "image/svg+xml"),
+}
+
+
+def render_layout(renderer, room_w, room_h, tables, chairs, reception=None, rooms=None, title=TITLE):
+    """
+    Vẽ bố trí bằng renderer được chọn.
+    :param renderer: Một trong các khóa của RENDERERS.
+    :param rooms: Các phòng (x, y, width, height, tên) khi vẽ mặt bằng nhiều phòng (xem render_svg).
+    :return: (nội dung bytes, phần mở rộng file, mimetype).
+    """
+    if renderer not in RENDERERS:
+        raise ValueError(f"Renderer không hợp lệ: {renderer}")
+    render, extension, mimetype = RENDERERS[renderer]
+    return render(room_w, room_h, tables, chairs, reception, rooms=rooms, title=title), extension, mimetype
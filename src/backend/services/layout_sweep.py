@@ -0,0 +1,190 @@
+import itertools
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+
+import numpy as np
+
+from models.grid_layout import CONFIG_COLUMNS, evaluate_grid_batch
+from models.parameters import LayoutParameters
+from models.size_parser import format_dimensions
+
+# Các thông số có thể quét (thuộc tính của LayoutParameters); "reception" nhận thêm None = không có quầy lễ tân
+SWEEP_FIELDS = ("room", "table", "chair", "table_gap", "aisle", "reception")
+
+
+def sweep_configs(base, ranges):
+    """
+    Tích Descartes của các dải thông số, dạng cấu hình số (gửi sang process worker gọn hơn LayoutParameters).
+    :param base: LayoutParameters gốc; thông số không có trong ranges giữ nguyên.
+    :param ranges: Dict tên trong SWEEP_FIELDS -> danh sách giá trị (cm), ví dụ {"aisle": [80, 100, 120]}.
+    :return: Mảng (N, 10) theo thứ tự grid_layout.CONFIG_COLUMNS.
+    :raises ValueError: Khi có tên thông số lạ hoặc tổ hợp không hợp lệ.
+    """
+    unknown = set(ranges) - set(SWEEP_FIELDS)
+    if unknown:
+        raise ValueError(f"Thông số không quét được: {', '.join(sorted(unknown))}")
+    names = [name for name in SWEEP_FIELDS if name in ranges]
+    values = [ranges[name] for name in names]
+
+    configs = []
+    for combination in itertools.product(*values):
+        changes = dict(zip(names, combination))
+        if "reception" in changes:
+            changes["reception_present"] = changes["reception"] is not None
+            if changes["reception"] is None:
+                changes["reception"] = base.reception
+        for name in ("room", "table", "chair", "reception"):
+            if name in changes:
+                changes[name] = tuple(float(v) for v in changes[name])
+        configs.append(replace(base, **changes).config_vector())  # __post_init__ kiểm tra hợp lệ
+    return np.array(configs, dtype=np.float64).reshape(-1, len(CONFIG_COLUMNS))
+
+
+def evaluate_configs(configs, mode="grid", obstacles=()):
+    """
+    Đánh giá một phần (chunk) của sweep; hàm ở mức module để chạy được trong process worker.
+    Mode "grid" không có vật cản dùng evaluate_grid_batch (vector hóa cả chunk), các trường hợp khác chạy LayoutEngine
+    cho từng cấu hình.
+    :param configs: Mảng (K, 10) theo CONFIG_COLUMNS.
+    :param obstacles: Các vật cản (x, y, width, height) dùng chung cho mọi cấu hình.
+    :return: Dict mảng (K,): "seats", "tables", "efficiency" (% như draw_layout) và "free_area" (cm², diện tích
+             phòng trừ bàn, ghế, quầy lễ tân và vật cản).
+    """
+    configs = np.asarray(configs, dtype=np.float64).reshape(-1, len(CONFIG_COLUMNS))
+    room_w, room_h, table_w, table_h, chair_w, chair_h, _, _, desk_w, desk_h = configs.T
+
+    if mode == "grid" and not obstacles:
+        result = evaluate_grid_batch(configs, with_coordinates=False)
+        seats, tables = result["seats"], result["tables"]
+        used_area = tables * table_w * table_h + seats * chair_w * chair_h
+    else:
+        # Chỉ import khi cần: worker của mode "grid" không phải nạp bộ tối ưu
+        from models.layout_engine import LayoutEngine
+
+        seats = np.empty(len(configs), dtype=np.int64)
+        tables = np.empty(len(configs), dtype=np.int64)
+        used_area = np.empty(len(configs))
+        for i, vector in enumerate(configs):
+            layout_tables, layout_chairs, _ = LayoutEngine(
+                LayoutParameters.from_config_vector(vector, obstacles), mode=mode
+            ).compute()
+            seats[i], tables[i] = len(layout_chairs), len(layout_tables)
+            used_area[i] = (np.prod(layout_tables[:, 2:], axis=1, dtype=np.float64).sum()
+                            + np.prod(layout_chairs[:, 2:], axis=1, dtype=np.float64).sum())
+
+    room_area = room_w * room_h
+    obstacle_area = sum(w * h for _, _, w, h in obstacles)
+    return {
+        "seats": seats,
+        "tables": tables,
+        "efficiency": used_area / room_area * 100,
+        "free_area": room_area - used_area - desk_w * desk_h - obstacle_area,
+    }
+
+
+def iter_sweep(configs, mode="grid", obstacles=(), workers=None, chunk_size=None, start_method="spawn"):
+    """
+    Chạy sweep trên process pool, trả về từng chunk ngay khi xong (không theo thứ tự).
+    :param configs: Mảng (N, 10) từ sweep_configs.
+    :param workers: Số process (mặc định bằng số lõi CPU); 1 thì chạy ngay trong process hiện tại.
+    :param chunk_size: Số cấu hình mỗi lần gửi sang worker; mặc định chia khoảng 4 chunk mỗi worker để cân tải
+                       mà vẫn ít lần trao đổi giữa các process.
+    :param start_method: Cách tạo process worker ("spawn", "forkserver" hoặc "fork").
+    :return: Generator các (vị trí bắt đầu, số cấu hình, dict kết quả của evaluate_configs).
+    """
+    configs = np.asarray(configs, dtype=np.float64).reshape(-1, len(CONFIG_COLUMNS))
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, math.ceil(len(configs) / (workers * 4)))
+    starts = range(0, len(configs), chunk_size)
+    obstacles = tuple(obstacles)
+
+    if workers == 1 or len(starts) <= 1:
+        for start in starts:
+            chunk = configs[start:start + chunk_size]
+            yield start, len(chunk), evaluate_configs(chunk, mode, obstacles)
+        return
+
+    context = multiprocessing.get_context(start_method)
+    with ProcessPoolExecutor(max_workers=min(workers, len(starts)), mp_context=context) as executor:
+        futures = {
+            executor.submit(evaluate_configs, configs[start:start + chunk_size], mode, obstacles): start
+            for start in starts
+        }
+        try:
+            for future in as_completed(futures):
+                start = futures[future]
+                yield start, min(chunk_size, len(configs) - start), future.result()
+        finally:
+            # Dừng sớm (lỗi hoặc generator bị đóng): bỏ các chunk chưa chạy
+            for future in futures:
+                future.cancel()
+
+
+class SweepResult:
+    """
+    Kết quả của một sweep: cấu hình cùng các chỉ số theo đúng thứ tự cấu hình.
+    """
+
+    def __init__(self, configs, metrics, mode, elapsed):
+        self.configs = configs
+        self.metrics = metrics
+        self.mode = mode
+        self.elapsed = elapsed
+
+    def __len__(self):
+        return len(self.configs)
+
+    def ranked(self, top=None):
+        """
+        Bảng xếp hạng: nhiều chỗ ngồi trước, cùng số chỗ thì hiệu suất cao hơn trước, sau đó theo thứ tự cấu hình.
+        :param top: Chỉ lấy top dòng đầu (None: tất cả).
+        :return: Danh sách dict, kích thước dạng "WxH" (cm), free_area theo m².
+        """
+        metrics = self.metrics
+        order = np.lexsort((np.arange(len(self.configs)), -metrics["efficiency"], -metrics["seats"]))
+        rows = []
+        for rank, index in enumerate(order[:top], start=1):
+            room_w, room_h, table_w, table_h, chair_w, chair_h, gap, aisle, desk_w, desk_h = self.configs[index]
+            rows.append({
+                "rank": rank,
+                "index": int(index),
+                "room": format_dimensions((room_w, room_h)),
+                "table": format_dimensions((table_w, table_h)),
+                "chair": format_dimensions((chair_w, chair_h)),
+                "table_gap": float(gap),
+                "aisle": float(aisle),
+                "reception": format_dimensions((desk_w, desk_h)) if desk_w > 0 else None,
+                "seats": int(metrics["seats"][index]),
+                "tables": int(metrics["tables"][index]),
+                "efficiency": round(float(metrics["efficiency"][index]), 2),
+                "free_area_m2": round(float(metrics["free_area"][index]) / 10000, 2),
+            })
+        return rows
+
+
+def run_sweep(configs, mode="grid", obstacles=(), workers=None, chunk_size=None, progress=None, start_method="spawn"):
+    """
+    Chạy sweep và gom kết quả (xem iter_sweep).
+    :param progress: Hàm progress(số cấu hình đã xong, tổng số) gọi sau mỗi chunk.
+    :return: SweepResult.
+    """
+    configs = np.asarray(configs, dtype=np.float64).reshape(-1, len(CONFIG_COLUMNS))
+    started = time.perf_counter()
+    metrics = {
+        "seats": np.zeros(len(configs), dtype=np.int64),
+        "tables": np.zeros(len(configs), dtype=np.int64),
+        "efficiency": np.zeros(len(configs)),
+        "free_area": np.zeros(len(configs)),
+    }
+    done = 0
+    for start, count, chunk in iter_sweep(configs, mode, obstacles, workers, chunk_size, start_method):
+        for key, values in chunk.items():
+            metrics[key][start:start + count] = values
+        done += count
+        if progress:
+            progress(done, len(configs))
+    return SweepResult(configs, metrics, mode, time.perf_counter() - started)
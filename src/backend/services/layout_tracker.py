@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from models.incremental_layout import compute_grid_state, diff_grid_states, diff_layouts
+from models.parameters import LayoutParameters
+
+logger = logging.getLogger(__name__)
+
+
+class TrackedLayout:
+    """
+    Bố trí gần nhất của một phiên: các mảng (N, 4) float32 như LayoutEngine.compute(),
+    kèm GridLayoutState ở mode "grid".
+    """
+
+    def __init__(self, parameters, mode, tables, chairs, reception, description, grid_state=None):
+        self.parameters = parameters
+        self.mode = mode
+        self.tables = tables
+        self.chairs = chairs
+        self.reception = reception
+        self.description = description
+        self.grid_state = grid_state
+        self.updated_at = time.monotonic()
+
+    @property
+    def efficiency(self):
+        """
+        Tỷ lệ (%) diện tích bàn + ghế trên diện tích phòng, cùng cách tính với design_builder.build_design.
+        """
+        room_w, room_h = self.parameters.room
+        used_area = float(np.prod(self.tables[:, 2:], axis=1, dtype=np.float64).sum()
+                          + np.prod(self.chairs[:, 2:], axis=1, dtype=np.float64).sum())
+        return used_area / (room_w * room_h) * 100
+
+
+class LayoutTracker:
+    """
+    Giữ bố trí gần nhất của từng phiên (LRU, trong bộ nhớ của process) để mỗi lần thông số đổi chỉ tính lại phần bị ảnh
+    hưởng (xem incremental_layout.compute_grid_state) và trả về diff so với lần trước.
+    Mỗi process web có tracker riêng; khi có store (kho dùng chung giữa các process), thông số và mode của lần tính
+    gần nhất được ghi vào store, nên phiên chưa có bố trí trong process này được tính lại bố trí trước rồi mới diff.
+    """
+
+    def __init__(self, max_sessions=1024, ttl=3600, store=None):
+        """
+        :param max_sessions: Số phiên tối đa được giữ bố trí.
+        :param ttl: Thời gian (giây) giữ bố trí của một phiên kể từ lần cập nhật cuối.
+        :param store: SessionStore dùng chung (ví dụ SQLiteSessionStore) hoặc None nếu chỉ có một process.
+        """
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.store = store
+        self._layouts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._layouts)
+
+    def get(self, session_id):
+        """
+        Bố trí gần nhất của phiên, hoặc None nếu chưa có/đã hết hạn.
+        """
+        with self._lock:
+            tracked = self._layouts.get(session_id)
+            if tracked is None:
+                return None
+            if time.monotonic() - tracked.updated_at > self.ttl:
+                del self._layouts[session_id]
+                return None
+            self._layouts.move_to_end(session_id)
+            return tracked
+
+    def update(self, session_id, parameters, mode="grid"):
+        """
+        Tính bố trí cho thông số mới của phiên và ghi nhớ nó.
+        Mode "grid" dùng lại lưới và mặt nạ vật cản của lần trước; các mode khác tính lại toàn bộ (trừ khi thông số
+        không đổi) và diff chỉ so khớp đúng tọa độ.
+        :return: (TrackedLayout, diff hoặc None nếu phiên chưa có bố trí trước, số dãy đã kiểm tra vật cản hoặc None).
+        """
+        previous = self.get(session_id)
+        if previous is None and self.store is not None:
+            previous = self._restore(session_id)
+        if previous is not None and previous.mode == mode and previous.parameters == parameters:
+            tracked, checked = previous, 0
+        else:
+            tracked, checked = self._compute(parameters, mode, previous)
+
+        diff = None
+        if previous is not None:
+            if previous.grid_state is not None and tracked.grid_state is not None:
+                diff = diff_grid_states(previous.grid_state, tracked.grid_state)
+            else:
+                diff = diff_layouts((previous.tables, previous.chairs), (tracked.tables, tracked.chairs))
+
+        with self._lock:
+            tracked.updated_at = time.monotonic()
+            self._layouts[session_id] = tracked
+            self._layouts.move_to_end(session_id)
+            while len(self._layouts) > self.max_sessions:
+                self._layouts.popitem(last=False)
+        if self.store is not None:
+            self.store.save(session_id, {"parameters": parameters.to_dict(), "mode": mode})
+        return tracked, diff, checked
+
+    @staticmethod
+    def _compute(parameters, mode, previous=None):
+        # :return: (TrackedLayout, số dãy đã kiểm tra vật cản hoặc None)
+        if mode == "grid":
+            grid_state, checked = compute_grid_state(
+                parameters, previous.grid_state if previous is not None else None
+            )
+            tables, chairs, reception = grid_state.layout()
+            return TrackedLayout(parameters, mode, tables, chairs, reception, {"strategy": "grid"}, grid_state), checked
+
+        # Chỉ import khi cần: mode "grid" không phải nạp bộ tối ưu
+        from models.layout_engine import LayoutEngine
+
+        engine = LayoutEngine(parameters, mode=mode)
+        tables, chairs, reception = engine.compute()
+        return TrackedLayout(parameters, mode, tables, chairs, reception, engine.layout_description), None
+
+    def _restore(self, session_id):
+        # Bố trí gần nhất của phiên do process khác tính (đọc thông số từ store và tính lại toàn bộ)
+        stored = self.store.load(session_id)
+        if stored is None:
+            return None
+        try:
+            parameters = LayoutParameters.from_dict(stored["parameters"])
+            return self._compute(parameters, stored["mode"])[0]
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            logger.warning("Invalid stored layout for session %s: %s", session_id, e)
+            return None
@@ -0,0 +1,96 @@
+import contextvars
+import functools
+import json
+import logging
+import random
+import time
+import uuid
+
+# Request id và quyết định lấy mẫu của request hiện tại (contextvars: đúng cho cả thread lẫn asyncio)
+request_id_var = contextvars.ContextVar("request_id", default=None)
+sampled_var = contextvars.ContextVar("log_sampled", default=True)
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+# Thuộc tính có sẵn của LogRecord; các thuộc tính khác (truyền qua extra=) được ghi thành trường JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_sample_rate = 1.0
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Gắn request_id vào mọi bản ghi và bỏ các bản ghi DEBUG của request không được lấy mẫu.
+    Bản ghi bị bỏ ở đây chưa được format, nên log debug trên đường nóng gần như không tốn chi phí.
+    """
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return record.levelno > logging.DEBUG or sampled_var.get()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Mỗi bản ghi là một dòng JSON: thời gian, level, logger, message, request_id và các trường extra
+    (ví dụ duration_ms, layout_ms).
+    """
+
+    def format(self, record):
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        data.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def configure_logging(level="INFO", fmt="text", sample_rate=1.0):
+    """
+    Cấu hình root logger (gọi một lần ở process web và ở mỗi process worker render).
+    :param level: Level tối thiểu ("DEBUG", "INFO", ...). Log chi tiết của model/NLP ở mức DEBUG nên mặc định bị tắt.
+    :param fmt: "text" hoặc "json".
+    :param sample_rate: Tỷ lệ request (0..1) được ghi log DEBUG khi level là DEBUG.
+    """
+    global _sample_rate
+    if fmt not in ("text", "json"):
+        raise ValueError(f"Định dạng log không hợp lệ: {fmt}")
+    _sample_rate = sample_rate
+
+    handler = logging.StreamHandler()
+    handler.addFilter(RequestContextFilter())
+    handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    root = logging.getLogger()
+    for old_handler in list(root.handlers):
+        root.removeHandler(old_handler)
+    root.addHandler(handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def begin_request(request_id=None):
+    """
+    Bắt đầu ngữ cảnh log của một request: gán request id (tạo mới nếu không có) và quyết định lấy mẫu.
+    :return: (request_id, thời điểm bắt đầu theo time.perf_counter()).
+    """
+    request_id = request_id or uuid.uuid4().hex
+    request_id_var.set(request_id)
+    sampled_var.set(_sample_rate >= 1.0 or random.random() < _sample_rate)
+    return request_id, time.perf_counter()
+
+
+def bind_request_context(fn):
+    """
+    Gói fn để khi chạy ở process worker (RenderQueue) vẫn mang request id và quyết định lấy mẫu của request hiện tại.
+    :return: functools.partial pickle được (fn phải ở mức module).
+    """
+    return functools.partial(_run_in_request_context, request_id_var.get(), sampled_var.get(), fn)
+
+
+def _run_in_request_context(request_id, sampled, fn, *args, **kwargs):
+    request_id_var.set(request_id)
+    sampled_var.set(sampled)
+    return fn(*args, **kwargs)
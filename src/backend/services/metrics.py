@@ -0,0 +1,203 @@
+import bisect
+import contextlib
+import math
+import threading
+import time
+
+# Mốc (giây) của histogram độ trễ: từ tách từ (~10 µs) đến render phòng lớn (vài giây)
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = [*zip(labelnames, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Bộ đếm chỉ tăng, tùy chọn có nhãn (ví dụ counter.inc(endpoint="chat")).
+    """
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[name] for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram:
+    """
+    Histogram với các mốc cố định (mặc định LATENCY_BUCKETS, đơn vị giây).
+    """
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # nhãn -> [số đếm theo từng mốc (không cộng dồn) + mốc +Inf, tổng]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts[0][index] += 1
+            counts[1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, (("le", _format_value(float(bound))),))
+                samples.append((f"{self.name}_bucket", labels, cumulative))
+            labels = _format_labels(self.labelnames, key)
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class Gauge:
+    """
+    Giá trị đọc lúc scrape từ một hàm (ví dụ kích thước cache), không tốn gì trên đường nóng.
+    """
+    kind = "gauge"
+
+    def __init__(self, name, documentation, function, kind="gauge"):
+        """
+        :param function: Hàm không tham số trả về số.
+        :param kind: "gauge" hoặc "counter" (giá trị lấy từ bộ đếm có sẵn, ví dụ design_cache.hits).
+        """
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        self.kind = kind
+
+    def samples(self):
+        return [(self.name, "", self.function())]
+
+
+class MetricsRegistry:
+    """
+    Tập các chỉ số của process hiện tại, xuất theo định dạng text của Prometheus.
+    Khi tắt (enabled=False), timer() trả về một context manager rỗng dùng chung và observe/inc
+    qua các hàm tiện ích của registry không làm gì, nên chi phí trên đường nóng gần như bằng 0.
+    Mỗi process (mỗi worker gunicorn) có registry riêng: Prometheus scrape từng worker hoặc cộng theo instance.
+    """
+
+    def __init__(self, enabled=True, prefix="netcafe_"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric đã tồn tại: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self.prefix + name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(self.prefix + name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, function, kind="gauge"):
+        return self._register(Gauge(self.prefix + name, documentation, function, kind))
+
+    def inc(self, counter, amount=1, **labels):
+        if self.enabled:
+            counter.inc(amount, **labels)
+
+    def observe(self, histogram, value, **labels):
+        if self.enabled:
+            histogram.observe(value, **labels)
+
+    def timer(self, histogram, **labels):
+        """
+        Context manager đo thời gian một đoạn code vào histogram (giây).
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(histogram, labels)
+
+    def render(self):
+        """
+        :return: Nội dung cho endpoint /metrics (Content-Type: CONTENT_TYPE).
+        """
+        lines = []
+        for metric in self._metrics.values():
+            samples = metric.samples()
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+# Registry mặc định của process (app.py bật/tắt theo METRICS_ENABLED) và histogram thời gian từng giai đoạn
+REGISTRY = MetricsRegistry()
+STAGE_SECONDS = REGISTRY.histogram(
+    "stage_seconds", "Thời gian từng giai đoạn xử lý request (giây).", ("stage",)
+)
+
+
+def stage_timer(stage):
+    """
+    Đo thời gian một giai đoạn vào STAGE_SECONDS{stage=...}; không làm gì khi REGISTRY bị tắt.
+    """
+    return REGISTRY.timer(STAGE_SECONDS, stage=stage)
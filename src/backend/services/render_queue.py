@@ -0,0 +1,165 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """
+    Hàng đợi render đã đầy (số job đang chờ/đang chạy đạt max_pending).
+    """
+
+
+class RenderJob:
+    """
+    Một job render: trạng thái "queued" -> "running" -> "done" hoặc "failed".
+    """
+
+    def __init__(self, job_id, future=None, result=None):
+        self.job_id = job_id
+        self.future = future
+        self.result = result
+        self.error = None
+        self.created_at = time.monotonic()
+        self.finished_at = None if future is not None else self.created_at
+
+    @property
+    def status(self):
+        # Dựa vào finished_at thay vì future.done(): kết quả chỉ được gán sau khi future xong
+        if self.finished_at is None:
+            return "running" if self.future.running() else "queued"
+        return "failed" if self.error is not None else "done"
+
+
+class RenderQueue:
+    """
+    Hàng đợi job render có giới hạn, chạy trên process pool (render tốn CPU và matplotlib không thread-safe).
+    Trạng thái job nằm trong bộ nhớ của process web, nên mỗi worker gunicorn có hàng đợi riêng.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, job_ttl=600, start_method="spawn",
+                 initializer=None, initargs=()):
+        """
+        :param max_workers: Số process render tối đa (mặc định bằng số lõi CPU).
+        :param max_pending: Số job đang chờ + đang chạy tối đa (mặc định 4 x max_workers).
+        :param job_ttl: Thời gian (giây) giữ kết quả job đã xong trước khi bị xóa.
+        :param start_method: Cách tạo process worker ("spawn", "forkserver" hoặc "fork").
+        :param initializer: Hàm (pickle được) chạy một lần khi mỗi process worker khởi động, ví dụ cấu hình logging.
+        :param initargs: Tham số của initializer.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.max_workers
+        self.job_ttl = job_ttl
+        self.start_method = start_method
+        self.initializer = initializer
+        self.initargs = initargs
+        self.submitted_count = 0
+        self.rejected_count = 0
+        self.failed_count = 0
+        self._jobs = {}
+        self._pending = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def pending_count(self):
+        """
+        Số job đang chờ hoặc đang chạy.
+        """
+        with self._lock:
+            return self._pending
+
+    def __len__(self):
+        with self._lock:
+            return len(self._jobs)
+
+    def _get_executor(self):
+        # Pool được tạo khi có job đầu tiên, để process web khởi động nhanh và không fork khi import
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context(self.start_method),
+                initializer=self.initializer, initargs=self.initargs
+            )
+        return self._executor
+
+    def submit(self, fn, *args, on_done=None):
+        """
+        Đưa một job vào hàng đợi.
+        :param fn: Hàm ở mức module (pickle được) chạy trong process worker.
+        :param on_done: Hàm gọi trong process web với kết quả khi job thành công (ví dụ ghi vào cache).
+        :return: RenderJob.
+        :raises QueueFullError: Khi đã có max_pending job chưa xong.
+        """
+        with self._lock:
+            self._prune()
+            if self._pending >= self.max_pending:
+                self.rejected_count += 1
+                raise QueueFullError(f"Render queue is full ({self.max_pending} pending jobs)")
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except BrokenProcessPool:
+                # Một worker chết đột ngột (ví dụ bị OOM kill) làm hỏng cả pool: tạo pool mới
+                self._executor = None
+                future = self._get_executor().submit(fn, *args)
+            job = RenderJob(uuid.uuid4().hex, future=future)
+            self._jobs[job.job_id] = job
+            self._pending += 1
+            self.submitted_count += 1
+        job.future.add_done_callback(lambda future: self._finish(job, future, on_done))
+        return job
+
+    def prestart(self, fn):
+        """
+        Khởi động sẵn các process worker bằng cách gửi fn (hàm ở mức module, ví dụ nạp thư viện) vào pool,
+        để request đầu tiên không phải chờ tạo process và import. Không tạo job.
+        :return: Danh sách future của các lần gọi fn.
+        """
+        with self._lock:
+            executor = self._get_executor()
+            return [executor.submit(fn) for _ in range(self.max_workers)]
+
+    def add_result(self, result):
+        """
+        Ghi nhận một job đã có kết quả sẵn (ví dụ lấy từ cache), không cần chạy trong pool.
+        """
+        job = RenderJob(uuid.uuid4().hex, result=result)
+        with self._lock:
+            self._prune()
+            self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _finish(self, job, future, on_done):
+        try:
+            job.result = future.result()
+            if on_done is not None:
+                on_done(job.result)
+        except Exception as e:
+            logger.warning("Render job %s failed: %s", job.job_id, e)
+            job.error = str(e) or type(e).__name__
+            self.failed_count += 1
+        job.finished_at = time.monotonic()
+        with self._lock:
+            self._pending -= 1
+
+    def _prune(self):
+        # Xóa các job đã xong quá job_ttl giây (gọi khi đang giữ lock)
+        now = time.monotonic()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.job_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
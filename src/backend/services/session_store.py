@@ -0,0 +1,189 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class SessionStore:
+    """
+    Kho lưu thông số thiết kế theo từng phiên (session) người dùng.
+    Các backend cụ thể cài đặt `_load`, `_save` và `_delete`.
+    """
+
+    def __init__(self, ttl=3600):
+        """
+        :param ttl: Thời gian sống (giây) của một phiên kể từ lần truy cập cuối.
+        """
+        self.ttl = ttl
+
+    @staticmethod
+    def new_session_id():
+        """
+        Sinh session id mới phía server.
+        """
+        return uuid.uuid4().hex
+
+    def load(self, session_id):
+        """
+        Lấy thông số của phiên, trả về None nếu phiên không tồn tại hoặc đã hết hạn.
+        """
+        if not session_id:
+            return None
+        return self._load(session_id)
+
+    def save(self, session_id, parameters):
+        """
+        Lưu thông số (dict có thể chuyển sang JSON) của phiên.
+        """
+        self._save(session_id, parameters)
+
+    def delete(self, session_id):
+        """
+        Xóa phiên khỏi kho.
+        """
+        self._delete(session_id)
+
+    def _load(self, session_id):
+        raise NotImplementedError
+
+    def _save(self, session_id, parameters):
+        raise NotImplementedError
+
+    def _delete(self, session_id):
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Kho phiên trong bộ nhớ tiến trình: LRU giới hạn số phiên, kèm loại bỏ theo TTL.
+    Chỉ dùng được trong một tiến trình (một worker).
+    """
+
+    def __init__(self, max_size=10000, ttl=3600):
+        super(MemorySessionStore, self).__init__(ttl)
+        self.max_size = max_size
+        self._entries = OrderedDict()  # session_id -> (thời điểm truy cập cuối, JSON thông số)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _load(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            touched_at, payload = entry
+            if now - touched_at > self.ttl:
+                del self._entries[session_id]
+                return None
+            self._entries[session_id] = (now, payload)
+            self._entries.move_to_end(session_id)
+        # Lưu dạng JSON để mỗi request nhận một bản sao độc lập
+        return json.loads(payload)
+
+    def _save(self, session_id, parameters):
+        payload = json.dumps(parameters, ensure_ascii=False)
+        now = time.monotonic()
+        with self._lock:
+            self._entries[session_id] = (now, payload)
+            self._entries.move_to_end(session_id)
+            self._evict(now)
+
+    def _delete(self, session_id):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def _evict(self, now):
+        """
+        Loại bỏ các phiên hết hạn ở đầu hàng đợi LRU, sau đó cắt bớt theo max_size.
+        """
+        while self._entries:
+            oldest_id, (touched_at, _) = next(iter(self._entries.items()))
+            if now - touched_at <= self.ttl:
+                break
+            del self._entries[oldest_id]
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Kho phiên lưu trong file SQLite cục bộ, dùng chung được giữa nhiều worker
+    trên cùng một máy (ví dụ các worker gunicorn).
+    """
+
+    def __init__(self, db_path, ttl=3600, purge_interval=300, table="sessions"):
+        """
+        :param table: Tên bảng; các worker dùng chung một file cho dữ liệu khác theo khóa (ví dụ trạng thái job)
+                      bằng các bảng riêng.
+        """
+        super(SQLiteSessionStore, self).__init__(ttl)
+        self.db_path = db_path
+        self.purge_interval = purge_interval
+        self.table = table
+        self._last_purge = 0.0
+        directory = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "session_id TEXT PRIMARY KEY, parameters TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        # Mỗi thao tác mở kết nối riêng để an toàn giữa các luồng và tiến trình
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _load(self, session_id):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT parameters, updated_at FROM {self.table} WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                conn.execute(f"DELETE FROM {self.table} WHERE session_id = ?", (session_id,))
+                return None
+            conn.execute(f"UPDATE {self.table} SET updated_at = ? WHERE session_id = ?", (now, session_id))
+        return json.loads(row[0])
+
+    def _save(self, session_id, parameters):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (session_id, parameters, updated_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(parameters, ensure_ascii=False), now)
+            )
+            if now - self._last_purge > self.purge_interval:
+                conn.execute(f"DELETE FROM {self.table} WHERE updated_at < ?", (now - self.ttl,))
+                self._last_purge = now
+
+    def _delete(self, session_id):
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE session_id = ?", (session_id,))
+
+
+def create_session_store(table="sessions", ttl=None):
+    """
+    Khởi tạo kho phiên theo biến môi trường:
+    SESSION_BACKEND (memory | sqlite), SESSION_TTL, SESSION_MAX_SIZE, SESSION_DB_PATH.
+    :param table: Bảng SQLite (backend sqlite); bảng khác "sessions" dùng cùng file để chia sẻ dữ liệu giữa các worker.
+    :param ttl: Thời gian sống (giây), mặc định SESSION_TTL.
+    """
+    backend = os.environ.get("SESSION_BACKEND", "memory").lower()
+    ttl = float(os.environ.get("SESSION_TTL", "3600")) if ttl is None else ttl
+
+    if backend == "memory":
+        return MemorySessionStore(max_size=int(os.environ.get("SESSION_MAX_SIZE", "10000")), ttl=ttl)
+    if backend == "sqlite":
+        default_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "sessions.sqlite3")
+        return SQLiteSessionStore(os.environ.get("SESSION_DB_PATH", default_path), ttl=ttl, table=table)
+    raise ValueError(f"SESSION_BACKEND không hợp lệ: {backend}")
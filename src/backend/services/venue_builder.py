@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+import time
+
+import numpy as np
+
+from models.size_parser import format_dimensions
+from services.design_cache import CachedDesign
+from services.layout_renderer import render_layout
+
+logger = logging.getLogger(__name__)
+
+
+def chunked(items, count):
+    """
+    Chia items thành tối đa count nhóm gần bằng nhau (mỗi process worker một nhóm, nên số job không tăng theo số phòng).
+    """
+    count = max(1, min(count, len(items)))
+    return [items[i::count] for i in range(count)]
+
+
+def build_room_designs(rooms, mode="grid", renderer="png"):
+    """
+    Tính bố trí và vẽ bản thiết kế riêng của một nhóm phòng; hàm ở mức module để chạy trong process worker.
+    :param rooms: Danh sách (LayoutParameters, design_id).
+    :return: Danh sách CachedDesign cùng thứ tự.
+    """
+    from services.design_builder import build_design
+
+    return [build_design(parameters, mode, renderer, design_id) for parameters, design_id in rooms]
+
+
+def floor_plan_id(title, rooms, width, height, renderer="png"):
+    """
+    Khóa nội dung của mặt bằng một tầng: tiêu đề, kích thước và (tên, vị trí, khóa bản thiết kế) của từng phòng.
+    :param rooms: Danh sách (tên, x, y, design_id của phòng).
+    """
+    canonical = json.dumps(
+        {"title": title, "rooms": [list(room) for room in rooms], "size": [width, height], "renderer": renderer},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def build_floor_plan(design_id, title, rooms, width, height, renderer="png"):
+    """
+    Vẽ mặt bằng một tầng: bàn, ghế và quầy lễ tân của từng phòng được dịch theo vị trí phòng rồi vẽ chung một bản.
+    :param design_id: Khóa nội dung (floor_plan_id).
+    :param rooms: Danh sách (tên, x, y, layout) với layout là CachedDesign.layout của phòng.
+    :param width: Chiều rộng mặt bằng (cm).
+    :param height: Chiều cao mặt bằng (cm).
+    :return: CachedDesign; layout["rooms"] là các phòng (x, y, width, height, tên).
+    """
+    start = time.perf_counter()
+    outlines, tables, chairs, receptions = [], [], [], []
+    for name, x, y, layout in rooms:
+        offset = np.array([x, y, 0, 0], dtype=np.float32)
+        outlines.append((x, y, *layout["room"], name))
+        tables.append(layout["tables"] + offset)
+        chairs.append(layout["chairs"] + offset)
+        if layout["reception"] is not None:
+            receptions.append(layout["reception"] + offset)
+    tables = np.concatenate(tables).reshape(-1, 4)
+    chairs = np.concatenate(chairs).reshape(-1, 4)
+    reception = np.stack(receptions) if receptions else None
+
+    content, extension, mimetype = render_layout(
+        renderer, width, height, tables, chairs, reception, rooms=outlines, title=title
+    )
+    render_seconds = time.perf_counter() - start
+    logger.info("Floor plan %s built: %d rooms, %d tables, render %.1f ms", design_id, len(rooms), len(tables),
+                render_seconds * 1000, extra={"design_id": design_id, "rooms": len(rooms), "tables": len(tables)})
+    return CachedDesign(
+        design_id=design_id,
+        layout={"room": (width, height), "rooms": outlines, "tables": tables, "chairs": chairs,
+                "reception": reception, "renderer": renderer},
+        content=content,
+        extension=extension,
+        mimetype=mimetype,
+        timings={"venue_render": render_seconds}
+    )
+
+
+def build_floor_plans(plans, renderer="png"):
+    """
+    Vẽ một nhóm mặt bằng tầng (chạy trong process worker).
+    :param plans: Danh sách (design_id, title, rooms, width, height) theo tham số của build_floor_plan.
+    """
+    return [build_floor_plan(*plan, renderer) for plan in plans]
+
+
+def _totals(rows):
+    area = sum(row["area_m2"] for row in rows)
+    used = sum(row["area_m2"] * row["efficiency"] for row in rows)
+    seats = sum(row["seats"] for row in rows)
+    return {
+        "rooms": len(rows),
+        "seats": seats,
+        "tables": sum(row["tables"] for row in rows),
+        "area_m2": round(area, 2),
+        # Hiệu suất chung tính theo diện tích (phòng lớn nặng ký hơn phòng nhỏ)
+        "efficiency": round(used / area, 2) if area else 0.0,
+        "seats_per_100m2": round(seats / area * 100, 2) if area else 0.0,
+    }
+
+
+def venue_statistics(venue, designs):
+    """
+    Thống kê sức chứa của địa điểm.
+    :param designs: Dict tên phòng -> CachedDesign của phòng.
+    :return: (danh sách thống kê từng phòng, tổng hợp gồm "by_floor" và "by_type").
+    """
+    rows = []
+    for room in venue.rooms:
+        design = designs[room.name]
+        room_w, room_h = room.parameters.room
+        rows.append({
+            "name": room.name,
+            "type": room.kind,
+            "floor": room.floor,
+            "size": format_dimensions((room_w, room_h)),
+            "area_m2": round(room_w * room_h / 10000, 2),
+            "seats": len(design.layout["chairs"]),
+            "tables": len(design.layout["tables"]),
+            "efficiency": round(design.layout["efficiency"], 2),
+            "design_id": design.design_id,
+        })
+
+    summary = _totals(rows)
+    summary["floors"] = len(venue.floors())
+    summary["by_floor"] = [{"floor": floor, **_totals([row for row in rows if row["floor"] == floor])}
+                           for floor in venue.floors()]
+    kinds = list(dict.fromkeys(row["type"] for row in rows))
+    summary["by_type"] = [{"type": kind, **_totals([row for row in rows if row["type"] == kind])} for kind in kinds]
+    return rows, summary
@@ -0,0 +1,129 @@
+"""
+Quét nhiều cấu hình bố trí song song trên mọi lõi CPU (ví dụ khi báo giá một địa điểm: thử nhiều mẫu bàn và độ rộng
+lối đi) rồi in bảng xếp hạng theo số chỗ ngồi, hiệu suất (như draw_layout) và diện tích còn trống.
+
+Mỗi thông số nhận một danh sách cách nhau dấu phẩy; khoảng cách (--gap, --aisle) nhận thêm dải "đầu:cuối:bước"
+(gồm cả hai đầu). Kích thước theo --unit (mặc định cm); --reception nhận "none" = không có quầy lễ tân.
+
+Chạy: python src/backend/sweep.py --room 2000x1500 --table 120x60,140x70,100x60 --aisle 80:140:10 --reception none,300x100
+      python src/backend/sweep.py --room 20x15 --unit m --mode optimize --workers 32 --top 10 --output sweep.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from models.parameters import LayoutParameters
+from models.size_parser import parse_dimensions
+from services.layout_sweep import run_sweep, sweep_configs
+
+
+def parse_sizes(text, unit, allow_none=False):
+    """
+    :param allow_none: Nhận "none" (không có, chỉ dùng cho quầy lễ tân).
+    :raises ValueError: Khi có kích thước không hợp lệ hoặc "none" ở thông số không nhận.
+    """
+    values = []
+    for item in text.split(","):
+        item = item.strip()
+        if item.lower() == "none":
+            if not allow_none:
+                raise ValueError(f"Thông số này không nhận giá trị none: {text}")
+            values.append(None)
+        else:
+            values.append(parse_dimensions(item, unit))
+    return values
+
+
+def parse_reception(text, unit):
+    return parse_sizes(text, unit, allow_none=True)
+
+
+def parse_distances(text, unit):
+    values = []
+    for item in text.split(","):
+        if ":" in item:
+            start, stop, step = (parse_dimensions(part, unit)[0] for part in item.split(":"))
+            if step <= 0:
+                raise ValueError(f"Bước phải lớn hơn 0: {item}")
+            # Thêm nửa bước để gồm cả đầu cuối dù có sai số làm tròn
+            values.extend(float(v) for v in np.arange(start, stop + step / 2, step))
+        else:
+            values.append(parse_dimensions(item.strip(), unit)[0])
+    return values
+
+
+def print_progress(done, total, started):
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed else 0.0
+    sys.stderr.write(f"\r{done}/{total} cấu hình ({done / total:.0%}), {rate:.0f} cấu hình/s")
+    if done == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+def write_output(path, rows, summary):
+    if path.endswith(".csv"):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["rank"])
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "results": rows}, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quét song song nhiều cấu hình bố trí quán net")
+    parser.add_argument("--room", required=True, help="Kích thước phòng, ví dụ 2000x1500 (có thể nhiều giá trị)")
+    parser.add_argument("--table", help="Kích thước bàn, ví dụ 120x60,140x70")
+    parser.add_argument("--chair", help="Kích thước ghế, ví dụ 60x60")
+    parser.add_argument("--gap", help="Khoảng cách giữa các bàn, ví dụ 5,10 hoặc 0:20:5")
+    parser.add_argument("--aisle", help="Độ rộng lối đi, ví dụ 80:140:10")
+    parser.add_argument("--reception", help="Quầy lễ tân, ví dụ none,300x100")
+    parser.add_argument("--unit", default="cm", choices=("cm", "m"), help="Đơn vị của các kích thước")
+    parser.add_argument("--mode", default="grid", choices=("grid", "optimize", "refine"), help="Chế độ bố trí")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Số process (mặc định: số lõi CPU)")
+    parser.add_argument("--chunk-size", type=int, help="Số cấu hình mỗi lần gửi sang worker (mặc định tự chọn)")
+    parser.add_argument("--top", type=int, default=20, help="Số dòng in ra (0: tất cả)")
+    parser.add_argument("--output", help="Ghi toàn bộ bảng xếp hạng ra file .csv hoặc .json")
+    parser.add_argument("--quiet", action="store_true", help="Không in tiến độ")
+    args = parser.parse_args()
+
+    try:
+        ranges = {"room": parse_sizes(args.room, args.unit)}
+        for name, option, parse in (("table", args.table, parse_sizes), ("chair", args.chair, parse_sizes),
+                                    ("table_gap", args.gap, parse_distances), ("aisle", args.aisle, parse_distances),
+                                    ("reception", args.reception, parse_reception)):
+            if option:
+                ranges[name] = parse(option, args.unit)
+        configs = sweep_configs(LayoutParameters(), ranges)
+    except ValueError as e:
+        parser.error(str(e))
+
+    started = time.perf_counter()
+    progress = None if args.quiet else lambda done, total: print_progress(done, total, started)
+    result = run_sweep(configs, args.mode, workers=args.workers, chunk_size=args.chunk_size, progress=progress)
+    rows = result.ranked()
+
+    print(f"{len(result)} cấu hình, mode {args.mode}, {args.workers} process: {result.elapsed:.2f} s "
+          f"({len(result) / result.elapsed:.0f} cấu hình/s)")
+    print(f"{'hạng':>5} {'phòng':>10} {'bàn':>8} {'ghế':>7} {'giữa':>6} {'lối đi':>7} {'quầy':>8}"
+          f" {'chỗ':>6} {'hiệu suất':>10} {'trống m²':>9}")
+    for row in rows[:args.top or None]:
+        print(f"{row['rank']:>5} {row['room']:>10} {row['table']:>8} {row['chair']:>7} {row['table_gap']:>6g}"
+              f" {row['aisle']:>7g} {row['reception'] or '-':>8} {row['seats']:>6} {row['efficiency']:>9.2f}%"
+              f" {row['free_area_m2']:>9.2f}")
+
+    if args.output:
+        summary = {"configs": len(result), "mode": args.mode, "workers": args.workers,
+                   "elapsed_s": round(result.elapsed, 3)}
+        write_output(args.output, rows, summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+import random
+import sys
+
+import pytest
+
+# Các module backend được import theo dạng "models.xxx"/"services.xxx" (chạy trong src/backend)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.parameters import LayoutParameters  # noqa: E402
+
+
+@pytest.fixture
+def random_parameters():
+    """
+    Sinh LayoutParameters ngẫu nhiên (có seed) gồm quầy lễ tân và vật cản: random_parameters(rng).
+    """
+    def make(rng, obstacles=True):
+        room = (rng.randrange(300, 1500, 10) * 1.0, rng.randrange(300, 1200, 10) * 1.0)
+        present = rng.random() < 0.5
+        return LayoutParameters(
+            room=room,
+            table=(rng.choice([80.0, 100.0, 120.0, 140.0]), rng.choice([50.0, 60.0, 70.0])),
+            chair=(rng.choice([40.0, 50.0, 60.0]), rng.choice([40.0, 50.0, 60.0])),
+            table_gap=rng.choice([5.0, 10.0, 15.0, 20.0]),
+            aisle=rng.choice([60.0, 80.0, 98.0, 120.0]),
+            reception=(rng.randrange(100, 300, 10) * 1.0, rng.randrange(50, 150, 10) * 1.0),
+            reception_present=present,
+            obstacles=tuple(random_obstacle(rng, room) for _ in range(rng.randrange(4))) if obstacles else (),
+        )
+
+    return make
+
+
+def random_obstacle(rng, room):
+    width, height = rng.randrange(20, 200, 10) * 1.0, rng.randrange(20, 200, 10) * 1.0
+    return (rng.uniform(0, room[0] - width), rng.uniform(0, room[1] - height), width, height)
+
+
+@pytest.fixture
+def rng():
+    return random.Random(1234)
@@ -0,0 +1,45 @@
+import pytest
+
+from services import design_cache
+from services.design_cache import CachedDesign, DesignCache, design_id_for
+from models.parameters import LayoutParameters
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(design_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def design(key, size=10):
+    return CachedDesign(key, {}, b"x" * size, "png", "image/png")
+
+
+def test_lru_eviction_by_entries_and_bytes(clock):
+    cache = DesignCache(max_entries=2, max_bytes=100)
+    cache.put("a", design("a"))
+    cache.put("b", design("b"))
+    assert cache.get("a") is not None
+    cache.put("c", design("c"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+    cache.put("d", design("d", size=95))
+    assert len(cache) == 1 and cache.get("d") is not None
+
+
+def test_entries_expire_after_max_age(clock):
+    cache = DesignCache(max_age=10)
+    cache.put("a", design("a"))
+    clock[0] += 11
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_design_id_depends_on_parameters_mode_and_renderer():
+    parameters = LayoutParameters()
+    assert design_id_for(parameters) == design_id_for(LayoutParameters())
+    assert design_id_for(parameters) != design_id_for(parameters.with_value("aisle_distance", [80.0]))
+    assert design_id_for(parameters) != design_id_for(parameters, mode="optimize")
+    assert design_id_for(parameters) != design_id_for(parameters, renderer="svg")
@@ -0,0 +1,32 @@
+from services.design_janitor import DesignJanitor
+
+
+def write(path, size):
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_expired_files_are_deleted(tmp_path):
+    janitor = DesignJanitor(str(tmp_path), ttl=600)
+    expired = write(tmp_path / "a.png", 10)
+    kept = write(tmp_path / "b.png", 10)
+    janitor.schedule(expired, ttl=-1)
+    janitor.schedule(kept)
+    janitor.stop(flush=True)
+
+    assert not (tmp_path / "a.png").exists()
+    assert (tmp_path / "b.png").exists()
+    assert janitor.deleted_count == 1
+    assert janitor.pending_count == 1
+
+
+def test_max_bytes_deletes_earliest_expiry_first(tmp_path):
+    janitor = DesignJanitor(str(tmp_path), ttl=600, max_bytes=25)
+    paths = [write(tmp_path / f"{i}.png", 10) for i in range(3)]
+    for i, path in enumerate(paths):
+        janitor.schedule(path, ttl=100 + i)
+    janitor.stop(flush=True)
+
+    assert [(tmp_path / f"{i}.png").exists() for i in range(3)] == [False, True, True]
+    assert janitor.total_bytes == 20
+    assert janitor.deleted_count == 1
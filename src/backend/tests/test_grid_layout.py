@@ -0,0 +1,31 @@
+import numpy as np
+
+from models.grid_layout import evaluate_grid_batch
+from models.layout_engine import LayoutEngine
+
+
+def assert_same_layout(first, second):
+    for a, b in zip(first[:2], second[:2]):
+        assert a.dtype == b.dtype
+        assert np.array_equal(a, b)
+    assert (first[2] is None) == (second[2] is None)
+    if first[2] is not None:
+        assert np.array_equal(first[2], second[2])
+
+
+def test_vectorized_grid_matches_loop(rng, random_parameters):
+    for _ in range(100):
+        parameters = random_parameters(rng)
+        assert_same_layout(LayoutEngine(parameters).compute(), LayoutEngine(parameters, engine="loop").compute())
+
+
+def test_batch_grid_matches_engine(rng, random_parameters):
+    # evaluate_grid_batch chỉ biết quầy lễ tân, không có vật cản khác
+    parameters = [random_parameters(rng, obstacles=False) for _ in range(100)]
+    batch = evaluate_grid_batch(np.array([p.config_vector() for p in parameters]))
+    for i, p in enumerate(parameters):
+        tables, chairs, _ = LayoutEngine(p).compute()
+        assert batch["tables"][i] == len(tables)
+        assert batch["seats"][i] == len(chairs)
+        assert np.array_equal(batch["table_boxes"][i][batch["table_mask"][i]].astype(np.float32), tables)
+        assert np.array_equal(batch["chair_boxes"][i][batch["chair_mask"][i]].astype(np.float32), chairs)
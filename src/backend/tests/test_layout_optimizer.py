@@ -0,0 +1,39 @@
+import numpy as np
+
+from models.layout_engine import LayoutEngine
+from models.layout_optimizer import LayoutOptimizer
+
+# Tọa độ float32: bỏ qua phần giao nhỏ hơn sai số làm tròn (các hình chỉ chạm cạnh nhau)
+EPSILON = 1e-3
+
+
+def overlaps(first, second):
+    x1, y1, w1, h1 = (first[:, None, i] for i in range(4))
+    x2, y2, w2, h2 = (second[None, :, i] for i in range(4))
+    return ((x1 < x2 + w2 - EPSILON) & (x2 < x1 + w1 - EPSILON)
+            & (y1 < y2 + h2 - EPSILON) & (y2 < y1 + h1 - EPSILON))
+
+
+def test_optimized_layout_is_valid(rng, random_parameters):
+    for _ in range(40):
+        parameters = random_parameters(rng)
+        engine = LayoutEngine(parameters, mode="optimize", optimizer=LayoutOptimizer(time_budget=10))
+        tables, chairs, reception = engine.compute()
+        entities = np.concatenate([tables, chairs]).astype(np.float64)
+        room_w, room_h = parameters.room
+
+        assert (entities[:, :2] >= -EPSILON).all()
+        assert (entities[:, 0] + entities[:, 2] <= room_w + EPSILON).all()
+        assert (entities[:, 1] + entities[:, 3] <= room_h + EPSILON).all()
+
+        hits = overlaps(entities, entities)
+        np.fill_diagonal(hits, False)
+        assert not hits.any()
+
+        obstacles = [reception] if reception is not None else []
+        obstacles += [np.array(obstacle) for obstacle in parameters.obstacles]
+        if obstacles:
+            assert not overlaps(entities, np.stack(obstacles).astype(np.float64)).any()
+
+        # Không bao giờ kém hơn bố trí lưới
+        assert len(chairs) >= len(LayoutEngine(parameters).compute()[1])
@@ -0,0 +1,27 @@
+import xml.etree.ElementTree as ET
+
+from models.venue import Venue
+from services.venue_builder import build_floor_plan, build_room_designs
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def test_venue_svg_escapes_names():
+    name = 'VIP <1> & "co"'
+    venue = Venue.from_dict({
+        "name": "<script>alert(1)</script>",
+        "rooms": [{"name": name, "parameters": {"room": {"size": "700x500", "unit": "cm"}}}, {"name": "Phòng <b>", "floor": 1}],
+    })
+    designs = build_room_designs([(room.parameters, f"room{i}") for i, room in enumerate(venue.rooms)],
+                                 renderer="svg")
+    placements, width, height = venue.floor_plan(1)
+    rooms = [(room.name, x, y, designs[i].layout) for i, (room, x, y) in enumerate(placements)]
+    plan = build_floor_plan("plan", venue.name, rooms, width, height, renderer="svg")
+
+    root = ET.fromstring(plan.content)
+    labels = [element.text for element in root.iter(f"{SVG}text")]
+    assert venue.name in labels
+    assert name in labels
+    assert "Phòng <b>" in labels
+    assert not list(root.iter(f"{SVG}script"))
+    assert not list(root.iter(f"{SVG}b"))
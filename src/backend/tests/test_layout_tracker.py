@@ -0,0 +1,64 @@
+import numpy as np
+
+from models.layout_engine import LayoutEngine
+from services.layout_tracker import LayoutTracker
+from services.session_store import MemorySessionStore
+
+
+def random_edit(rng, parameters, random_parameters):
+    # Đổi một thông số (như một lượt chat) hoặc thay toàn bộ
+    other = random_parameters(rng)
+    choice = rng.randrange(7)
+    if choice == 0:
+        return parameters.with_value("aisle_distance", [other.aisle])
+    if choice == 1:
+        return parameters.with_value("distance_between_tables", [other.table_gap])
+    if choice == 2:
+        return parameters.with_value("table", list(other.table))
+    if choice == 3:
+        return parameters.with_reception_present(not parameters.reception_present)
+    if choice == 4:
+        return parameters.with_value("room", list(other.room))
+    if choice == 5:
+        return other
+    return parameters
+
+
+def check_diff(diff, previous, current):
+    for name, before, after in (("tables", previous.tables, current.tables),
+                                ("chairs", previous.chairs, current.chairs)):
+        moved = len(diff["moved"][name]["from"])
+        assert len(diff["moved"][name]["to"]) == moved
+        assert diff["unchanged"][name] + len(diff["removed"][name]) + moved == len(before)
+        assert diff["unchanged"][name] + len(diff["added"][name]) + moved == len(after)
+
+
+def test_tracker_matches_full_layout(rng, random_parameters):
+    tracker = LayoutTracker()
+    parameters = random_parameters(rng)
+    previous = None
+    for step in range(300):
+        mode = "optimize" if step % 50 == 49 else "grid"
+        tracked, diff, _ = tracker.update("session", parameters, mode)
+        tables, chairs, reception = LayoutEngine(parameters, mode=mode).compute()
+        assert np.array_equal(tracked.tables, tables)
+        assert np.array_equal(tracked.chairs, chairs)
+        assert np.array_equal(tracked.reception, reception) if reception is not None else tracked.reception is None
+        if previous is None:
+            assert diff is None
+        else:
+            check_diff(diff, previous, tracked)
+        previous = tracked
+        parameters = random_edit(rng, parameters, random_parameters)
+
+
+def test_tracker_restores_previous_layout_from_store(rng, random_parameters):
+    # Hai process web dùng chung store: process thứ hai vẫn trả diff so với lần tính của process đầu
+    store = MemorySessionStore()
+    first, second = LayoutTracker(store=store), LayoutTracker(store=store)
+    parameters = random_parameters(rng)
+    previous, _, _ = first.update("session", parameters)
+    changed = parameters.with_reception_present(not parameters.reception_present)
+    tracked, diff, _ = second.update("session", changed)
+    assert diff is not None
+    check_diff(diff, previous, tracked)
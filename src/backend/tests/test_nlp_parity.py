@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from models.nlp_model import NLPModel, parse_text_parameters
+
+# Engine "underthesea" là bản tham chiếu: "rules" (mặc định) phải cho cùng thông số trên mọi tin nhắn mẫu
+pytest.importorskip("underthesea")
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "nlp_parity_corpus.txt")
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def chat_turn(message, engine):
+    # Xử lý như /api/chat: thông số và phản hồi sau lượt chat
+    model = NLPModel(engine=engine)
+    if "tôi muốn" in message.lower() or "cập nhật" in message.lower():
+        response = model.handle_user_update(message)
+    elif "loại bỏ quầy lễ tân" in message.lower():
+        response = model.remove_reception_desk()
+    else:
+        response = model.respond_to_user(message)
+    return model.user_parameters, response
+
+
+@pytest.mark.parametrize("message", load_corpus())
+def test_rules_engine_matches_underthesea(message):
+    text = NLPModel().preprocess_text(message)
+    assert parse_text_parameters(text, "rules") == parse_text_parameters(text, "underthesea")
+    assert chat_turn(message, "rules") == chat_turn(message, "underthesea")
@@ -0,0 +1,55 @@
+import operator
+import time
+
+import pytest
+
+from services.render_queue import QueueFullError, RenderQueue
+
+
+def wait(job, timeout=60):
+    # Trạng thái job được cập nhật trong callback, có thể sau khi future.result() đã trả về
+    deadline = time.monotonic() + timeout
+    while job.finished_at is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+@pytest.fixture
+def queue():
+    queue = RenderQueue(max_workers=1, max_pending=1)
+    yield queue
+    queue.shutdown(wait=True)
+
+
+def test_job_lifecycle(queue):
+    done = []
+    job = queue.submit(operator.add, 2, 3, on_done=done.append)
+    assert wait(job).status == "done"
+    assert queue.get(job.job_id) is job
+    assert job.result == 5 and done == [5]
+    assert queue.pending_count == 0
+
+
+def test_failed_job(queue):
+    job = queue.submit(int, "x")
+    assert wait(job).status == "failed"
+    assert "invalid literal" in job.error
+    assert queue.failed_count == 1
+
+
+def test_rejects_jobs_beyond_max_pending(queue):
+    job = queue.submit(time.sleep, 0.5)
+    with pytest.raises(QueueFullError):
+        queue.submit(time.sleep, 0)
+    assert queue.rejected_count == 1
+    wait(job)
+    # Kết quả có sẵn (cache) không chiếm chỗ trong hàng đợi
+    assert queue.add_result("cached").status == "done"
+
+
+def test_finished_jobs_expire(queue):
+    queue.job_ttl = 0
+    job = queue.add_result("cached")
+    time.sleep(0.01)
+    queue.add_result("other")
+    assert queue.get(job.job_id) is None
@@ -0,0 +1,72 @@
+import pytest
+
+from services import session_store
+from services.session_store import MemorySessionStore, SQLiteSessionStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store.time, "monotonic", clock)
+    monkeypatch.setattr(session_store.time, "time", clock)
+    return clock
+
+
+def test_memory_store_expires_after_ttl(clock):
+    store = MemorySessionStore(ttl=10)
+    store.save("a", {"room": 1})
+    clock.now += 9
+    assert store.load("a") == {"room": 1}
+    # Lần đọc làm mới thời điểm truy cập
+    clock.now += 9
+    assert store.load("a") == {"room": 1}
+    clock.now += 11
+    assert store.load("a") is None
+    assert len(store) == 0
+
+
+def test_memory_store_evicts_least_recently_used(clock):
+    store = MemorySessionStore(max_size=2, ttl=100)
+    store.save("a", {"n": 1})
+    store.save("b", {"n": 2})
+    store.load("a")
+    store.save("c", {"n": 3})
+    assert store.load("b") is None
+    assert store.load("a") == {"n": 1}
+    assert store.load("c") == {"n": 3}
+
+
+def test_memory_store_purges_expired_sessions_on_save(clock):
+    store = MemorySessionStore(ttl=10)
+    store.save("a", {})
+    clock.now += 11
+    store.save("b", {})
+    assert len(store) == 1
+
+
+def test_memory_store_returns_copies():
+    store = MemorySessionStore()
+    store.save("a", {"room": [1, 2]})
+    store.load("a")["room"].append(3)
+    assert store.load("a") == {"room": [1, 2]}
+
+
+def test_sqlite_store_tables_are_separate(tmp_path, clock):
+    path = str(tmp_path / "sessions.sqlite3")
+    sessions, jobs = SQLiteSessionStore(path, ttl=10), SQLiteSessionStore(path, ttl=10, table="jobs")
+    sessions.save("a", {"room": 1})
+    jobs.save("a", {"status": "done"})
+    assert SQLiteSessionStore(path).load("a") == {"room": 1}
+    assert jobs.load("a") == {"status": "done"}
+    clock.now += 11
+    assert sessions.load("a") is None
+    sessions.delete("a")
+    assert sessions.load("a") is None
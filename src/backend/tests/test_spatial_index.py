@@ -0,0 +1,32 @@
+import numpy as np
+
+from models.spatial_index import SpatialIndex
+
+
+def brute_force(rects, obstacles):
+    return np.array([any(x < ox + ow and x + w > ox and y < oy + oh and y + h > oy for ox, oy, ow, oh in obstacles)
+                     for x, y, w, h in rects], dtype=bool)
+
+
+def random_rects(rng, count, max_size):
+    return [(rng.uniform(-50, 1000), rng.uniform(-50, 1000), rng.uniform(1, max_size), rng.uniform(1, max_size))
+            for _ in range(count)]
+
+
+def test_query_mask_matches_brute_force(rng):
+    # Cả hai nhánh: ít vật cản (so khớp NumPy) và nhiều vật cản (duyệt ô lưới)
+    for count in (0, 1, 5, SpatialIndex.dense_threshold + 1, 200):
+        obstacles = random_rects(rng, count, 150)
+        index = SpatialIndex(cell_size=rng.choice([25.0, 100.0, 400.0]), rects=obstacles)
+        queries = random_rects(rng, 300, 200)
+        expected = brute_force(queries, obstacles)
+        assert np.array_equal(index.query_mask(queries), expected)
+        assert [index.intersects(rect) for rect in queries] == expected.tolist()
+
+
+def test_touching_edges_and_empty_rects_do_not_overlap():
+    index = SpatialIndex(rects=[(100, 100, 50, 50), (0, 0, 0, 10)])
+    assert len(index) == 1
+    assert not index.intersects((150, 100, 10, 10))
+    assert not index.intersects((100, 150, 10, 10))
+    assert index.intersects((149, 149, 10, 10))
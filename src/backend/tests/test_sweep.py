@@ -0,0 +1,12 @@
+import pytest
+
+from sweep import parse_reception, parse_sizes
+
+
+def test_parse_sizes_rejects_none():
+    with pytest.raises(ValueError):
+        parse_sizes("700x500,none", "cm")
+
+
+def test_parse_reception_accepts_none():
+    assert parse_reception("none,300x100", "cm") == [None, (300.0, 100.0)]
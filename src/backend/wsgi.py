@@ -0,0 +1,10 @@
+"""
+Điểm vào WSGI cho production, ví dụ (chạy trong src/backend):
+
+    gunicorn -c gunicorn.conf.py
+
+Cấu hình số process/thread, preload và tắt êm nằm trong gunicorn.conf.py (đọc từ biến môi trường).
+"""
+from app import app
+
+application = app
@@ -78,13 +78,18 @@ document.addEventListener("DOMContentLoaded", () => {
     
         try {
             // Gửi yêu cầu POST đến API
-            const response = await fetch("/api/chat", {
+            let response = await fetch("/api/chat", {
                 method: "POST",
                 headers: {
                     "Content-Type": "application/json",
                 },
                 body: JSON.stringify({ message }),
             });
+
+            // "Xác nhận" trả về job render (202): chờ job xong rồi tải kết quả
+            if (response.status === 202) {
+                response = await waitForJob(await response.json());
+            }
             
             // Kiểm tra phản hồi
             if (!response.ok) {
@@ -114,13 +119,14 @@ document.addEventListener("DOMContentLoaded", () => {
                     // Hiển thị thông báo lỗi nếu không nhận được dữ liệu phù hợp
                     appendMessage("Không nhận được phản hồi phù hợp từ server.", "bot", false, true);
                 }
-            } else if (contentType.includes("application/octet-stream")) {
-                // Tạo URL từ blob để hiển thị hình ảnh
+            } else if (contentType.includes("application/octet-stream") || contentType.startsWith("image/")) {
+                // Tạo URL từ blob để hiển thị hình ảnh (PNG hoặc SVG)
                 const blob = await response.blob();
                 const url = window.URL.createObjectURL(blob);
+                const extension = contentType.includes("svg") ? "svg" : "png";
     
                 // Hiển thị hình ảnh trong giao diện
-                displayImageWithDownload(url);
+                displayImageWithDownload(url, extension);
                 chatOutput.removeChild(typingElement);
     
             
@@ -136,8 +142,24 @@ document.addEventListener("DOMContentLoaded", () => {
         }
     }
     
+    // Hỏi trạng thái job render định kỳ, trả về response chứa bản thiết kế khi job xong
+    async function waitForJob(job, interval = 500) {
+        while (job.status === "queued" || job.status === "running") {
+            await new Promise((resolve) => setTimeout(resolve, interval));
+            const statusResponse = await fetch(job.status_url);
+            if (!statusResponse.ok) {
+                throw new Error("Không lấy được trạng thái bản vẽ.");
+            }
+            job = await statusResponse.json();
+        }
+        if (job.status === "failed") {
+            throw new Error(job.error || "Không tạo được bản vẽ.");
+        }
+        return fetch(job.result_url);
+    }
+
     // Hàm hiển thị hình ảnh với nút tải về
-    function displayImageWithDownload(imageUrl) {
+    function displayImageWithDownload(imageUrl, extension = "png") {
         const imageContainer = document.createElement("div");
         imageContainer.classList.add("image-container");
     
@@ -150,7 +172,7 @@ document.addEventListener("DOMContentLoaded", () => {
         // Tạo nút tải về
         const downloadButton = document.createElement("a");
         downloadButton.href = imageUrl;
-        downloadButton.download = "design.png"; // Tên file khi tải về
+        downloadButton.download = `design.${extension}`; // Tên file khi tải về
         downloadButton.textContent = "Tải về";
         downloadButton.classList.add("download-button");
     